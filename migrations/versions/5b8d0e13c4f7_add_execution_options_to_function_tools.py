@@ -0,0 +1,29 @@
+"""Add execution_options to function_tools
+
+Revision ID: 5b8d0e13c4f7
+Revises: 9c1e4f2a7b36
+Create Date: 2026-10-18 11:04:27.531092
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8d0e13c4f7'
+down_revision: Union[str, None] = '9c1e4f2a7b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('function_tools', sa.Column('execution_options', postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default='{}'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('function_tools', 'execution_options')
@@ -0,0 +1,29 @@
+"""Add ingestion job id to documents
+
+Revision ID: 5b8d2e6f1a93
+Revises: 7c3e9a1f4b28
+Create Date: 2026-10-18 19:42:07.615930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8d2e6f1a93'
+down_revision: Union[str, None] = '7c3e9a1f4b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('ingestion_job_id', postgresql.UUID(as_uuid=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'ingestion_job_id')
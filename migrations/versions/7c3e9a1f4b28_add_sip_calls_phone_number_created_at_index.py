@@ -0,0 +1,28 @@
+"""Add a (phone_number, created_at) index to sip_calls
+
+Revision ID: 7c3e9a1f4b28
+Revises: e4a7c2d91f05
+Create Date: 2026-10-18 17:04:51.302118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e9a1f4b28'
+down_revision: Union[str, None] = 'e4a7c2d91f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_sip_calls_phone_number_created_at', 'sip_calls', ['phone_number', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sip_calls_phone_number_created_at', table_name='sip_calls')
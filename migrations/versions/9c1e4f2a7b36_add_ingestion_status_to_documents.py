@@ -0,0 +1,37 @@
+"""Add ingestion status to documents
+
+Revision ID: 9c1e4f2a7b36
+Revises: 0d7f6660b9d3
+Create Date: 2026-10-18 10:12:41.208514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e4f2a7b36'
+down_revision: Union[str, None] = '0d7f6660b9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+documentstatus = sa.Enum('QUEUED', 'EXTRACTING', 'EMBEDDING', 'INDEXED', 'FAILED', name='documentstatus')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    documentstatus.create(op.get_bind(), checkfirst=True)
+    # Documents uploaded before background ingestion were processed inline
+    op.add_column('documents', sa.Column('status', documentstatus, nullable=False, server_default='INDEXED'))
+    op.add_column('documents', sa.Column('progress', sa.Integer(), nullable=False, server_default='100'))
+    op.add_column('documents', sa.Column('error', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'error')
+    op.drop_column('documents', 'progress')
+    op.drop_column('documents', 'status')
+    documentstatus.drop(op.get_bind(), checkfirst=True)
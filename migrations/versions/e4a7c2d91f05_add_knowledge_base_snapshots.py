@@ -0,0 +1,41 @@
+"""Add knowledge_base_snapshots and reference them from connections
+
+Revision ID: e4a7c2d91f05
+Revises: 5b8d0e13c4f7
+Create Date: 2026-10-18 15:22:09.184736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2d91f05'
+down_revision: Union[str, None] = '5b8d0e13c4f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('knowledge_base_snapshots',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.add_column('connections', sa.Column('knowledge_base_snapshot_id', sa.String(length=64), nullable=True))
+    op.create_foreign_key(
+        'connections_knowledge_base_snapshot_id_fkey', 'connections', 'knowledge_base_snapshots',
+        ['knowledge_base_snapshot_id'], ['id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('connections_knowledge_base_snapshot_id_fkey', 'connections', type_='foreignkey')
+    op.drop_column('connections', 'knowledge_base_snapshot_id')
+    op.drop_table('knowledge_base_snapshots')
@@ -1,6 +1,6 @@
 from typing import Annotated, Any
 
-from fastapi import Depends, HTTPException, Request
+from fastapi import Depends, HTTPException, Request, Response
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -9,9 +9,8 @@ from ..core.db.database import async_get_db
 from ..core.exceptions.http_exceptions import ForbiddenException, RateLimitException, UnauthorizedException
 from ..core.logger import logging
 from ..core.security import TokenType, verify_token, security
-from ..core.utils.rate_limit import rate_limiter
-from ..crud.crud_rate_limit import crud_rate_limits
-from ..crud.crud_tier import crud_tiers
+from ..core.utils.local_cache import LocalCache, publish_invalidation
+from ..core.utils.rate_limit import RATE_LIMIT_RULES_CACHE, RateLimitRules, rate_limit_rules, rate_limiter
 from ..crud.crud_users import crud_users
 from ..models.user import User
 from ..schemas.rate_limit import sanitize_path
@@ -21,6 +20,18 @@ logger = logging.getLogger(__name__)
 DEFAULT_LIMIT = settings.DEFAULT_RATE_LIMIT_LIMIT
 DEFAULT_PERIOD = settings.DEFAULT_RATE_LIMIT_PERIOD
 
+# Token subject (username or email) -> user, so authenticated requests skip Postgres.
+# Invalidated whole on user changes, since either form of the subject may be cached, or
+# per user with invalidate_auth_user.
+AUTH_USER_CACHE = "auth-users"
+auth_user_cache = LocalCache(AUTH_USER_CACHE, ttl=settings.AUTH_USER_CACHE_TTL)
+
+
+async def invalidate_auth_user(user: Any) -> None:
+    """Drop one user from the auth cache, under both forms of the token subject"""
+    await publish_invalidation(AUTH_USER_CACHE, user.username)
+    await publish_invalidation(AUTH_USER_CACHE, user.email)
+
 async def get_current_user(
     # CHANGED: The dependency now uses the new 'security' object
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
@@ -34,12 +45,17 @@ async def get_current_user(
     if token_data is None:
         raise UnauthorizedException("User not authenticated.")
     
+    user: dict | None = auth_user_cache.get(token_data.username_or_email)
+    if user:
+        return user
+
     if "@" in token_data.username_or_email:
-        user: dict | None = await crud_users.get(db=db, email=token_data.username_or_email, is_deleted=False)
+        user = await crud_users.get(db=db, email=token_data.username_or_email, is_deleted=False)
     else:
         user = await crud_users.get(db=db, username=token_data.username_or_email, is_deleted=False)
 
     if user:
+        auth_user_cache.set(token_data.username_or_email, user)
         return user
 
     raise UnauthorizedException("User not authenticated.")
@@ -125,7 +141,10 @@ async def get_current_superuser(current_user: Annotated[dict, Depends(get_curren
 
 
 async def rate_limiter_dependency(
-    request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], user: User | None = Depends(get_optional_user)
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    user: User | None = Depends(get_optional_user),
 ) -> None:
     if hasattr(request.app.state, "initialization_complete"):
         await request.app.state.initialization_complete.wait()
@@ -133,14 +152,16 @@ async def rate_limiter_dependency(
     path = sanitize_path(request.url.path)
     if user:
         user_id = user["id"]
-        tier = await crud_tiers.get(db, id=user["tier_id"])
-        if tier:
-            rate_limit = await crud_rate_limits.get(db=db, tier_id=tier["id"], path=path)
+        # Tiers and limits come from the in-process rules table, not the database
+        rules: RateLimitRules = await rate_limit_rules.get_or_load(RATE_LIMIT_RULES_CACHE)
+        tier_name = rules.tiers.get(user["tier_id"])
+        if tier_name:
+            rate_limit = rules.resolve(user["tier_id"], path)
             if rate_limit:
-                limit, period = rate_limit["limit"], rate_limit["period"]
+                limit, period = rate_limit
             else:
                 logger.warning(
-                    f"User {user_id} with tier '{tier['name']}' has no specific rate limit for path '{path}'. \
+                    f"User {user_id} with tier '{tier_name}' has no specific rate limit for path '{path}'. \
                         Applying default rate limit."
                 )
                 limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
@@ -151,6 +172,18 @@ async def rate_limiter_dependency(
         user_id = request.client.host
         limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
 
-    is_limited = await rate_limiter.is_rate_limited(db=db, user_id=user_id, path=path, limit=limit, period=period)
-    if is_limited:
-        raise RateLimitException("Rate limit exceeded.")
\ No newline at end of file
+    checks = [(user_id, path, limit, period)]
+    if user and settings.IP_RATE_LIMIT_LIMIT > 0:
+        # Also cap the client address, in the same Redis round trip
+        checks.append((f"ip:{request.client.host}", path, settings.IP_RATE_LIMIT_LIMIT, settings.IP_RATE_LIMIT_PERIOD))
+
+    results = await rate_limiter.check_many(checks)
+    # Report the limit closest to rejecting the request
+    result = min(results, key=lambda r: (r.allowed, r.remaining))
+    if not result.allowed:
+        exception = RateLimitException("Rate limit exceeded.")
+        exception.headers = result.headers()
+        raise exception
+
+    for name, value in result.headers().items():
+        response.headers[name] = value
\ No newline at end of file
@@ -101,8 +101,9 @@ from ...schemas.document import (
     AgentKnowledgeMappingRead,
     AgentKnowledgeMappingCreateInternal
 )
-from ...crud.crud_documents import crud_agent_knowledge_mapping
+from ...crud.crud_documents import crud_agent_knowledge_mapping, AGENT_KNOWLEDGE_CACHE
 from ...api.dependencies import get_current_user
+from ...core.utils.local_cache import publish_invalidation
 from ...models.user import User
 
 router = APIRouter(tags=["agent-knowledge"])
@@ -144,6 +145,7 @@ async def associate_knowledge_base(
     # 4. Create association if it doesn't exist
     mapping_internal = AgentKnowledgeMappingCreateInternal(**mapping.model_dump())
     new_mapping = await crud_agent_knowledge_mapping.create(db=db, object=mapping_internal)
+    await publish_invalidation(AGENT_KNOWLEDGE_CACHE, mapping.agent_profile_id)
     
     return new_mapping
 
@@ -203,5 +205,6 @@ async def unassign_knowledge_base_from_agent(
     )
     await db.execute(stmt_delete)
     await db.commit()
+    await publish_invalidation(AGENT_KNOWLEDGE_CACHE, agent_id)
     
     return Response(status_code=204)
\ No newline at end of file
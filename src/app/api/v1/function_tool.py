@@ -16,7 +16,8 @@ from ...schemas.function_tool import (
     FunctionTestRequest,
     FunctionTestResponse
 )
-from ...crud.crud_function_tool import crud_function_tools
+from ...crud.crud_function_tool import crud_function_tools, FUNCTION_TOOL_CACHE
+from ...core.utils.local_cache import publish_invalidation
 from ...services.function_executor import function_executor
 
 router = APIRouter(prefix="/functions", tags=["function-tools"])
@@ -129,12 +130,15 @@ async def update_function_tool(
     if tool.owner_id != current_user["id"]:
         raise HTTPException(status_code=403, detail="Not authorized to update this function tool")
         
-    return await crud_function_tools.update(
+    updated_tool = await crud_function_tools.update(
         db=db, 
         id=tool_id, 
         object=tool_update,
         owner_id=current_user["id"]
     )
+    # Drop the compiled definition cached by running voice workers
+    await publish_invalidation(FUNCTION_TOOL_CACHE, tool_id)
+    return updated_tool
 
 # @router.delete("/{tool_id}", response_model=FunctionToolRead)
 # async def delete_function_tool(
@@ -168,6 +172,7 @@ async def delete_function_tool(
         raise HTTPException(status_code=403, detail="Not authorized to delete this function tool")
 
     await crud_function_tools.delete(db=db, id=tool_id)
+    await publish_invalidation(FUNCTION_TOOL_CACHE, tool_id)
     return  # 204 No Content
 
 @router.post("/{tool_id}/test", response_model=FunctionTestResponse)
@@ -189,7 +194,8 @@ async def test_function_tool(
     # Execute the function
     result = await function_executor.execute_function(
         function_id=tool.id,
-        parameters=request.parameters
+        parameters=request.parameters,
+        function_tool=tool
     )
     
     return result
@@ -167,17 +167,21 @@
     
 #     return {"success": success}
 
-import io
 import logging
+import os
 from typing import List
+import aiofiles
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 import uuid as uuid_pkg
 
+from ...core.config import settings
 from ...core.db.database import async_get_db
-from ...crud.crud_documents import document_service, crud_knowledge_base
-from ...schemas.document import KnowledgeBaseRead, DocumentRead, KnowledgeBaseCreate
+from ...core.utils import queue
+from ...crud.crud_documents import document_service, crud_document, crud_knowledge_base, AGENT_KNOWLEDGE_CACHE
+from ...schemas.document import KnowledgeBaseRead, DocumentRead, DocumentStatusRead, KnowledgeBaseCreate
 from ...api.dependencies import get_current_user
+from ...core.utils.local_cache import publish_invalidation
 from ...models.user import User
 
 logger = logging.getLogger("api-knowledge-base") 
@@ -226,27 +230,14 @@ async def get_knowledge_base_by_id(
         
     return kb
 
-@router.post("/knowledge-base/{kb_id}/upload", response_model=DocumentRead)
+@router.post("/knowledge-base/{kb_id}/upload", response_model=DocumentRead, status_code=202)
 async def upload_document(
     kb_id: uuid_pkg.UUID,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(async_get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Upload and process a document for a knowledge base"""
-    file_size = 0
-    chunk_size = 1024 * 1024
-    content = b''
-    
-    while chunk := await file.read(chunk_size):
-        content += chunk
-        file_size += len(chunk)
-        if file_size > 50 * 1024 * 1024:
-            raise HTTPException(
-                status_code=413, 
-                detail="File too large. Maximum size is 50MB."
-            )
-    
+    """Upload a document and queue it for processing into a knowledge base"""
     kb = await crud_knowledge_base.get(db=db, id=kb_id)
     if not kb:
         raise HTTPException(status_code=404, detail="Knowledge base not found")
@@ -254,24 +245,75 @@ async def upload_document(
     # FIX: Changed kb.owner_id to kb["owner_id"]
     if kb["owner_id"] != current_user["id"] and not current_user.get("is_superuser"):
         raise HTTPException(status_code=403, detail="Not authorized to access this knowledge base")
-    
-    file_obj = io.BytesIO(content)
-    
+
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="Uploaded file has no filename")
+
+    if queue.pool is None:
+        raise HTTPException(status_code=503, detail="Document ingestion queue is unavailable")
+
+    # Stream the upload to disk; the ingestion worker picks it up from there
+    os.makedirs(settings.INGESTION_UPLOAD_DIR, exist_ok=True)
+    extension = os.path.splitext(file.filename)[1].lower()
+    file_path = os.path.join(settings.INGESTION_UPLOAD_DIR, f"{uuid_pkg.uuid4()}{extension}")
+    file_size = 0
+    chunk_size = 1024 * 1024
+    document = None
     from ...services.document_processor import document_processor
     try:
-        document = await document_processor.process_file(
+        async with aiofiles.open(file_path, "wb") as out:
+            while chunk := await file.read(chunk_size):
+                file_size += len(chunk)
+                if file_size > settings.INGESTION_MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=413, 
+                        detail=f"File too large. Maximum size is {settings.INGESTION_MAX_UPLOAD_SIZE // (1024 * 1024)}MB."
+                    )
+                await out.write(chunk)
+
+        document = await document_processor.create_pending_document(
             db=db,
-            file=file_obj,
             filename=file.filename,
             knowledge_base_id=kb_id
         )
+        await queue.pool.enqueue_job(
+            "ingest_document", str(document.id), str(document.ingestion_job_id), file_path
+        )
         return document
     except Exception as e:
-        logger.exception(f"Error processing document: {e}")
+        if os.path.exists(file_path):
+            os.unlink(file_path)
+        if document is not None:
+            # Nothing will ingest it; do not leave it queued
+            await document_processor.mark_failed(db, document.id, document.ingestion_job_id, f"Could not queue ingestion: {e}")
+        if isinstance(e, HTTPException):
+            raise
+        logger.exception(f"Error queueing document: {e}")
         raise HTTPException(
             status_code=500,
-            detail=f"Error processing document: {str(e)}"
+            detail=f"Error queueing document: {str(e)}"
         )
+
+@router.get("/knowledge-base/{kb_id}/documents/{doc_id}/status", response_model=DocumentStatusRead)
+async def get_document_status(
+    kb_id: uuid_pkg.UUID,
+    doc_id: uuid_pkg.UUID,
+    db: AsyncSession = Depends(async_get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the ingestion status and progress of a document"""
+    kb = await crud_knowledge_base.get(db=db, id=kb_id)
+    if not kb:
+        raise HTTPException(status_code=404, detail="Knowledge base not found")
+        
+    if kb["owner_id"] != current_user["id"] and not current_user.get("is_superuser"):
+        raise HTTPException(status_code=403, detail="Not authorized to access this knowledge base")
+
+    document = await crud_document.get(db=db, id=doc_id, knowledge_base_id=kb_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found in the specified knowledge base")
+
+    return document
     
 @router.get("/knowledge-base/{kb_id}/documents", response_model=List[DocumentRead])
 async def list_documents(
@@ -338,6 +380,9 @@ async def delete_knowledge_base(
         raise HTTPException(status_code=403, detail="Not authorized to delete this knowledge base")
     
     success = await document_service.delete_knowledge_base(db=db, kb_id=kb_id)
+    if success:
+        # Any number of agents may have referenced this knowledge base
+        await publish_invalidation(AGENT_KNOWLEDGE_CACHE)
     
     return {"success": success}
 
@@ -245,15 +245,6 @@ async def create_agent_room(
     db: AsyncSession = Depends(async_get_db),
 ) -> TokenResponse:
     """Create a room with a voice agent and return a token for the user."""
-    from livekit.agents import cli
-    from ...core.livekit_worker import worker_process
-    
-    if worker_process is None:
-        raise HTTPException(
-            status_code=500,
-            detail="LiveKit worker is not initialized. Make sure LIVEKIT_ENABLE_WORKER is set to true."
-        )
-    
     # Use provided identity or generate from user
     participant_identity = request.participant_identity or f"user_{current_user['id']}"
     user_name = request.user_name or current_user['name'] or current_user['email']
@@ -319,7 +310,7 @@ async def create_agent_room(
     try:
         from ...core.livekit_worker import worker
         if worker:
-            # Simulate a job instead of actually registering with LiveKit dispatcher
+            # Simulate a job on the in-process development worker
             background_tasks.add_task(
                 worker.simulate_job,
                 room=room_name,
@@ -327,7 +318,8 @@ async def create_agent_room(
             )
             logger.info(f"Requested agent job for room: {room_name}")
         else:
-            logger.error("Worker is not initialized")
+            # The voice worker fleet picks the room up through LiveKit's automatic dispatch
+            logger.info(f"Agent for room {room_name} will be dispatched by LiveKit")
     except Exception as e:
         logger.error(f"Failed to create agent job: {e}")
         # Don't fail the request, still return token even if agent creation has issues
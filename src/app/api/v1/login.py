@@ -319,6 +319,7 @@ from ...core.security import (
 )
 from ...schemas.user import OTPVerify, EmailRequest, ResetPassword, MessageResponse
 from ...crud.crud_users import crud_users
+from ...api.dependencies import invalidate_auth_user
 from ...services.auth_utils import generate_otp, store_otp, send_otp_email, verify_and_delete_otp
 from redis.asyncio import Redis
 from datetime import datetime, UTC
@@ -483,6 +484,7 @@ async def verify_otp(data: OTPVerify, db: AsyncSession = Depends(async_get_db)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already verified")
     
     await crud_users.update(db=db, object={"is_verified": True, "updated_at": datetime.now(UTC)}, id=user.id)
+    await invalidate_auth_user(user)
     logger.info(f"User verified successfully: {data.email}")
     return MessageResponse(detail="Email verified successfully")
 
@@ -551,6 +553,7 @@ async def reset_password(data: ResetPassword, db: AsyncSession = Depends(async_g
         object={"hashed_password": get_password_hash(data.new_password), "updated_at": datetime.now(UTC)},
         id=user.id
     )
+    await invalidate_auth_user(user)
     logger.info(f"Password reset for {data.email}")
     return MessageResponse(detail="Password reset successfully")
 
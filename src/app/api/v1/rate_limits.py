@@ -7,6 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ...api.dependencies import get_current_superuser
 from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
+from ...core.utils.local_cache import publish_invalidation
+from ...core.utils.rate_limit import RATE_LIMIT_RULES_CACHE
 from ...crud.crud_rate_limit import crud_rate_limits
 from ...crud.crud_tier import crud_tiers
 from ...schemas.rate_limit import RateLimitCreate, RateLimitCreateInternal, RateLimitRead, RateLimitUpdate
@@ -31,6 +33,7 @@ async def write_rate_limit(
 
     rate_limit_internal = RateLimitCreateInternal(**rate_limit_internal_dict)
     created_rate_limit: RateLimitRead = await crud_rate_limits.create(db=db, object=rate_limit_internal)
+    await publish_invalidation(RATE_LIMIT_RULES_CACHE)
     return created_rate_limit
 
 
@@ -100,6 +103,7 @@ async def patch_rate_limit(
         raise DuplicateValueException("There is already a rate limit with this name")
 
     await crud_rate_limits.update(db=db, object=values, id=db_rate_limit["id"])
+    await publish_invalidation(RATE_LIMIT_RULES_CACHE)
     return {"message": "Rate Limit updated"}
 
 
@@ -116,4 +120,5 @@ async def erase_rate_limit(
         raise NotFoundException("Rate Limit not found")
 
     await crud_rate_limits.delete(db=db, id=db_rate_limit["id"])
+    await publish_invalidation(RATE_LIMIT_RULES_CACHE)
     return {"message": "Rate Limit deleted"}
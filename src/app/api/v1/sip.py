@@ -234,7 +234,7 @@ import uuid
 import logging
 from ...core.config import settings
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from ...models.sip import TwilioUrlUpdateRequest
 from ...schemas.sip import (
@@ -253,10 +253,13 @@ from ...schemas.sip import (
     SIPCallDirection
 )
 from ...core.db.database import async_get_db
+from ...core.utils import queue
 from ...services.sip_factory import sip_factory
+from ...services.sip_routing import invalidate_sip_routes
+from ...services.livekit_webhooks import enqueue_webhook, replay_events, stream_stats, verify_webhook
 from ...crud.crud_sip import crud_sip_trunk, crud_sip_agent_mapping
 from ...crud.crud_agent_profiles import crud_agent_profiles
-from ..dependencies import get_current_user
+from ..dependencies import get_current_user, get_current_superuser
 from ...models.user import User
 from twilio.rest import Client
 from ...models.connections import Connection
@@ -403,6 +406,7 @@ async def delete_sip_trunk(
         # Soft delete the trunk in the database
         await crud_sip_trunk.delete(db=db, id=trunk_id)
         logger.info(f"Successfully soft-deleted SIP trunk {trunk_id} from database")
+        await invalidate_sip_routes()
         
         return {"success": True, "message": "SIP trunk deleted successfully"}
     except HTTPException:
@@ -497,6 +501,7 @@ async def create_sip_agent_mapping(
             dispatch_rule_id=dispatch_rule_id
         )
     )
+    await invalidate_sip_routes()
     
     return mapping
 
@@ -537,6 +542,7 @@ async def update_sip_agent_mapping(
         id=mapping[0]["id"], 
         object=mapping_update
     )
+    await invalidate_sip_routes()
     
     return {"success": True, "message": "SIP agent mapping updated successfully"}
 
@@ -544,14 +550,15 @@ async def update_sip_agent_mapping(
 @router.post("/sip/inbound")
 async def handle_inbound_sip(
     request: Request,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(async_get_db)
 ):
     """
     Handles an inbound SIP call from a service like Twilio.
     
     This endpoint processes the incoming webhook, finds the relevant
-    SIP trunk and agent, creates a call record, and returns TwiML
-    to route the call to LiveKit.
+    SIP trunk and agent, and returns TwiML to route the call to LiveKit.
+    The call record is created after the response is sent.
     """
     try:
         # Get the form data from the request
@@ -569,7 +576,8 @@ async def handle_inbound_sip(
             to_number=to_number,
             from_number=from_number,
             call_sid=call_sid,
-            call_direction=SIPCallDirection.INBOUND
+            call_direction=SIPCallDirection.INBOUND,
+            background_tasks=background_tasks
         )
         logger.info(f"TwiML response data in handle inbound call: {twiml_response_data}")
         logger.info(f"TwiML response data: {twiml_response_data['sip_host']}")
@@ -604,59 +612,59 @@ async def handle_inbound_sip(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/livekit/webhook")
-async def handle_livekit_webhook(request: Request, db: AsyncSession = Depends(async_get_db)):
+async def handle_livekit_webhook(request: Request):
     """
-    Handle LiveKit webhook events (e.g., participant_joined, room_finished) to update room_id in database.
+    Receive LiveKit webhook events (e.g., participant_joined, room_finished).
+
+    The signed event is appended to a Redis stream and acknowledged at once; the
+    arq worker applies it to the database. Redeliveries of an event ID that was
+    already received are acknowledged without being queued again.
     """
-    payload = await request.json()
-    logger.info(f"Received LiveKit webhook: {payload}")
-
-    if payload.get("event") == "participant_joined":
-        room_name = payload.get("room", {}).get("name")
-        participant = payload.get("participant", {})
-        attributes = participant.get("attributes", {})
-        from_number = attributes.get("sip.phoneNumber")
-
-        if room_name and from_number:
-            # Filter by from_number and select the latest connection
-            result = await db.execute(
-                select(Connection)
-                .where(Connection.room_id.like(f"call-_{from_number}_%"))
-                .order_by(Connection.created_at.desc())  # Latest by created_at
-                .limit(1)
-            )
-            connection = result.scalars().first()
-
-            if connection:
-                if connection.room_id != room_name:
-                    old_room_id = connection.room_id
-                    # Update room_id (handle primary key constraint if needed)
-                    connection.room_id = room_name
-                    await db.commit()
-                    logger.info(f"Updated connection room_id from {old_room_id} to {room_name} for CallSid {connection.call_id}")
-
-                    # Update SIP call record
-                    call_result = await db.execute(
-                        select(SIPCall).where(SIPCall.call_id == connection.call_id)
-                    )
-                    call_record = call_result.scalar_one_or_none()
-                    if call_record:
-                        call_record.room_id = room_name
-                        await db.commit()
-                        logger.info(f"Updated SIPCall room_id to {room_name} for CallSid {connection.call_id}")
-                else:
-                    logger.info(f"Room_id already matches {room_name} for CallSid {connection.call_id}")
-            else:
-                logger.warning(f"No connection found for from_number {from_number}")
-
-    elif payload.get("event") == "room_finished":
-        room_name = payload.get("room", {}).get("name")
-        if room_name:
-            # No action (leave connection intact)
-            logger.info(f"Room {room_name} finished, connection left intact")
+    body = (await request.body()).decode()
+    try:
+        event = verify_webhook(body, request.headers.get("Authorization", ""))
+    except Exception as e:
+        logger.warning(f"Rejected LiveKit webhook: {e}")
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    if queue.pool is None:
+        # Not acknowledged, so LiveKit delivers it again
+        raise HTTPException(status_code=503, detail="Webhook queue is unavailable")
+
+    if await enqueue_webhook(queue.pool, event.id, body):
+        logger.info(f"Queued LiveKit webhook {event.event} ({event.id})")
+    else:
+        logger.info(f"LiveKit webhook {event.id} already received")
 
     return Response(status_code=200)
 
+@router.get("/livekit/webhook/stats", dependencies=[Depends(get_current_superuser)])
+async def get_livekit_webhook_stats():
+    """
+    Backlog of the LiveKit webhook stream: queued, pending and dead-lettered events, and
+    the processed, duplicate, failed and dead-lettered counts of each consumer.
+    """
+    if queue.pool is None:
+        raise HTTPException(status_code=503, detail="Webhook queue is unavailable")
+    return await stream_stats(queue.pool)
+
+@router.post("/livekit/webhook/replay", dependencies=[Depends(get_current_superuser)])
+async def replay_livekit_webhooks(
+    start: str = "-",
+    end: str = "+",
+    dead_letter: bool = False,
+    count: int = 1000
+):
+    """
+    Queue stored LiveKit webhooks again, by stream ID range.
+
+    With ``dead_letter`` the events that exhausted their deliveries are replayed instead.
+    """
+    if queue.pool is None:
+        raise HTTPException(status_code=503, detail="Webhook queue is unavailable")
+    replayed = await replay_events(queue.pool, start=start, end=end, dead_letter=dead_letter, count=count)
+    return {"success": True, "replayed": replayed}
+
 @router.post("/outbound-call", response_model=OutboundCallResponse)
 async def create_outbound_call(
     request: OutboundCallRequest,
@@ -7,6 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ...api.dependencies import get_current_superuser
 from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
+from ...core.utils.local_cache import publish_invalidation
+from ...core.utils.rate_limit import RATE_LIMIT_RULES_CACHE
 from ...crud.crud_tier import crud_tiers
 from ...schemas.tier import TierCreate, TierCreateInternal, TierRead, TierUpdate
 
@@ -24,6 +26,7 @@ async def write_tier(
 
     tier_internal = TierCreateInternal(**tier_internal_dict)
     created_tier: TierRead = await crud_tiers.create(db=db, object=tier_internal)
+    await publish_invalidation(RATE_LIMIT_RULES_CACHE)
     return created_tier
 
 
@@ -57,6 +60,7 @@ async def patch_tier(
         raise NotFoundException("Tier not found")
 
     await crud_tiers.update(db=db, object=values, name=name)
+    await publish_invalidation(RATE_LIMIT_RULES_CACHE)
     return {"message": "Tier updated"}
 
 
@@ -67,4 +71,5 @@ async def erase_tier(request: Request, name: str, db: Annotated[AsyncSession, De
         raise NotFoundException("Tier not found")
 
     await crud_tiers.delete(db=db, name=name)
+    await publish_invalidation(RATE_LIMIT_RULES_CACHE)
     return {"message": "Tier deleted"}
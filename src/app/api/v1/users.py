@@ -4,11 +4,12 @@ from fastapi import APIRouter, Depends, Request
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.dependencies import get_current_superuser, get_current_user
+from ...api.dependencies import AUTH_USER_CACHE, get_current_superuser, get_current_user
 from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import DuplicateValueException, ForbiddenException, NotFoundException
 # from ...core.security import blacklist_token, get_password_hash, oauth2_scheme
 from ...core.security import blacklist_token, get_password_hash
+from ...core.utils.local_cache import publish_invalidation
 from ...crud.crud_rate_limit import crud_rate_limits
 from ...crud.crud_tier import crud_tiers
 from ...crud.crud_users import crud_users
@@ -98,6 +99,7 @@ async def patch_user(
             raise DuplicateValueException("Email is already registered")
 
     await crud_users.update(db=db, object=values, username=username)
+    await publish_invalidation(AUTH_USER_CACHE)
     return {"message": "User updated"}
 
 
@@ -123,6 +125,7 @@ async def erase_user(
         await blacklist_token(token=token, db=db)
 
     await crud_users.delete(db=db, username=username)
+    await publish_invalidation(AUTH_USER_CACHE)
     return {"message": "User deleted"}
 
 # @router.delete("/user/{username}")
@@ -163,6 +166,7 @@ async def erase_db_user(
         await blacklist_token(token=token, db=db)
 
     await crud_users.db_delete(db=db, username=username)
+    await publish_invalidation(AUTH_USER_CACHE)
     return {"message": "User deleted from the database"}
 
 # @router.delete("/db_user/{username}", dependencies=[Depends(get_current_superuser)])
@@ -241,4 +245,5 @@ async def patch_user_tier(
         raise NotFoundException("Tier not found")
 
     await crud_users.update(db=db, object=values, username=username)
+    await publish_invalidation(AUTH_USER_CACHE)
     return {"message": f"User {db_user['name']} Tier updated"}
@@ -65,6 +65,13 @@ class PostgresSettings(DatabaseSettings):
     POSTGRES_URL: str | None = config("POSTGRES_URL", default=None)
 
 
+class WorkerDatabaseSettings(BaseSettings):
+    WORKER_DB_POOL_SIZE: int = config("WORKER_DB_POOL_SIZE", default=5)
+    WORKER_DB_MAX_OVERFLOW: int = config("WORKER_DB_MAX_OVERFLOW", default=5)
+    WORKER_DB_POOL_TIMEOUT: float = config("WORKER_DB_POOL_TIMEOUT", default=10.0)
+    WORKER_DB_POOL_RECYCLE: int = config("WORKER_DB_POOL_RECYCLE", default=1800)
+
+
 class FirstUserSettings(BaseSettings):
     ADMIN_NAME: str = config("ADMIN_NAME", default="admin")
     ADMIN_EMAIL: str = config("ADMIN_EMAIL", default="admin@admin.com")
@@ -82,6 +89,15 @@ class RedisCacheSettings(BaseSettings):
     REDIS_CACHE_URL: str = f"redis://{REDIS_CACHE_HOST}:{REDIS_CACHE_PORT}"
 
 
+class LocalCacheSettings(BaseSettings):
+    AGENT_KNOWLEDGE_CACHE_TTL: int = config("AGENT_KNOWLEDGE_CACHE_TTL", default=300)
+    FUNCTION_TOOL_CACHE_TTL: int = config("FUNCTION_TOOL_CACHE_TTL", default=300)
+    AUTH_USER_CACHE_TTL: int = config("AUTH_USER_CACHE_TTL", default=30)
+    RATE_LIMIT_RULES_CACHE_TTL: int = config("RATE_LIMIT_RULES_CACHE_TTL", default=300)
+    SIP_ROUTE_CACHE_TTL: int = config("SIP_ROUTE_CACHE_TTL", default=300)
+    TOKEN_BLACKLIST_NEGATIVE_TTL: int = config("TOKEN_BLACKLIST_NEGATIVE_TTL", default=30)
+
+
 class ClientSideCacheSettings(BaseSettings):
     CLIENT_CACHE_MAX_AGE: int = config("CLIENT_CACHE_MAX_AGE", default=60)
 
@@ -100,14 +116,35 @@ class RedisRateLimiterSettings(BaseSettings):
 class DefaultRateLimitSettings(BaseSettings):
     DEFAULT_RATE_LIMIT_LIMIT: int = config("DEFAULT_RATE_LIMIT_LIMIT", default=10)
     DEFAULT_RATE_LIMIT_PERIOD: int = config("DEFAULT_RATE_LIMIT_PERIOD", default=3600)
+    # Additional per-client-IP limit for authenticated requests, checked with the user limit; 0 disables it
+    IP_RATE_LIMIT_LIMIT: int = config("IP_RATE_LIMIT_LIMIT", default=0)
+    IP_RATE_LIMIT_PERIOD: int = config("IP_RATE_LIMIT_PERIOD", default=3600)
 
 
 class LiveKitSettings(BaseSettings):
     LIVEKIT_HOST: str = config("LIVEKIT_URL")
     LIVEKIT_API_KEY: str = config("LIVEKIT_API_KEY")
     LIVEKIT_API_SECRET: str = config("LIVEKIT_API_SECRET")
-    LIVEKIT_ENABLE_WORKER: bool = config("LIVEKIT_ENABLE_WORKER", default=True)
+    # Run a voice worker inside the API process (local development only)
+    LIVEKIT_ENABLE_WORKER: bool = config("LIVEKIT_ENABLE_WORKER", default=False)
     LIVEKIT_SIP_HOST: str = config("LIVEKIT_SIP_HOST")  # Added this line
+    LIVEKIT_MAX_JOBS_PER_WORKER: int = config("LIVEKIT_MAX_JOBS_PER_WORKER", default=10)
+    LIVEKIT_LOAD_THRESHOLD: float = config("LIVEKIT_LOAD_THRESHOLD", default=0.75)
+    LIVEKIT_NUM_IDLE_PROCESSES: int = config("LIVEKIT_NUM_IDLE_PROCESSES", default=3)
+    LIVEKIT_DRAIN_TIMEOUT: int = config("LIVEKIT_DRAIN_TIMEOUT", default=1800)
+    # "process" isolates each job; "thread" runs jobs side by side sharing loaded models
+    LIVEKIT_JOB_EXECUTOR: str = config("LIVEKIT_JOB_EXECUTOR", default="process")
+    LIVEKIT_TURN_DETECTOR_ENABLED: bool = config("LIVEKIT_TURN_DETECTOR_ENABLED", default=False)
+    # How long a handled webhook event ID is remembered, to acknowledge retries
+    LIVEKIT_WEBHOOK_EVENT_TTL: int = config("LIVEKIT_WEBHOOK_EVENT_TTL", default=86400)
+    # Webhooks are queued in a Redis stream and applied by the arq worker
+    LIVEKIT_WEBHOOK_STREAM_MAXLEN: int = config("LIVEKIT_WEBHOOK_STREAM_MAXLEN", default=100000)
+    LIVEKIT_WEBHOOK_BATCH_SIZE: int = config("LIVEKIT_WEBHOOK_BATCH_SIZE", default=50)
+    LIVEKIT_WEBHOOK_BLOCK_MS: int = config("LIVEKIT_WEBHOOK_BLOCK_MS", default=5000)
+    LIVEKIT_WEBHOOK_CLAIM_IDLE_MS: int = config("LIVEKIT_WEBHOOK_CLAIM_IDLE_MS", default=60000)
+    LIVEKIT_WEBHOOK_MAX_DELIVERIES: int = config("LIVEKIT_WEBHOOK_MAX_DELIVERIES", default=5)
+    # A caller joining without a call SID is matched to inbound calls at most this old (seconds)
+    LIVEKIT_CALL_JOIN_WINDOW: int = config("LIVEKIT_CALL_JOIN_WINDOW", default=300)
 
 class LLMSettings(BaseSettings):
     CARTESIA_API_KEY: str = config("CARTESIA_API_KEY", default="")
@@ -118,9 +155,52 @@ class LLMSettings(BaseSettings):
     UPLIFT_API_KEY: str = config("UPLIFT_API_KEY", default="")
 
 
+class ProviderPrewarmSettings(BaseSettings):
+    # Open TTS/STT connections when a job starts, before the caller joins
+    PROVIDER_PREWARM_ENABLED: bool = config("PROVIDER_PREWARM_ENABLED", default=True)
+
+
+class FunctionExecutorSettings(BaseSettings):
+    FUNCTION_HTTP_TIMEOUT: float = config("FUNCTION_HTTP_TIMEOUT", default=30.0)
+    FUNCTION_HTTP_CONNECT_TIMEOUT: float = config("FUNCTION_HTTP_CONNECT_TIMEOUT", default=5.0)
+    FUNCTION_HTTP_MAX_CONNECTIONS: int = config("FUNCTION_HTTP_MAX_CONNECTIONS", default=100)
+    FUNCTION_HTTP_MAX_CONNECTIONS_PER_HOST: int = config("FUNCTION_HTTP_MAX_CONNECTIONS_PER_HOST", default=10)
+    FUNCTION_HTTP_KEEPALIVE_EXPIRY: float = config("FUNCTION_HTTP_KEEPALIVE_EXPIRY", default=60.0)
+    FUNCTION_HTTP2: bool = config("FUNCTION_HTTP2", default=True)
+    FUNCTION_RESPONSE_CACHE_MAXSIZE: int = config("FUNCTION_RESPONSE_CACHE_MAXSIZE", default=1024)
+    FUNCTION_PARALLEL_CALLS_ENABLED: bool = config("FUNCTION_PARALLEL_CALLS_ENABLED", default=True)
+    FUNCTION_TURN_DEADLINE: float = config("FUNCTION_TURN_DEADLINE", default=8.0)
+    FUNCTION_FILLER_DELAY: float = config("FUNCTION_FILLER_DELAY", default=0.6)
+
+
 class QdrantSettings(BaseSettings):
     QDRANT_API_KEY: str = config("QDRANT_API_KEY")
     QDRANT_URL: str = config("QDRANT_URL")
+    QDRANT_PREFER_GRPC: bool = config("QDRANT_PREFER_GRPC", default=False)
+    QDRANT_GRPC_PORT: int = config("QDRANT_GRPC_PORT", default=6334)
+    QDRANT_MAX_CONNECTIONS: int = config("QDRANT_MAX_CONNECTIONS", default=20)
+
+class RAGSettings(BaseSettings):
+    RAG_SEARCH_TIMEOUT: float = config("RAG_SEARCH_TIMEOUT", default=1.5)
+    EMBEDDING_CACHE_MAXSIZE: int = config("EMBEDDING_CACHE_MAXSIZE", default=2048)
+    EMBEDDING_CACHE_TTL: int = config("EMBEDDING_CACHE_TTL", default=86400)
+    EMBEDDING_BATCH_TOKENS: int = config("EMBEDDING_BATCH_TOKENS", default=50000)
+    EMBEDDING_MAX_CONCURRENCY: int = config("EMBEDDING_MAX_CONCURRENCY", default=4)
+    EMBEDDING_MAX_RETRIES: int = config("EMBEDDING_MAX_RETRIES", default=5)
+
+
+class IngestionSettings(BaseSettings):
+    # Must be shared between the API and the arq worker
+    INGESTION_UPLOAD_DIR: str = config("INGESTION_UPLOAD_DIR", default="/tmp/kb-uploads")
+    INGESTION_MAX_UPLOAD_SIZE: int = config("INGESTION_MAX_UPLOAD_SIZE", default=50 * 1024 * 1024)
+    INGESTION_JOB_TIMEOUT: int = config("INGESTION_JOB_TIMEOUT", default=1800)
+    # Documents not advanced for this long (seconds) are failed by the worker's sweep
+    INGESTION_STALE_AFTER: int = config("INGESTION_STALE_AFTER", default=3600)
+    EXTRACTION_MAX_WORKERS: int = config("EXTRACTION_MAX_WORKERS", default=2)
+    EXTRACTION_TIMEOUT: float = config("EXTRACTION_TIMEOUT", default=300.0)
+    EXTRACTION_MEMORY_LIMIT_MB: int = config("EXTRACTION_MEMORY_LIMIT_MB", default=2048)
+    EXTRACTION_PDF_PAGE_BATCH: int = config("EXTRACTION_PDF_PAGE_BATCH", default=20)
+
 
 class TwilioSettings(BaseSettings):
     TWILIO_ACCOUNT_SID: str = config("TWILIO_ACCOUNT_SID")
@@ -135,6 +215,10 @@ class S3Settings(BaseSettings):
 class SIPSettings(BaseSettings):
     LIVEKIT_SIP_INBOUND_USERNAME: str = config("LIVEKIT_SIP_INBOUND_USERNAME")  # Added this line
     LIVEKIT_SIP_INBOUND_PASSWORD: str = config("LIVEKIT_SIP_INBOUND_PASSWORD")  # Added this line
+    CALL_RECORD_FLUSH_INTERVAL: float = config("CALL_RECORD_FLUSH_INTERVAL", default=1.0)
+    CALL_RECORD_BATCH_SIZE: int = config("CALL_RECORD_BATCH_SIZE", default=100)
+    CALL_RECORD_QUEUE_MAXSIZE: int = config("CALL_RECORD_QUEUE_MAXSIZE", default=10000)
+    CALL_RECORD_MAX_ATTEMPTS: int = config("CALL_RECORD_MAX_ATTEMPTS", default=3)
 
 class EnvironmentOption(Enum):
     LOCAL = "local"
@@ -159,10 +243,12 @@ class CORSSettings(BaseSettings):
 class Settings(
     AppSettings,
     PostgresSettings,
+    WorkerDatabaseSettings,
     CryptSettings,
     FirstUserSettings,
     TestSettings,
     RedisCacheSettings,
+    LocalCacheSettings,
     ClientSideCacheSettings,
     RedisQueueSettings,
     RedisRateLimiterSettings,
@@ -170,7 +256,11 @@ class Settings(
     EnvironmentSettings,
     LiveKitSettings,
     LLMSettings,
+    ProviderPrewarmSettings,
+    FunctionExecutorSettings,
     QdrantSettings,
+    RAGSettings,
+    IngestionSettings,
     S3Settings,
     TwilioSettings,
     CORSSettings,
@@ -0,0 +1,4 @@
+class EmbeddingError(Exception):
+    def __init__(self, message: str = "Could not generate embeddings.") -> None:
+        self.message = message
+        super().__init__(self.message)
@@ -2,7 +2,8 @@ import asyncio
 import logging
 from typing import Optional
 
-from livekit.agents import JobProcess, Worker, WorkerOptions
+import psutil
+from livekit.agents import JobExecutorType, JobProcess, Worker, WorkerOptions
 from ..core.config import settings
 
 logger = logging.getLogger("livekit-worker")
@@ -31,36 +32,53 @@ def normalize_livekit_url(url: str) -> str:
     
     return f"wss://{url}"
 
-async def initialize_worker() -> None:
-    """Initialize the LiveKit worker process."""
-    global worker_process, worker
-    
-    # Import your worker configuration module
+def compute_worker_load(worker: Worker) -> float:
+    """
+    Load reported to LiveKit: the larger of job-slot usage and CPU usage.
+
+    LiveKit stops dispatching jobs to a worker once this reaches ``load_threshold``.
+    """
+    job_load = len(worker.active_jobs) / max(1, settings.LIVEKIT_MAX_JOBS_PER_WORKER)
+    cpu_load = psutil.cpu_percent() / 100
+    return min(1.0, max(job_load, cpu_load))
+
+def build_worker_options() -> WorkerOptions:
+    """Worker options shared by the standalone voice worker and the in-process worker."""
     from ..workers.voice_agent import entrypoint, prewarm
-    
-    logger.info("Initializing LiveKit worker...")
-    
-    # Initialize worker with the configured options
-    options = WorkerOptions(
+
+    return WorkerOptions(
         entrypoint_fnc=entrypoint,
         prewarm_fnc=prewarm,
+        load_fnc=compute_worker_load,
+        load_threshold=settings.LIVEKIT_LOAD_THRESHOLD,
+        num_idle_processes=settings.LIVEKIT_NUM_IDLE_PROCESSES,
+        job_executor_type=(
+            JobExecutorType.THREAD if settings.LIVEKIT_JOB_EXECUTOR == "thread" else JobExecutorType.PROCESS
+        ),
+        drain_timeout=settings.LIVEKIT_DRAIN_TIMEOUT,
         ws_url=normalize_livekit_url(settings.LIVEKIT_HOST),
         api_key=settings.LIVEKIT_API_KEY,
         api_secret=settings.LIVEKIT_API_SECRET,
         # Set agent_name to empty and specify other options for automatic dispatch
         agent_name="",  # Empty string means automatic dispatch
-        job_memory_warn_mb=500,  # Empty string means automatic dispatch
+        job_memory_warn_mb=500,
         job_memory_limit_mb=1024,
     )
+
+async def initialize_worker() -> None:
+    """
+    Initialize a LiveKit worker inside the API process.
+
+    Only meant for local development; deployments run the standalone voice worker
+    (``python -m src.app.workers.run start``) so calls don't compete with HTTP traffic.
+    """
+    global worker_process, worker
     
+    logger.info("Initializing in-process LiveKit worker...")
     
-    # Create the worker process and worker
+    # Create the worker process and worker; the worker prewarms its own job processes
     worker_process = JobProcess(user_arguments=None)
-    worker = Worker(options, devmode=True, loop=asyncio.get_event_loop())
-    
-    # Prewarm the worker to initialize components that can be reused
-    if prewarm:
-        prewarm(worker_process)
+    worker = Worker(build_worker_options(), devmode=True, loop=asyncio.get_event_loop())
     
     logger.info("LiveKit worker initialized successfully")
 
@@ -1,6 +1,9 @@
+import asyncio
 import logging
 from typing import Optional, List, Dict, Any
-from qdrant_client import QdrantClient, models
+
+import httpx
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
 from ..core.config import settings
@@ -15,6 +18,9 @@ class QdrantManager:
         if cls._instance is None:
             cls._instance = super(QdrantManager, cls).__new__(cls)
             cls._instance._client = None
+            cls._instance._async_clients = {}
+            cls._instance._url = None
+            cls._instance._api_key = None
             cls._instance._initialized = False
         return cls._instance
 
@@ -35,6 +41,8 @@ class QdrantManager:
                 api_key=qdrant_api_key if qdrant_api_key else None,
                 timeout=60
             )
+            self._url = qdrant_url
+            self._api_key = qdrant_api_key if qdrant_api_key else None
             self._initialized = True
         except Exception as e:
             logger.error(f"Failed to connect to Qdrant: {e}")
@@ -47,6 +55,43 @@ class QdrantManager:
             self.initialize()
         return self._client
 
+    @property
+    def async_client(self) -> AsyncQdrantClient:
+        """
+        Get the async Qdrant client for the running event loop.
+
+        Clients are created per loop because their pooled connections cannot be
+        shared across loops (the API process and each voice job run their own).
+        """
+        if not self._initialized:
+            self.initialize()
+
+        loop = asyncio.get_running_loop()
+        for stale_loop in [l for l in self._async_clients if l.is_closed()]:
+            del self._async_clients[stale_loop]
+
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncQdrantClient(
+                url=self._url,
+                api_key=self._api_key,
+                timeout=60,
+                prefer_grpc=settings.QDRANT_PREFER_GRPC,
+                grpc_port=settings.QDRANT_GRPC_PORT,
+                limits=httpx.Limits(
+                    max_connections=settings.QDRANT_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.QDRANT_MAX_CONNECTIONS
+                )
+            )
+            self._async_clients[loop] = client
+        return client
+
+    async def close_async_client(self) -> None:
+        """Close the async client bound to the running event loop"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
     async def create_collection_if_not_exists(
         self, 
         collection_name: str,
@@ -55,12 +100,12 @@ class QdrantManager:
     ) -> bool:
         """Create a Qdrant collection if it doesn't exist, and creates the payload index."""
         try:
-            collections = self.client.get_collections().collections
+            collections = (await self.async_client.get_collections()).collections
             if any(c.name == collection_name for c in collections):
                 logger.info(f"Collection {collection_name} already exists")
                 return False
 
-            self.client.create_collection(
+            await self.async_client.create_collection(
                 collection_name=collection_name,
                 vectors_config=models.VectorParams(
                     size=vector_size,
@@ -70,7 +115,7 @@ class QdrantManager:
             logger.info(f"Created collection {collection_name}")
 
             # Create a payload index on the 'document_id' field.
-            self.client.create_payload_index(
+            await self.async_client.create_payload_index(
                 collection_name=collection_name,
                 field_name="document_id", # <-- ALSO CORRECTED HERE FOR CONSISTENCY
                 field_schema=models.PayloadSchemaType.KEYWORD,
@@ -91,7 +136,7 @@ class QdrantManager:
             logger.info(f"Attempting to delete points for document_id '{doc_id}' from collection '{collection_name}'")
             
             # Verify points to delete
-            points_before = self.client.scroll(
+            points_before = await self.async_client.scroll(
                 collection_name=collection_name,
                 scroll_filter=models.Filter(
                     must=[models.FieldCondition(key="document_id", match=models.MatchValue(value=doc_id))]  # Fixed key
@@ -99,7 +144,7 @@ class QdrantManager:
             )
             logger.info(f"Points found for deletion: {points_before}")
 
-            self.client.delete(
+            await self.async_client.delete(
                 collection_name=collection_name,
                 points_selector=models.FilterSelector(
                     filter=models.Filter(
@@ -116,7 +161,7 @@ class QdrantManager:
             logger.info(f"Successfully deleted points for document_id '{doc_id}' from collection '{collection_name}'")
 
             # Verify deletion
-            points_after = self.client.scroll(
+            points_after = await self.async_client.scroll(
                 collection_name=collection_name,
                 scroll_filter=models.Filter(
                     must=[models.FieldCondition(key="document_id", match=models.MatchValue(value=doc_id))]  # Fixed key
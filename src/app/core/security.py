@@ -1,3 +1,5 @@
+import hashlib
+import time
 from enum import Enum
 from datetime import UTC, datetime, timedelta
 from typing import Any, Literal
@@ -12,8 +14,12 @@ from sqlalchemy import select
 from ..crud.crud_users import crud_users
 from .config import settings
 from .db.crud_token_blacklist import crud_token_blacklist
+from .logger import logging
 from .schemas import TokenBlacklistCreate, TokenData
+from .utils import cache
+from .utils.local_cache import LocalCache, publish_invalidation
 
+logger = logging.getLogger(__name__)
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
@@ -23,6 +29,15 @@ REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 # CHANGED: Replaced OAuth2PasswordBearer with HTTPBearer
 security = HTTPBearer()
 
+# Blacklisted tokens are mirrored into the Redis cache until they expire. Redis may lose
+# keys (eviction, flush), so only a hit there is trusted; a miss is confirmed in Postgres
+# and remembered in-process for TOKEN_BLACKLIST_NEGATIVE_TTL seconds.
+TOKEN_BLACKLIST_PREFIX = "token-blacklist:"
+TOKEN_BLACKLIST_CACHE = "token-blacklist"
+_not_blacklisted = LocalCache(
+    TOKEN_BLACKLIST_CACHE, ttl=settings.TOKEN_BLACKLIST_NEGATIVE_TTL, maxsize=10000
+)
+
 class TokenType(str, Enum):
     ACCESS = "access"
     REFRESH = "refresh"
@@ -83,8 +98,7 @@ async def verify_token(token: str, expected_token_type: TokenType, db: AsyncSess
             return None
 
         # 🚨 Check if token is blacklisted
-        result = await db.execute(select(TokenBlacklist).where(TokenBlacklist.token == token))
-        if result.scalar_one_or_none():
+        if await is_token_blacklisted(token, db):
             return None  # token is blacklisted
 
         return TokenData(username_or_email=username_or_email)
@@ -124,6 +138,72 @@ async def verify_token(token: str, expected_token_type: TokenType, db: AsyncSess
 #         return None
 
 
+def _blacklist_key(token: str) -> str:
+    return TOKEN_BLACKLIST_PREFIX + hashlib.sha256(token.encode()).hexdigest()
+
+
+async def _mirror_blacklisted_token(token: str, expires_at: float) -> None:
+    ttl = int(expires_at - time.time()) + 1
+    if ttl > 0 and cache.client is not None:
+        try:
+            await cache.client.set(_blacklist_key(token), 1, ex=ttl)
+        except Exception as e:
+            logger.error(f"Failed to mirror blacklisted token to Redis: {e}")
+    # Other processes may remember this token as not blacklisted
+    await publish_invalidation(TOKEN_BLACKLIST_CACHE, _blacklist_key(token))
+
+
+async def is_token_blacklisted(token: str, db: AsyncSession) -> bool:
+    """Check the Redis mirror of the token blacklist, confirming misses in Postgres."""
+    key = _blacklist_key(token)
+    if cache.client is not None:
+        try:
+            if await cache.client.exists(key):
+                return True
+        except Exception as e:
+            logger.warning(f"Token blacklist lookup in Redis failed, using the database: {e}")
+
+    if _not_blacklisted.get(key):
+        return False
+
+    result = await db.execute(select(TokenBlacklist.expires_at).where(TokenBlacklist.token == token))
+    expires_at = result.scalar_one_or_none()
+    if expires_at is not None:
+        # Missing from the mirror, e.g. evicted: put it back
+        await _mirror_blacklisted_token(token, expires_at.timestamp())
+        return True
+
+    _not_blacklisted.set(key, True)
+    return False
+
+
+async def sync_token_blacklist(db: AsyncSession) -> int:
+    """Copy the unexpired token blacklist into Redis, so lookups after a Redis restart hit it.
+
+    Parameters
+    ----------
+    db: AsyncSession
+        Database session for performing database operations.
+
+    Returns
+    -------
+    int
+        Number of tokens mirrored.
+    """
+    if cache.client is None:
+        return 0
+
+    result = await db.execute(
+        select(TokenBlacklist.token, TokenBlacklist.expires_at).where(TokenBlacklist.expires_at > datetime.now())
+    )
+    rows = result.all()
+    async with cache.client.pipeline(transaction=False) as pipe:
+        for token, expires_at in rows:
+            pipe.set(_blacklist_key(token), 1, ex=max(1, int(expires_at.timestamp() - time.time()) + 1))
+        await pipe.execute()
+    return len(rows)
+
+
 async def blacklist_tokens(access_token: str, refresh_token: str, db: AsyncSession) -> None:
     """Blacklist both access and refresh tokens.
 
@@ -146,6 +226,7 @@ async def blacklist_tokens(access_token: str, refresh_token: str, db: AsyncSessi
                 expires_at=expires_at
             )
         )
+        await _mirror_blacklisted_token(token, payload.get("exp"))
 
 async def blacklist_token(token: str, db: AsyncSession) -> None:
     payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -157,6 +238,7 @@ async def blacklist_token(token: str, db: AsyncSession) -> None:
             expires_at=expires_at
         )
     )
+    await _mirror_blacklisted_token(token, payload.get("exp"))
 
 # from enum import Enum
 # from datetime import UTC, datetime, timedelta
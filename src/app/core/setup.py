@@ -31,7 +31,10 @@ from .config import (
 )
 from .db.database import Base
 from .db.database import async_engine as engine
+from .db.database import local_session
+from .security import sync_token_blacklist
 from .utils import cache, queue
+from .utils.local_cache import start_invalidation_listener, stop_invalidation_listener
 
 
 # -------------- database --------------
@@ -46,6 +49,16 @@ async def create_redis_cache_pool() -> None:
     cache.client = redis.Redis.from_pool(cache.pool)  # type: ignore
 
 
+async def sync_token_blacklist_cache() -> None:
+    try:
+        async with local_session() as db:
+            count = await sync_token_blacklist(db)
+        logger.info(f"Mirrored {count} blacklisted tokens to Redis")
+    except Exception as e:
+        # Token checks keep using Postgres until a sync succeeds
+        logger.error(f"Failed to sync the token blacklist to Redis: {e}")
+
+
 async def close_redis_cache_pool() -> None:
     await cache.client.aclose()  # type: ignore
 
@@ -104,6 +117,8 @@ def lifespan_factory(
         try:
             if isinstance(settings, RedisCacheSettings):
                 await create_redis_cache_pool()
+                await start_invalidation_listener()
+                await sync_token_blacklist_cache()
 
             if isinstance(settings, RedisQueueSettings):
                 await create_redis_queue_pool()
@@ -141,6 +156,7 @@ def lifespan_factory(
 
         finally:
             if isinstance(settings, RedisCacheSettings):
+                await stop_invalidation_listener()
                 await close_redis_cache_pool()
 
             if isinstance(settings, RedisQueueSettings):
@@ -159,6 +175,14 @@ def lifespan_factory(
                 except Exception as e:
                     logger.error(f"Error during LiveKit worker shutdown: {e}")
 
+            # Dispose the worker-helper engine bound to this process's event loop
+            from ..utils.db_utils import dispose_worker_engine
+            await dispose_worker_engine()
+
+            from ..core.qdrant_client import qdrant_manager
+            await qdrant_manager.close_async_client()
+            await cache.close_loop_redis_client()
+
     return lifespan
 
 
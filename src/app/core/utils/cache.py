@@ -1,3 +1,4 @@
+import asyncio
 import functools
 import json
 import re
@@ -9,11 +10,15 @@ from fastapi.encoders import jsonable_encoder
 from redis.asyncio import ConnectionPool, Redis
 
 
+from ..config import settings
 from ..exceptions.cache_exceptions import CacheIdentificationInferenceError, InvalidRequestError, MissingClientError
 
 pool: ConnectionPool | None = None
 client: Redis | None = None
 
+# Clients for event loops other than the API's (each voice job runs its own loop)
+_loop_clients: dict[asyncio.AbstractEventLoop, Redis] = {}
+
 
 def _infer_resource_id(kwargs: dict[str, Any], resource_id_type: type | tuple[type, ...]) -> int | str:
     """Infer the resource ID from a dictionary of keyword arguments.
@@ -342,3 +347,26 @@ def get_redis_client() -> Redis:
         raise Exception("Redis client not initialized. Call initialize first.")
     return client
 
+
+def get_loop_redis_client() -> Redis:
+    """Get a Redis cache client bound to the running event loop, creating it on first use.
+
+    Unlike ``client``, which only exists in the API process once the lifespan has run, this
+    works from any event loop, including voice job processes.
+    """
+    loop = asyncio.get_running_loop()
+    for stale_loop in [l for l in _loop_clients if l.is_closed()]:
+        del _loop_clients[stale_loop]
+
+    loop_client = _loop_clients.get(loop)
+    if loop_client is None:
+        loop_client = Redis.from_url(settings.REDIS_CACHE_URL)
+        _loop_clients[loop] = loop_client
+    return loop_client
+
+
+async def close_loop_redis_client() -> None:
+    """Close the Redis cache client bound to the running event loop, if any."""
+    loop_client = _loop_clients.pop(asyncio.get_running_loop(), None)
+    if loop_client is not None:
+        await loop_client.aclose()
@@ -0,0 +1,248 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from redis.asyncio import Redis
+
+from ..config import settings
+from . import cache
+
+logger = logging.getLogger("local-cache")
+
+INVALIDATION_CHANNEL = "local-cache:invalidate"
+
+_caches: dict[str, "LocalCache"] = {}
+_listener_tasks: dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+
+class LocalCache:
+    """Bounded in-process cache with per-entry TTL and cross-process invalidation.
+
+    Entries are keyed by ``str(key)``. When a ``loader`` is given, expired entries keep
+    being served while they are refreshed in the background, so callers on a hot path
+    only wait on the loader for keys that are not cached. Concurrent misses for a key
+    share one load.
+
+    Invalidated entries are dropped. Every invalidation bumps the key's generation, and
+    a load that started under an older generation is not stored, so a value read before
+    a change can never be cached after it.
+
+    Parameters
+    ----------
+    name: str
+        Unique cache name, used to route invalidation messages between processes.
+    ttl: float
+        Seconds an entry is considered fresh.
+    maxsize: int
+        Maximum number of entries; least recently used entries are evicted first.
+    loader: Callable[[str], Awaitable[Any]] | None
+        Coroutine function that loads the value for a key.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        maxsize: int = 1024,
+        loader: Callable[[str], Awaitable[Any]] | None = None,
+    ) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.loader = loader
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._refreshing: set[str] = set()
+        # Concurrent misses for a key share one load; tasks belong to one event loop
+        self._inflight: dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+        # Number of loads running per key, across loops
+        self._loading: dict[str, int] = {}
+        # Bumped by invalidations; the epoch covers invalidations of the whole cache
+        self._epoch = 0
+        self._generations: dict[str, int] = {}
+        _caches[name] = self
+
+    def get(self, key: Any) -> Any | None:
+        """Return the fresh value for ``key``, or None if it is missing or expired."""
+        entry = self._entries.get(str(key))
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(str(key))
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        self._entries[str(key)] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(str(key))
+        while len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            self._forget_generation(evicted)
+
+    async def get_or_load(self, key: Any) -> Any:
+        """Return the cached value for ``key``, loading it only if it is not cached."""
+        key = str(key)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if entry[0] < time.monotonic():
+                self._schedule_refresh(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        if self.loader is None:
+            return None
+
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get((loop, key))
+        if task is None:
+            task = loop.create_task(self._load(key, self._generation(key)))
+            self._inflight[(loop, key)] = task
+            task.add_done_callback(lambda t, k=(loop, key): self._inflight.pop(k, None) if self._inflight.get(k) is t else None)
+        # Shielded, so a cancelled caller does not cancel the load other callers wait on
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Any | None = None) -> None:
+        """Invalidate one key, or every key when ``key`` is None."""
+        if key is None:
+            self._epoch += 1
+            self._generations.clear()
+            self._entries.clear()
+            self._inflight.clear()
+            return
+
+        k = str(key)
+        self._entries.pop(k, None)
+        for inflight_key in [ik for ik in self._inflight if ik[1] == k]:
+            # Later callers start a new load instead of joining one that may be stale
+            del self._inflight[inflight_key]
+        if k in self._loading:
+            self._generations[k] = self._generations.get(k, 0) + 1
+        else:
+            # Nothing is loading this key, so no result can be stale
+            self._generations.pop(k, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {"name": self.name, "size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _generation(self, key: str) -> tuple[int, int]:
+        return self._epoch, self._generations.get(key, 0)
+
+    def _forget_generation(self, key: str) -> None:
+        if key not in self._loading:
+            self._generations.pop(key, None)
+
+    async def _load(self, key: str, generation: tuple[int, int]) -> Any:
+        self._loading[key] = self._loading.get(key, 0) + 1
+        try:
+            value = await self.loader(key)  # type: ignore[misc]
+            if self._generation(key) == generation:
+                self.set(key, value)
+            return value
+        finally:
+            self._loading[key] -= 1
+            if not self._loading[key]:
+                del self._loading[key]
+                if key not in self._entries:
+                    self._generations.pop(key, None)
+
+    def _schedule_refresh(self, key: str) -> None:
+        if self.loader is None or key in self._refreshing:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._entries.pop(key, None)
+            return
+        self._refreshing.add(key)
+        asyncio.create_task(self._refresh(key))
+
+    async def _refresh(self, key: str) -> None:
+        try:
+            await self._load(key, self._generation(key))
+        except Exception as e:
+            logger.warning(f"Failed to refresh {self.name}[{key}], serving stale value: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+
+async def publish_invalidation(name: str, key: Any | None = None) -> None:
+    """Invalidate ``key`` (or the whole cache) in this process and, via Redis pub/sub, in all others."""
+    local = _caches.get(name)
+    if local is not None:
+        local.invalidate(key)
+
+    if cache.client is None:
+        return
+    message = json.dumps({"cache": name, "key": None if key is None else str(key)})
+    try:
+        await cache.client.publish(INVALIDATION_CHANNEL, message)
+    except Exception as e:
+        logger.error(f"Failed to publish invalidation for {name}: {e}")
+
+
+def _dispatch(data: bytes | str) -> None:
+    try:
+        message = json.loads(data)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring malformed invalidation message: {data!r}")
+        return
+    local = _caches.get(message.get("cache"))
+    if local is not None:
+        local.invalidate(message.get("key"))
+
+
+async def _listen(redis_url: str) -> None:
+    client = Redis.from_url(redis_url)
+    pubsub = client.pubsub()
+    disconnected = False
+    try:
+        while True:
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                if disconnected:
+                    # Invalidations may have been missed while disconnected; drop everything
+                    # once per outage, after reconnecting
+                    logger.info("Cache invalidation listener reconnected, invalidating local caches")
+                    for local in _caches.values():
+                        local.invalidate()
+                    disconnected = False
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        _dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not disconnected:
+                    logger.warning(f"Cache invalidation listener disconnected, retrying: {e}")
+                    disconnected = True
+                await asyncio.sleep(1.0)
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
+
+
+async def start_invalidation_listener(redis_url: str | None = None) -> None:
+    """Subscribe the running event loop to cache invalidation messages."""
+    loop = asyncio.get_running_loop()
+    task = _listener_tasks.get(loop)
+    if task is not None and not task.done():
+        return
+    _listener_tasks[loop] = asyncio.create_task(_listen(redis_url or settings.REDIS_CACHE_URL))
+
+
+async def stop_invalidation_listener() -> None:
+    task = _listener_tasks.pop(asyncio.get_running_loop(), None)
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
@@ -1,19 +1,122 @@
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from typing import Optional
 
 from redis.asyncio import ConnectionPool, Redis
+from redis.commands.core import AsyncScript
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...core.config import settings
+from ...core.db.database import local_session
 from ...core.logger import logging
+from ...models.rate_limit import RateLimit
+from ...models.tier import Tier
 from ...schemas.rate_limit import sanitize_path
+from .local_cache import LocalCache
 
 logger = logging.getLogger(__name__)
 
+# Name of the in-process table of tiers and per-path limits; invalidated by the tier and
+# rate limit endpoints
+RATE_LIMIT_RULES_CACHE = "rate-limit-rules"
+
+
+@dataclass
+class RateLimitRules:
+    """Snapshot of every tier and per-path rate limit, loaded in one go."""
+
+    tiers: dict[int, str] = field(default_factory=dict)
+    limits: dict[tuple[int, str], tuple[int, int]] = field(default_factory=dict)
+    loaded_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+    def resolve(self, tier_id: int | None, path: str) -> tuple[int, int] | None:
+        """(limit, period) for a tier and sanitized path, or None to use the default."""
+        if tier_id is None:
+            return None
+        return self.limits.get((tier_id, path))
+
+
+async def load_rate_limit_rules(_key: str = "") -> RateLimitRules:
+    async with local_session() as db:
+        tiers = await db.execute(select(Tier.id, Tier.name))
+        limits = await db.execute(select(RateLimit.tier_id, RateLimit.path, RateLimit.limit, RateLimit.period))
+
+        rules = RateLimitRules(
+            tiers={tier_id: name for tier_id, name in tiers.all()},
+            limits={(tier_id, path): (limit, period) for tier_id, path, limit, period in limits.all()},
+        )
+    logger.info(f"Loaded {len(rules.limits)} rate limits for {len(rules.tiers)} tiers")
+    return rules
+
+
+rate_limit_rules = LocalCache(
+    RATE_LIMIT_RULES_CACHE, ttl=settings.RATE_LIMIT_RULES_CACHE_TTL, maxsize=1, loader=load_rate_limit_rules
+)
+
+
+# Generic cell rate algorithm: the key holds the theoretical arrival time (TAT) of the next
+# request in microseconds. Up to `limit` requests fit in any `period`, with no burst at window
+# boundaries, in a single key per client and path. Time comes from Redis so app servers
+# with skewed clocks agree. TAT arithmetic stays in whole microseconds (exact in Lua numbers),
+# with the emission interval rounded down so rounding never eats into the quota; only the
+# returned durations are rounded, to milliseconds.
+#
+# KEYS[1]: counter key
+# ARGV: limit, period in seconds
+# Returns: {allowed, remaining, reset_after_ms, retry_after_ms}
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2]) * 1000000
+local interval = math.max(1, math.floor(period / limit))
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, 0, math.ceil((tat - now) / 1000), math.ceil((allow_at - now) / 1000)}
+end
+
+redis.call('SET', KEYS[1], string.format('%.0f', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+return {1, math.floor((now - allow_at) / interval), math.ceil((new_tat - now) / 1000), 0}
+"""
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    """Seconds until the full quota is available again."""
+    retry_after: float
+    """Seconds until the next request is allowed; 0 when this one was."""
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+        return headers
+
 
 class RateLimiter:
     _instance: Optional["RateLimiter"] = None
     pool: Optional[ConnectionPool] = None
     client: Optional[Redis] = None
+    script: Optional[AsyncScript] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -26,6 +129,8 @@ class RateLimiter:
         if instance.pool is None:
             instance.pool = ConnectionPool.from_url(redis_url)
             instance.client = Redis(connection_pool=instance.pool)
+            # Runs with EVALSHA, loading the script on the first NOSCRIPT reply
+            instance.script = instance.client.register_script(GCRA_SCRIPT)
 
     @classmethod
     def get_client(cls) -> Redis:
@@ -35,27 +140,44 @@ class RateLimiter:
             raise Exception("Redis client is not initialized.")
         return instance.client
 
-    async def is_rate_limited(self, db: AsyncSession, user_id: int, path: str, limit: int, period: int) -> bool:
-        client = self.get_client()
-        current_timestamp = int(datetime.now(UTC).timestamp())
-        window_start = current_timestamp - (current_timestamp % period)
+    @staticmethod
+    def _key(user_id: int | str, path: str) -> str:
+        return f"ratelimit:{user_id}:{sanitize_path(path)}"
 
-        sanitized_path = sanitize_path(path)
-        key = f"ratelimit:{user_id}:{sanitized_path}:{window_start}"
-
-        try:
-            current_count = await client.incr(key)
-            if current_count == 1:
-                await client.expire(key, period)
+    async def check(self, user_id: int | str, path: str, limit: int, period: int) -> RateLimitResult:
+        """Count a request against one limit and return the quota left."""
+        return (await self.check_many([(user_id, path, limit, period)]))[0]
 
-            if current_count > limit:
-                return True
+    async def check_many(self, checks: Sequence[tuple[int | str, str, int, int]]) -> list[RateLimitResult]:
+        """Count a request against several (user_id, path, limit, period) limits in one round trip.
 
+        Each limit is evaluated atomically on its own, so a request rejected by one limit
+        still counts against the others.
+        """
+        client = self.get_client()
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for user_id, path, limit, period in checks:
+                    await self.script(keys=[self._key(user_id, path)], args=[limit, period], client=pipe)  # type: ignore[misc]
+                replies = await pipe.execute()
         except Exception as e:
-            logger.exception(f"Error checking rate limit for user {user_id} on path {path}: {e}")
+            logger.exception(f"Error checking rate limits {checks}: {e}")
             raise e
 
-        return False
+        return [
+            RateLimitResult(
+                allowed=bool(allowed),
+                limit=limit,
+                remaining=int(remaining),
+                reset_after=reset_after_ms / 1000,
+                retry_after=retry_after_ms / 1000,
+            )
+            for (_, _, limit, _), (allowed, remaining, reset_after_ms, retry_after_ms) in zip(checks, replies)
+        ]
+
+    async def is_rate_limited(self, db: AsyncSession, user_id: int, path: str, limit: int, period: int) -> bool:
+        result = await self.check(user_id=user_id, path=path, limit=limit, period=period)
+        return not result.allowed
 
 
 rate_limiter = RateLimiter()
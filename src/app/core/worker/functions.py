@@ -1,9 +1,14 @@
 import asyncio
 import logging
+import uuid
 
 import uvloop
 from arq.worker import Worker
 
+from ..config import settings
+from ..db.database import local_session
+from ..qdrant_client import qdrant_manager
+
 asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -15,10 +20,52 @@ async def sample_background_task(ctx: Worker, name: str) -> str:
     return f"Task {name} is complete!"
 
 
+async def ingest_document(ctx: Worker, document_id: str, job_id: str, file_path: str) -> bool:
+    """Extract, embed and index an uploaded knowledge base document."""
+    from ...services.document_processor import document_processor
+
+    async with local_session() as db:
+        return await document_processor.ingest_file(
+            db=db, document_id=uuid.UUID(document_id), job_id=uuid.UUID(job_id), file_path=file_path
+        )
+
+
+async def fail_stale_documents(ctx: Worker) -> int:
+    """Fail documents whose ingestion job was lost, so they do not stay in progress."""
+    from ...services.document_processor import document_processor
+
+    async with local_session() as db:
+        return await document_processor.fail_stale_documents(db)
+
+
+async def delete_unused_snapshots(ctx: Worker) -> int:
+    """Delete knowledge base snapshots that no connection references any more."""
+    from ...crud.crud_connections import crud_connections
+
+    async with local_session() as db:
+        return await crud_connections.delete_unused_snapshots(db)
+
+
 # -------- base functions --------
 async def startup(ctx: Worker) -> None:
+    from ...services.livekit_webhooks import webhook_consumer
+
+    qdrant_manager.initialize(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
+    # Apply queued LiveKit webhooks alongside the arq jobs
+    ctx["webhook_consumer"] = asyncio.create_task(webhook_consumer.run(ctx["redis"]))
     logging.info("Worker Started")
 
 
 async def shutdown(ctx: Worker) -> None:
+    from ...services.extraction import extraction_pool
+
+    extraction_pool.shutdown()
+    consumer_task = ctx.get("webhook_consumer")
+    if consumer_task is not None:
+        consumer_task.cancel()
+        try:
+            await consumer_task
+        except asyncio.CancelledError:
+            pass
+    await qdrant_manager.close_async_client()
     logging.info("Worker end")
@@ -1,14 +1,23 @@
+from arq import cron, func
 from arq.connections import RedisSettings
 
 from ...core.config import settings
-from .functions import sample_background_task, shutdown, startup
+from .functions import delete_unused_snapshots, fail_stale_documents, ingest_document, sample_background_task, shutdown, startup
 
 REDIS_QUEUE_HOST = settings.REDIS_QUEUE_HOST
 REDIS_QUEUE_PORT = settings.REDIS_QUEUE_PORT
 
 
 class WorkerSettings:
-    functions = [sample_background_task]
+    functions = [
+        sample_background_task,
+        # A failed ingestion is recorded on the document; it is re-run by uploading again
+        func(ingest_document, timeout=settings.INGESTION_JOB_TIMEOUT, max_tries=1),
+    ]
+    cron_jobs = [
+        cron(fail_stale_documents, minute=set(range(0, 60, 5)), run_at_startup=True),
+        cron(delete_unused_snapshots, minute=17),
+    ]
     redis_settings = RedisSettings(host=REDIS_QUEUE_HOST, port=REDIS_QUEUE_PORT)
     on_startup = startup
     on_shutdown = shutdown
@@ -733,7 +733,7 @@ from ..models.document import KnowledgeBase, Document, AgentKnowledgeMapping
 from ..schemas.document import KnowledgeBaseWithDocsRead, DocumentRead, DocumentWithContentRead
 from sqlalchemy.orm import joinedload
 
-from ..models.agent_profile import AgentProfile
+from ..models.agent_profile import AgentProfile, AgentReferenceLookup
 from ..models import LLMProvider, TTSProvider, STTProvider
 from ..schemas.agent_profile import (
     AgentProfileCreate,
@@ -742,10 +742,13 @@ from ..schemas.agent_profile import (
     AgentProfileUpdateInternal,
     AgentProfileDelete,
     AgentProfileInDB,
+    AgentRuntimeSnapshot,
     ProviderBase,
     TTSOptions,
     STTOptions
 )
+from ..schemas.document import KnowledgeBaseCollection
+from ..schemas.function_tool import FunctionToolRead
 
 logger = logging.getLogger(__name__)
 class CRUDAgentProfileExtended(FastCRUD[
@@ -971,6 +974,61 @@ class CRUDAgentProfileExtended(FastCRUD[
             return self._construct_profile(profile)
         return None
 
+    async def get_runtime_snapshot(
+        self,
+        db: AsyncSession,
+        *,
+        id: Optional[uuid.UUID] = None,
+        room_id: Optional[uuid.UUID] = None
+    ) -> Optional[AgentRuntimeSnapshot]:
+        """
+        Load an agent's profile, providers, function tools, knowledge base collections and
+        SIP trunk mappings in one round trip per collection.
+
+        The agent is resolved by ``id``, by the agent reference of ``room_id``, or falls back
+        to the default profile when neither is given.
+        """
+        stmt = (
+            select(AgentProfile)
+            .options(
+                # Many-to-one providers join into the profile row; each collection is loaded
+                # with its own IN query instead of multiplying the joined rows
+                joinedload(AgentProfile.llm_provider),
+                joinedload(AgentProfile.tts_provider),
+                joinedload(AgentProfile.stt_provider),
+                selectinload(AgentProfile.function_tools),
+                selectinload(AgentProfile.knowledge_bases),
+                selectinload(AgentProfile.inbound_sip_mappings),
+                selectinload(AgentProfile.outbound_sip_mappings),
+            )
+            .where(AgentProfile.is_deleted == False)
+        )
+        if id is not None:
+            stmt = stmt.where(AgentProfile.id == id)
+        elif room_id is not None:
+            stmt = stmt.join(
+                AgentReferenceLookup, AgentReferenceLookup.agentid == AgentProfile.id
+            ).where(AgentReferenceLookup.roomid == room_id)
+        else:
+            stmt = stmt.where(AgentProfile.is_default == True)
+
+        result = await db.execute(stmt)
+        profile = result.unique().scalars().first()
+        if not profile:
+            return None
+
+        return AgentRuntimeSnapshot(
+            profile=self._construct_profile(profile),
+            function_tools=tuple(
+                FunctionToolRead.model_validate(tool, from_attributes=True) for tool in profile.function_tools
+            ),
+            knowledge_bases=tuple(
+                KnowledgeBaseCollection.model_validate(kb) for kb in profile.knowledge_bases
+            ),
+            inbound_trunk_ids=tuple(m.sip_trunk_id for m in profile.inbound_sip_mappings),
+            outbound_trunk_ids=tuple(m.sip_trunk_id for m in profile.outbound_sip_mappings),
+        )
+
     async def delete(self, db: AsyncSession, *, id: uuid.UUID) -> Optional[AgentProfileInDB]:
         """
         Soft-deletes an agent profile and its associated call logs.
@@ -1,14 +1,18 @@
 from typing import List, Optional, Dict, Any
+import hashlib
+from datetime import timedelta
+import json
 import uuid
 from fastapi import HTTPException
-from sqlalchemy import and_, update, select
+from sqlalchemy import and_, delete, exists, func, update, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from ..crud.crud_documents import crud_agent_knowledge_mapping
 from fastcrud import FastCRUD
 
 
-from ..models.document import KnowledgeBase, Document, AgentKnowledgeMapping
+from ..models.document import KnowledgeBase, Document, DocumentStatus, AgentKnowledgeMapping
 from ..schemas.document import KnowledgeBaseWithDocsRead, DocumentRead, DocumentWithContentRead
 from sqlalchemy.orm import joinedload
 
@@ -25,7 +29,7 @@ from ..schemas.agent_profile import (
 )
 
 # Connection CRUD
-from ..models.connections import Connection
+from ..models.connections import Connection, KnowledgeBaseSnapshot
 from ..schemas.connections import (
     ConnectionCreate,
     ConnectionCreateInternal,
@@ -33,6 +37,10 @@ from ..schemas.connections import (
     ProviderBase,
 )
 
+# Unreferenced snapshots younger than this may be about to get their first connection
+SNAPSHOT_CLEANUP_GRACE = timedelta(hours=1)
+
+
 class CRUDConnection(FastCRUD[
     Connection,
     ConnectionCreateInternal,
@@ -45,13 +53,13 @@ class CRUDConnection(FastCRUD[
         if isinstance(room_id, uuid.UUID):
             room_id = str(room_id)
 
-        # ... (This method remains unchanged)
         result = await db.execute(
             select(Connection)
             .options(
                 selectinload(Connection.llm_provider),
                 selectinload(Connection.tts_provider),
-                selectinload(Connection.stt_provider)
+                selectinload(Connection.stt_provider),
+                selectinload(Connection.knowledge_base_snapshot)
             )
             .where(Connection.room_id == room_id)
         )
@@ -67,18 +75,25 @@ class CRUDConnection(FastCRUD[
         room_id: str | uuid.UUID,
         agent_id: uuid.UUID,
         owner_id: uuid.UUID,
-        call_id: Optional[str] = None  # <-- Parameter added
+        call_id: Optional[str] = None,  # <-- Parameter added
+        include_knowledge_bases: bool = True
     ) -> ConnectionInDB:
-        """Create a new connection by fetching agent data and all related documents."""
+        """
+        Create a new connection from the agent profile.
 
-        print(f"Creating connection for room_id in crud_connections.py Ahtasham: {room_id}, agent_id: {agent_id}, owner_id: {owner_id}, call_id: {call_id}")
+        The connection references a shared knowledge base snapshot instead of copying every
+        document into its own row, so the insert stays small however large the knowledge
+        bases are. Pass ``include_knowledge_bases=False`` when the caller does not need the
+        documents in the returned object.
+        """
 
-        # 1. Fetch the agent profile with necessary relationships
+        # 1. Fetch the agent profile with necessary relationships; document text is only
+        # loaded if the snapshot has to be built
         agent_profile_query = select(AgentProfile).options(
             selectinload(AgentProfile.llm_provider),
             selectinload(AgentProfile.tts_provider),
             selectinload(AgentProfile.stt_provider),
-            selectinload(AgentProfile.knowledge_bases).joinedload(KnowledgeBase.documents)
+            selectinload(AgentProfile.knowledge_bases).selectinload(KnowledgeBase.documents).defer(Document.content)
         ).where(AgentProfile.id == agent_id)
 
         result = await db.execute(agent_profile_query)
@@ -90,28 +105,11 @@ class CRUDConnection(FastCRUD[
         if agent_profile.owner_id != owner_id:
             raise HTTPException(status_code=403, detail="Not enough permissions to use this agent profile")
 
-        # 2. Prepare the data for the database object.
-        knowledge_bases_with_docs = [
-            {
-                "id": str(kb.id),
-                "name": kb.name,
-                "description": kb.description,
-                "qdrant_collection": kb.qdrant_collection,
-                "owner_id": str(kb.owner_id),
-                "documents": [
-                    {
-                        "id": str(doc.id),
-                        "filename": doc.filename,
-                        "content_type": doc.content_type,
-                        "content": doc.content,
-                        "chunk_count": doc.chunk_count,
-                        "created_at": doc.created_at.isoformat(),
-                        "updated_at": doc.updated_at.isoformat(),
-                        "knowledge_base_id": str(kb.id)
-                    } for doc in kb.documents
-                ]
-            } for kb in agent_profile.knowledge_bases
-        ]
+        # 2. Reference the snapshot of the current knowledge base versions, creating it once
+        snapshot_id = self._snapshot_id(agent_profile.knowledge_bases)
+        snapshot_data = await self._ensure_snapshot(
+            db, snapshot_id, agent_profile.knowledge_bases, load=include_knowledge_bases
+        )
 
         connection_data = {
             "room_id": room_id,
@@ -137,7 +135,7 @@ class CRUDConnection(FastCRUD[
             "is_default": agent_profile.is_default,
             "is_record": agent_profile.is_record, # <-- Field added
             "max_nested_function_calls": agent_profile.max_nested_function_calls,
-            "knowledge_bases_data": knowledge_bases_with_docs
+            "knowledge_base_snapshot_id": snapshot_id
         }
 
         # 3. Create the SQLAlchemy object directly and link the relationship.
@@ -151,12 +149,116 @@ class CRUDConnection(FastCRUD[
         await db.refresh(new_connection)
 
         # 5. Return the final, validated object
-        return self._construct_connection(new_connection)
+        return self._construct_connection(new_connection, knowledge_bases_data=snapshot_data or [])
+
+    @staticmethod
+    def _snapshot_documents(kb: KnowledgeBase) -> List[Document]:
+        # Documents being ingested have no content yet; leaving them out keeps each
+        # ingestion step from producing a new snapshot
+        return [doc for doc in kb.documents if doc.status == DocumentStatus.INDEXED]
+
+    @classmethod
+    def _snapshot_id(cls, knowledge_bases: List[KnowledgeBase]) -> str:
+        """Version id of a set of knowledge bases, from their fields and indexed document versions."""
+        version = [
+            {
+                "id": str(kb.id),
+                "name": kb.name,
+                "description": kb.description,
+                "qdrant_collection": kb.qdrant_collection,
+                "documents": sorted(
+                    (str(doc.id), doc.filename, doc.updated_at.isoformat(), doc.chunk_count)
+                    for doc in cls._snapshot_documents(kb)
+                )
+            } for kb in sorted(knowledge_bases, key=lambda kb: str(kb.id))
+        ]
+        return hashlib.sha256(json.dumps(version, sort_keys=True).encode()).hexdigest()
 
-    def _construct_connection(self, item: Any) -> ConnectionInDB:
+    async def _ensure_snapshot(
+        self,
+        db: AsyncSession,
+        snapshot_id: str,
+        knowledge_bases: List[KnowledgeBase],
+        load: bool = True
+    ) -> Optional[List[dict]]:
+        """
+        Make sure the snapshot exists, returning its data when ``load`` is set or when it
+        had to be built.
+        """
+        # The share lock keeps delete_unused_snapshots off the row until the connection
+        # referencing it is committed
+        column = KnowledgeBaseSnapshot.data if load else KnowledgeBaseSnapshot.id
+        existing = await db.scalar(
+            select(column).where(KnowledgeBaseSnapshot.id == snapshot_id).with_for_update(read=True)
+        )
+        if existing is not None:
+            return existing if load else None
+
+        document_ids = [doc.id for kb in knowledge_bases for doc in self._snapshot_documents(kb)]
+        contents = {}
+        if document_ids:
+            rows = await db.execute(select(Document.id, Document.content).where(Document.id.in_(document_ids)))
+            contents = dict(rows.all())
+
+        data = [
+            {
+                "id": str(kb.id),
+                "name": kb.name,
+                "description": kb.description,
+                "qdrant_collection": kb.qdrant_collection,
+                "owner_id": str(kb.owner_id),
+                "documents": [
+                    {
+                        "id": str(doc.id),
+                        "filename": doc.filename,
+                        "content_type": doc.content_type,
+                        "content": contents.get(doc.id, ""),
+                        "chunk_count": doc.chunk_count,
+                        "status": doc.status.value,
+                        "progress": doc.progress,
+                        "error": doc.error,
+                        "created_at": doc.created_at.isoformat(),
+                        "updated_at": doc.updated_at.isoformat(),
+                        "knowledge_base_id": str(kb.id)
+                    } for doc in self._snapshot_documents(kb)
+                ]
+            } for kb in knowledge_bases
+        ]
+
+        # Concurrent calls for the same agent may build the same snapshot
+        await db.execute(
+            pg_insert(KnowledgeBaseSnapshot)
+            .values(id=snapshot_id, data=data)
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+        return data
+
+    async def delete_unused_snapshots(self, db: AsyncSession) -> int:
+        """
+        Delete knowledge base snapshots that no connection references, once they are older
+        than ``SNAPSHOT_CLEANUP_GRACE``. Snapshots a connection is being created with are
+        share-locked and skipped.
+
+        Returns:
+            Number of snapshots deleted
+        """
+        unused = (
+            select(KnowledgeBaseSnapshot.id)
+            .where(
+                KnowledgeBaseSnapshot.created_at < func.now() - SNAPSHOT_CLEANUP_GRACE,
+                ~exists().where(Connection.knowledge_base_snapshot_id == KnowledgeBaseSnapshot.id)
+            )
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(delete(KnowledgeBaseSnapshot).where(KnowledgeBaseSnapshot.id.in_(unused)))
+        await db.commit()
+        return result.rowcount
+
+    def _construct_connection(self, item: Any, knowledge_bases_data: Optional[List[dict]] = None) -> ConnectionInDB:
         """
         Helper to construct ConnectionInDB from ORM,
-        including nested knowledge base data from the JSONB field.
+        including nested knowledge base data from the shared snapshot (or, for connections
+        created before snapshots, the inline JSONB field).
         """
         # Ensure provider relationships are loaded
         if not hasattr(item, 'llm_provider') or not item.llm_provider:
@@ -172,20 +274,29 @@ class CRUDConnection(FastCRUD[
             for c in item.__table__.columns
         }
         
-        knowledge_bases_data = []
-        if item.knowledge_bases_data:
-            for kb_data in item.knowledge_bases_data:
-                documents_data = []
-                if kb_data.get('documents'):
-                    for doc_data in kb_data['documents']:
-                        # CORRECTED: Add the knowledge_base_id here before validation
-                        doc_data['knowledge_base_id'] = kb_data['id'] 
-                        documents_data.append(DocumentWithContentRead(**doc_data))
-                
-                kb_data['documents'] = documents_data
-                knowledge_bases_data.append(KnowledgeBaseWithDocsRead(**kb_data))
+        if knowledge_bases_data is None:
+            if item.knowledge_base_snapshot_id is not None:
+                knowledge_bases_data = item.knowledge_base_snapshot.data
+            else:
+                knowledge_bases_data = item.knowledge_bases_data
+
+        knowledge_bases = []
+        for kb_data in knowledge_bases_data or []:
+            documents_data = []
+            for doc_data in kb_data.get('documents') or []:
+                # Snapshots are shared, so validate a copy
+                doc_data = {
+                    # Inline copies predate ingestion status; those documents were indexed synchronously
+                    "status": "indexed",
+                    "progress": 100,
+                    **doc_data,
+                    "knowledge_base_id": kb_data['id']
+                }
+                documents_data.append(DocumentWithContentRead(**doc_data))
+            
+            knowledge_bases.append(KnowledgeBaseWithDocsRead(**{**kb_data, "documents": documents_data}))
         
-        item_dict['knowledge_bases'] = knowledge_bases_data
+        item_dict['knowledge_bases_data'] = knowledge_bases
         
         # Return the final Pydantic model
         return ConnectionInDB(
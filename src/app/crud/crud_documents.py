@@ -22,6 +22,9 @@ from ..services.vector_search import vector_search
 
 logger = logging.getLogger("document-service")
 
+# Name of the in-process cache of agent -> knowledge base memberships (see services/agent_rag.py)
+AGENT_KNOWLEDGE_CACHE = "agent-knowledge-bases"
+
 # Create FastCRUD instances
 CRUDDocument = FastCRUD[
     Document,
@@ -127,7 +130,7 @@ class DocumentService:
         
         # Delete the Qdrant collection
         try:
-            qdrant_manager.client.delete_collection(kb["qdrant_collection"])
+            await qdrant_manager.async_client.delete_collection(kb["qdrant_collection"])
         except Exception as e:
             # Log the error but continue with database deletion
             logger.error(f"Error deleting Qdrant collection: {e}")
@@ -13,9 +13,13 @@ from ..schemas.function_tool import (
     FunctionToolCreateInternal,
     FunctionToolUpdate,
     FunctionToolDelete,
-    FunctionToolRead
+    FunctionToolRead,
+    check_response_cache
 )
 
+# Name of the in-process cache of compiled function tools (see services/function_executor.py)
+FUNCTION_TOOL_CACHE = "function-tools"
+
 # Create a FastCRUD instance for FunctionTool
 CRUDFunctionTool = FastCRUD[
     FunctionTool,
@@ -140,6 +144,16 @@ class ExtendedCRUDFunctionTool:
         # Step 4: Manually update the fields on the SQLAlchemy object.
         # This is the safest way to prevent data corruption.
         update_data = object.model_dump(exclude_unset=True)
+
+        # The merged tool must still be valid, or it could not be read back once stored
+        try:
+            check_response_cache(
+                update_data.get("http_method", db_obj.http_method),
+                update_data.get("execution_options", db_obj.execution_options)
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
         for field, value in update_data.items():
             setattr(db_obj, field, value)
 
@@ -8,6 +8,6 @@ from .sip import SIPTrunk
 from .function_tool import FunctionTool
 from .call_logs import CallLog
 from .providers import LLMProvider, TTSProvider, STTProvider
-from .connections import Connection
+from .connections import Connection, KnowledgeBaseSnapshot
 from ..core.db.token_blacklist import TokenBlacklist
 
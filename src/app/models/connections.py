@@ -10,6 +10,19 @@ from sqlalchemy import Column, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 
 
+class KnowledgeBaseSnapshot(Base):
+    """Immutable copy of an agent's knowledge bases and documents, shared by connections.
+
+    The id is derived from the knowledge base and document versions it was built from, so
+    every connection made while nothing changed references the same row.
+    """
+    __tablename__ = "knowledge_base_snapshots"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    data: Mapped[list] = mapped_column(JSONB, default_factory=list)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), default=func.now())
+
+
 class Connection(Base):
     """Model for storing voice call connections."""
     __tablename__ = "connections"
@@ -66,7 +79,11 @@ class Connection(Base):
     active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_default: Mapped[bool] = mapped_column(Boolean, default=False)
     is_record: Mapped[bool] = mapped_column(Boolean, default=False) # <-- Field added
+    # Inline copy written by older versions; new connections reference a shared snapshot
     knowledge_bases_data: Mapped[list] = mapped_column(JSONB, default_factory=list)
+    knowledge_base_snapshot_id: Mapped[Optional[str]] = mapped_column(
+        String(64), ForeignKey("knowledge_base_snapshots.id"), nullable=True, default=None
+    )
 
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), default=func.now())
@@ -77,4 +94,5 @@ class Connection(Base):
     owner = relationship("User", foreign_keys=[owner_id])
     llm_provider = relationship("LLMProvider", foreign_keys=[llm_provider_id])
     tts_provider = relationship("TTSProvider", foreign_keys=[tts_provider_id])
-    stt_provider = relationship("STTProvider", foreign_keys=[stt_provider_id])
\ No newline at end of file
+    stt_provider = relationship("STTProvider", foreign_keys=[stt_provider_id])
+    knowledge_base_snapshot = relationship("KnowledgeBaseSnapshot", foreign_keys=[knowledge_base_snapshot_id])
\ No newline at end of file
@@ -7,11 +7,22 @@ from sqlalchemy.types import DateTime as SQLADateTime
 from sqlalchemy import Column, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
+from sqlalchemy import Enum
+from enum import Enum as PyEnum
 from typing import List, Optional
 import uuid as uuid_pkg
 
 from ..core.db.database import Base
 
+
+class DocumentStatus(str, PyEnum):
+    QUEUED = "queued"
+    EXTRACTING = "extracting"
+    EMBEDDING = "embedding"
+    INDEXED = "indexed"
+    FAILED = "failed"
+
+
 class KnowledgeBase(Base):
     __tablename__ = "knowledge_bases"
     
@@ -57,6 +68,12 @@ class Document(Base):
     created_at: Mapped[DateTime] = mapped_column(SQLADateTime(timezone=True), default=func.now())
     updated_at: Mapped[DateTime] = mapped_column(SQLADateTime(timezone=True), default=func.now(), onupdate=func.now())
     chunk_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Ingestion state, advanced by the background ingestion job
+    status: Mapped[str] = mapped_column(Enum(DocumentStatus), default=DocumentStatus.QUEUED)
+    progress: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True, default=None)
+    # Issued per upload; only the ingestion job holding the current token may advance the document
+    ingestion_job_id: Mapped[Optional[uuid_pkg.UUID]] = mapped_column(UUID(as_uuid=True), nullable=True, default=None)
     
     knowledge_base = relationship("KnowledgeBase", back_populates="documents")
 
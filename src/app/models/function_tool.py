@@ -33,6 +33,7 @@ class FunctionTool(Base):
     auth_type: Mapped[Optional[str]] = mapped_column(String, nullable=True, default=None)
     response_mapping: Mapped[Dict[str, str]] = mapped_column(JSONB, default_factory=dict)
     error_mapping: Mapped[Dict[str, str]] = mapped_column(JSONB, default_factory=dict)
+    execution_options: Mapped[Dict[str, Any]] = mapped_column(JSONB, default_factory=dict)
     active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_public: Mapped[bool] = mapped_column(Boolean, default=False)
     id: Mapped[uuid_pkg.UUID] = mapped_column(
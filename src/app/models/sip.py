@@ -1,5 +1,5 @@
 import uuid as uuid_pkg
-from sqlalchemy import ForeignKey, String, Text, Enum, DateTime, Boolean
+from sqlalchemy import ForeignKey, String, Text, Enum, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from typing import Dict, Any, Optional
@@ -113,6 +113,10 @@ class SIPAgentMapping(Base):
 class SIPCall(Base):
     """Model for tracking SIP call details."""
     __tablename__ = "sip_calls"
+    # Latest call from a number, for webhooks that carry no call SID
+    __table_args__ = (
+        Index("ix_sip_calls_phone_number_created_at", "phone_number", "created_at"),
+    )
     
     # PRIMARY KEY AND REQUIRED FIELDS WITHOUT DEFAULTS MUST COME FIRST
     # Call identifiers
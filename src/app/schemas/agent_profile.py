@@ -172,10 +172,13 @@
 
 
 from pydantic import BaseModel, Field, ConfigDict, UUID4, field_validator
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import uuid
 from datetime import datetime
 
+from .document import KnowledgeBaseCollection
+from .function_tool import FunctionToolRead
+
 # --- Helper Models for Options ---
 
 class TTSOptions(BaseModel):
@@ -201,6 +204,8 @@ class BackgroundAudioOptions(BaseModel):
 
 class ProfileOptions(BaseModel):
     background_audio: BackgroundAudioOptions = Field(default_factory=BackgroundAudioOptions)
+    # Phrase spoken while slow function calls run, e.g. "One moment, let me check."
+    function_filler: Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
     
 class ProviderBase(BaseModel):
@@ -360,4 +365,23 @@ class AgentProfile(AgentProfileInDB):
 class AgentProfileList(BaseModel):
     items: List[AgentProfileInDB]
     total: int
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AgentRuntimeSnapshot(BaseModel):
+    """Immutable per-job view of everything the voice worker needs to run an agent."""
+    profile: AgentProfileInDB
+    function_tools: Tuple[FunctionToolRead, ...] = ()
+    knowledge_bases: Tuple[KnowledgeBaseCollection, ...] = ()
+    inbound_trunk_ids: Tuple[uuid.UUID, ...] = ()
+    outbound_trunk_ids: Tuple[uuid.UUID, ...] = ()
+
+    model_config = ConfigDict(frozen=True)
+
+    @property
+    def agent_id(self) -> uuid.UUID:
+        return self.profile.id
+
+    def profile_config(self) -> Dict[str, Any]:
+        """Return a fresh, mutable profile configuration dict for agent setup."""
+        return self.profile.model_dump()
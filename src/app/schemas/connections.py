@@ -100,6 +100,7 @@ class ConnectionCreateInternal(BaseModel):
     max_nested_function_calls: int = 1
     # Add this new field
     knowledge_bases_data: List[dict] = [] 
+    knowledge_base_snapshot_id: Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
 
 class ConnectionInDB(ConnectionBase):
@@ -108,6 +109,7 @@ class ConnectionInDB(ConnectionBase):
     updated_at: Optional[datetime] = None
     # knowledge_bases: List[KnowledgeBaseWithDocsRead] = [] # Change this line
     knowledge_bases: List[KnowledgeBaseWithDocsRead] = Field(alias="knowledge_bases_data", default_factory=list)
+    knowledge_base_snapshot_id: Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -3,6 +3,8 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 import uuid
 
+from ..models.document import DocumentStatus
+
 # Knowledge Base Schemas
 class KnowledgeBaseBase(BaseModel):
     name: str
@@ -33,6 +35,14 @@ class KnowledgeBaseDelete(BaseModel):
     model_config = ConfigDict(extra="forbid")
     id: uuid.UUID
 
+class KnowledgeBaseCollection(BaseModel):
+    """Compact knowledge base reference used by the voice worker for vector search"""
+    id: uuid.UUID
+    name: str
+    qdrant_collection: str
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
 
 # Document Schemas
 class DocumentBase(BaseModel):
@@ -52,6 +62,18 @@ class DocumentRead(DocumentBase):
     created_at: datetime
     updated_at: datetime
     chunk_count: int
+    status: DocumentStatus
+    progress: int
+    error: Optional[str] = None
+
+class DocumentStatusRead(BaseModel):
+    id: uuid.UUID
+    filename: str
+    status: DocumentStatus
+    progress: int
+    chunk_count: int
+    error: Optional[str] = None
+    updated_at: datetime
 
 class DocumentUpdate(BaseModel):
     model_config = ConfigDict(extra="forbid")
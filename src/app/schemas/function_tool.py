@@ -1,6 +1,6 @@
 from uuid import UUID
 from pydantic import BaseModel, Field, HttpUrl, ConfigDict, validator
-from typing import Optional, Dict, Any, List, Literal
+from typing import Optional, Dict, Any, List, Literal, Union
 import uuid
 from enum import Enum
 
@@ -18,6 +18,28 @@ class AuthType(str, Enum):
     BEARER = "bearer"
     API_KEY = "api_key"
 
+class FunctionExecutionOptions(BaseModel):
+    """Per-tool execution settings; unset values fall back to the executor defaults."""
+    timeout_seconds: Optional[float] = Field(None, gt=0, description="Total timeout for the HTTP call")
+    connect_timeout_seconds: Optional[float] = Field(None, gt=0, description="Timeout for opening a connection")
+    cache_ttl_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Reuse responses for identical calls for this long; only for idempotent GET functions"
+    )
+
+def check_response_cache(
+    http_method: Optional[str],
+    execution_options: Optional[Union[FunctionExecutionOptions, Dict[str, Any]]]
+) -> None:
+    """Responses may only be cached for GET functions, which must not have side effects"""
+    if isinstance(execution_options, dict):
+        cache_ttl = execution_options.get("cache_ttl_seconds")
+    else:
+        cache_ttl = execution_options.cache_ttl_seconds if execution_options else None
+    if cache_ttl and http_method != HttpMethod.GET:
+        raise ValueError("cache_ttl_seconds is only supported for GET functions")
+
 class FunctionToolBase(BaseModel):
     name: str = Field(..., description="The name of the function")
     description: Optional[str] = Field(None, description="A description of what the function does")
@@ -37,6 +59,10 @@ class FunctionToolBase(BaseModel):
     request_template: Dict[str, Any] = Field(default_factory=dict, description="The request template for the function")
     auth_required: bool = Field(default=False, description="Whether the function requires authentication")
     auth_type: Optional[AuthType] = Field(default=None, description="The type of authentication to use for the function")
+    execution_options: FunctionExecutionOptions = Field(
+        default_factory=FunctionExecutionOptions,
+        description="Timeouts and other execution settings for the function"
+    )
     
     # Response handling
     response_mapping: Dict[str, str] = Field(
@@ -63,6 +89,11 @@ class FunctionToolBase(BaseModel):
 class FunctionToolCreate(FunctionToolBase):
     model_config = ConfigDict(extra="forbid")
 
+    @validator('execution_options')
+    def validate_response_cache(cls, v, values):
+        check_response_cache(values.get('http_method', HttpMethod.GET), v)
+        return v
+
 # Schema for internal creation (with owner_id)
 class FunctionToolCreateInternal(FunctionToolBase):
     owner_id: UUID
@@ -83,6 +114,7 @@ class FunctionToolUpdate(BaseModel):
     request_template: Optional[Dict[str, Any]] = None
     auth_required: Optional[bool] = None
     auth_type: Optional[AuthType] = None
+    execution_options: Optional[FunctionExecutionOptions] = None
     response_mapping: Optional[Dict[str, str]] = None
     error_mapping: Optional[Dict[str, str]] = None
     active: Optional[bool] = None
@@ -16,15 +16,28 @@ from ..crud.crud_agent_profiles import crud_agent_profiles
 from ..crud.crud_sip import crud_sip_calls, crud_sip_trunk, crud_sip_agent_mapping
 from ..crud.crud_function_tool import crud_function_tools
 from ..schemas.sip import SIPCallDirection, SIPCallCreateInternal, SIPCallStatus
+from ..schemas.agent_profile import AgentRuntimeSnapshot
 from ..utils.db_utils import with_worker_db
 from ..services.agent_rag import rag_service
 from ..services.provider_factory import ProviderFactory
 from ..schemas.provider_types import STTProvider
 from ..services.function_integration import function_integration
 from ..services.function_executor import function_executor
+from ..services.tool_runner import ToolCallRunner
+from ..services.model_registry import model_registry
+from ..services.call_records import call_records
 
 logger = logging.getLogger("agent-profile-service")
 
+def is_telephony_room(room: Optional[rtc.Room]) -> bool:
+    """Whether a SIP participant is in the room, so telephony-tuned models should be used"""
+    if not room:
+        return False
+    return any(
+        participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_SIP
+        for participant in room.remote_participants.values()
+    )
+
 async def create_voice_agent(
     ctx: JobContext, 
     vad,
@@ -54,12 +67,7 @@ async def create_voice_agent(
         )
         
         # Determine if using telephony-optimized model
-        is_telephony = False
-        if ctx and hasattr(ctx, 'room') and ctx.room:
-            for participant in ctx.room.remote_participants.values():
-                if participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_SIP:
-                    is_telephony = True
-                    break
+        is_telephony = ctx is not None and is_telephony_room(getattr(ctx, 'room', None))
         
         stt_instance = ProviderFactory.create_stt(
             provider=profile_config.get("stt_provider"),
@@ -85,6 +93,7 @@ async def create_voice_agent(
     # Create the voice pipeline agent with the configured providers
     agent = VoicePipelineAgent(
         vad=vad,
+        turn_detector=model_registry.turn_detector(),
         stt=stt_instance,
         llm=llm_instance,
         tts=tts_instance,
@@ -101,6 +110,22 @@ async def create_voice_agent(
     
     return agent
 
+async def _lookup_trunk_and_mapping(
+    db,
+    trunk_id_str: Optional[str],
+    phone_number: Optional[str]
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    trunk = None
+    if trunk_id_str:
+        trunk = await crud_sip_trunk.get_by_trunk_id(db=db, trunk_id=trunk_id_str)
+    if not trunk and phone_number:
+        trunk = await crud_sip_trunk.get_by_phone_number(db=db, phone_number=phone_number)
+    if not trunk:
+        return None, None
+
+    mappings = await crud_sip_agent_mapping.get_by_trunk_id(db=db, trunk_id=trunk["id"])
+    return trunk, (mappings[0] if mappings else None)
+
 async def get_sip_information(
     room_id: uuid.UUID,
     participant: rtc.RemoteParticipant
@@ -155,37 +180,27 @@ async def get_sip_information(
     
     # Try to get trunk ID from participant attributes
     trunk_id = None
-    trunk_id_str = None
-    if "sip.trunkID" in participant.attributes:
-        trunk_id_str = participant.attributes["sip.trunkID"]
+    trunk_id_str = participant.attributes.get("sip.trunkID")
+    mapping = None
     
-    if trunk_id_str:
+    if trunk_id_str or phone_number:
         try:
-            # Try looking up by LiveKit trunk ID
-            trunk = await with_worker_db(
-                lambda db: crud_sip_trunk.get_by_trunk_id(db=db, trunk_id=trunk_id_str)
-            )
+            # Resolve the trunk (by LiveKit trunk ID, then by phone number) and its agent
+            # mapping on one pooled connection
+            trunk, mapping = await with_worker_db(
+                lambda db: _lookup_trunk_and_mapping(db, trunk_id_str, phone_number)
+            ) or (None, None)
             if trunk:
                 trunk_id = trunk["id"]
-            else:
+                trunk_id_str = trunk["trunk_id"]
+            elif trunk_id_str:
                 # If not found, save the string version
                 call_metadata["trunk_id_str"] = trunk_id_str
         except Exception as e:
-            logger.warning(f"Error looking up trunk by ID {trunk_id_str}: {e}")
+            logger.warning(f"Error looking up trunk {trunk_id_str or phone_number}: {e}")
             # Still save the string version even if lookup fails
-            call_metadata["trunk_id_str"] = trunk_id_str
-    
-    # If we have a phone number but no trunk ID, try looking up by phone number
-    if phone_number and not trunk_id:
-        try:
-            trunk = await with_worker_db(
-                lambda db: crud_sip_trunk.get_by_phone_number(db=db, phone_number=phone_number)
-            )
-            if trunk:
-                trunk_id = trunk["id"]
-                trunk_id_str = trunk["trunk_id"]
-        except Exception as e:
-            logger.warning(f"Error looking up trunk by phone number {phone_number}: {e}")
+            if trunk_id_str:
+                call_metadata["trunk_id_str"] = trunk_id_str
     
     if trunk_id:
         call_metadata["trunk_id"] = trunk_id
@@ -206,81 +221,35 @@ async def get_sip_information(
     
     # Find the appropriate agent based on call direction and trunk
     agent_id = None
-    if trunk_id:
-        try:
-            # Get agent mappings for this trunk
-            mappings = await with_worker_db(
-                lambda db: crud_sip_agent_mapping.get_by_trunk_id(db=db, trunk_id=trunk_id)
-            )
-            
-            if mappings and len(mappings) > 0:
-                mapping = mappings[0]  # Get the first mapping
-                
-                # Choose agent based on direction
-                if call_direction == "inbound" and mapping.get("inbound_agent_id"):
-                    agent_id = mapping.get("inbound_agent_id")
-                    logger.info(f"Using inbound agent {agent_id} for SIP call")
-                elif call_direction == "outbound" and mapping.get("outbound_agent_id"):
-                    agent_id = mapping.get("outbound_agent_id")
-                    logger.info(f"Using outbound agent {agent_id} for SIP call")
-                else:
-                    # Fallback to any available agent in the mapping
-                    agent_id = mapping.get("inbound_agent_id") or mapping.get("outbound_agent_id")
-                    if agent_id:
-                        logger.info(f"Using fallback agent {agent_id} for SIP call")
-        except Exception as e:
-            logger.error(f"Error retrieving SIP agent mapping: {e}")
+    if mapping:
+        # Choose agent based on direction
+        if call_direction == "inbound" and mapping.get("inbound_agent_id"):
+            agent_id = mapping.get("inbound_agent_id")
+            logger.info(f"Using inbound agent {agent_id} for SIP call")
+        elif call_direction == "outbound" and mapping.get("outbound_agent_id"):
+            agent_id = mapping.get("outbound_agent_id")
+            logger.info(f"Using outbound agent {agent_id} for SIP call")
+        else:
+            # Fallback to any available agent in the mapping
+            agent_id = mapping.get("inbound_agent_id") or mapping.get("outbound_agent_id")
+            if agent_id:
+                logger.info(f"Using fallback agent {agent_id} for SIP call")
     
-    # Record the SIP call in the database
+    # Record the SIP call; the writer persists it in the background, off the greeting path
     if room_id and participant.sid:
         try:
-            call_id = participant.sid
-            db_status = SIPCallStatus.INITIATED
-            
-            # Check if call already exists in the database
-            existing_call = await with_worker_db(
-                lambda db: crud_sip_calls.get_by_call_id(db=db, call_id=call_id)
+            call_records.record_initiated(
+                call_id=participant.sid,
+                room_id=str(room_id),
+                direction=call_metadata["call_direction"],
+                phone_number=call_metadata.get("phone_number") or "unknown",
+                trunk_id=call_metadata.get("trunk_id"),
+                agent_id=agent_id,
+                call_metadata=dict(participant.attributes)
             )
-            
-            if not existing_call:
-                # Create a new call record
-                await with_worker_db(
-                    lambda db: crud_sip_calls.create_call_record(
-                        db=db,
-                        call_id=call_id,
-                        room_id=room_id,
-                        direction=call_metadata["call_direction"],
-                        phone_number=call_metadata.get("phone_number", "unknown"),
-                        trunk_id=call_metadata.get("trunk_id"),
-                        agent_id=agent_id,
-                        metadata=participant.attributes
-                    )
-                )
-                logger.info(f"Created SIP call record for {call_id} in database")
-            else:
-                # Update existing call record with agent_id if needed
-                if agent_id and not existing_call.agent_id:
-                    await with_worker_db(
-                        lambda db: crud_sip_calls.update(
-                            db=db,
-                            id=existing_call.id,
-                            object={"agent_id": agent_id}
-                        )
-                    )
-                    logger.info(f"Updated SIP call {call_id} with agent_id {agent_id}")
-                
-                # Mark call as active if it was just initiated
-                if existing_call.status == SIPCallStatus.INITIATED.value:
-                    await with_worker_db(
-                        lambda db: crud_sip_calls.mark_call_answered(
-                            db=db, 
-                            call_id=call_id,
-                            agent_id=agent_id
-                        )
-                    )
-                    logger.info(f"Marked SIP call {call_id} as answered")
+            call_records.record_answered(participant.sid, agent_id=agent_id)
         except Exception as e:
-            logger.error(f"Error recording/updating SIP call: {e}")
+            logger.error(f"Error recording SIP call: {e}")
     
     return agent_id, call_metadata
 
@@ -358,10 +327,38 @@ def create_dynamic_function(tool, execution_handler):
     return execute
 
 
+async def load_agent_snapshot(
+    agent_id: Optional[uuid.UUID] = None,
+    snapshots: Optional[Dict[Optional[uuid.UUID], AgentRuntimeSnapshot]] = None
+) -> Optional[AgentRuntimeSnapshot]:
+    """
+    Load the runtime snapshot for an agent, reusing one already loaded for this job.
+    
+    Args:
+        agent_id: UUID of the agent profile, or None for the default profile
+        snapshots: Per-job snapshot cache keyed by agent ID
+        
+    Returns:
+        The agent snapshot, or None if the profile does not exist
+    """
+    if snapshots is not None and agent_id in snapshots:
+        return snapshots[agent_id]
+        
+    snapshot = await with_worker_db(
+        lambda db: crud_agent_profiles.get_runtime_snapshot(db=db, id=agent_id)
+    )
+    
+    if snapshot and snapshots is not None:
+        snapshots[agent_id] = snapshot
+        snapshots[snapshot.agent_id] = snapshot
+    return snapshot
+
+
 async def setup_agent_with_profile(
     ctx: JobContext,
     participant: rtc.RemoteParticipant,
     agent_id: Optional[uuid.UUID] = None,
+    snapshots: Optional[Dict[Optional[uuid.UUID], AgentRuntimeSnapshot]] = None,
 ) -> Tuple[VoicePipelineAgent, Dict[str, Any]]:
     """
     Set up a voice agent with a profile for a participant.
@@ -370,6 +367,7 @@ async def setup_agent_with_profile(
         ctx: The job context
         participant: The participant to interact with
         agent_id: UUID of the agent profile to use
+        snapshots: Per-job cache of agent snapshots, reused across participants
         
     Returns:
         Tuple of (agent, resources_dict)
@@ -416,42 +414,9 @@ async def setup_agent_with_profile(
     is_sip_call = participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_SIP
     sip_metadata = {}
     
-    # If agent_id is provided, try to get the agent profile from the database
-    if agent_id is not None:
-        try:
-            # Use our worker-specific database helper
-            profile = await with_worker_db(
-                lambda db: crud_agent_profiles.get(db=db, id=agent_id)
-            )
-            
-            if profile:
-                logger.info(f"Found agent profile with ID {agent_id}: {profile.name}")
-                # Convert profile to dictionary to match expected format
-                profile_config = profile.model_dump()
-            else:
-                logger.warning(f"Agent profile with ID {agent_id} not found, using default configuration")
-        except Exception as e:
-            logger.error(f"Error retrieving agent profile: {e}")
-    else:
-        # If no agent ID was provided, try to get the default profile
-        try:
-            default_profile = await with_worker_db(
-                lambda db: crud_agent_profiles.get_default(db=db)
-            )
-            if default_profile:
-                logger.info(f"Using default agent profile: {default_profile.name}")
-                profile_config = default_profile.model_dump()
-                agent_id = default_profile.id
-        except Exception as e:
-            logger.error(f"Error retrieving default agent profile: {e}")
-        
-        if not agent_id:
-            logger.info("No agent ID provided, using default configuration")
-    
-    # Enhance the configuration for SIP calls
+    # Resolve the SIP-specific agent before loading any profile, so only one profile is loaded
     if is_sip_call:
         try:
-            # Get SIP information
             sip_agent_id, sip_metadata = await get_sip_information(
                 room_id=uuid.UUID(ctx.room.name) if ctx.room.name else None,
                 participant=participant
@@ -460,22 +425,41 @@ async def setup_agent_with_profile(
             # Override agent_id if SIP-specific agent is found
             if sip_agent_id:
                 agent_id = sip_agent_id
-                # Try to load the SIP-specific agent profile
-                sip_profile = await with_worker_db(
-                    lambda db: crud_agent_profiles.get(db=db, id=agent_id)
-                )
-                if sip_profile:
-                    profile_config = sip_profile.model_dump()
-                    logger.info(f"Using SIP-specific agent profile: {sip_profile.name}")
+                logger.info(f"Using SIP-specific agent {agent_id}")
             
             # Store SIP metadata in resources for future use
             resources["sip_metadata"] = sip_metadata
-            
-            # Always enhance the profile for SIP calls
+            resources["sip_call_id"] = participant.sid
+        except Exception as e:
+            logger.error(f"Error processing SIP participant: {e}")
+    
+    # Load profile, providers, function tools and knowledge bases in one round trip
+    snapshot = None
+    try:
+        snapshot = await load_agent_snapshot(agent_id, snapshots)
+    except Exception as e:
+        logger.error(f"Error retrieving agent profile: {e}")
+    
+    if snapshot:
+        logger.info(f"Using agent profile {snapshot.agent_id}: {snapshot.profile.name}")
+        profile_config = snapshot.profile_config()
+        agent_id = snapshot.agent_id
+    elif agent_id is not None:
+        logger.warning(f"Agent profile with ID {agent_id} not found, using default configuration")
+    else:
+        logger.info("No agent ID provided, using default configuration")
+    
+    # Always enhance the profile for SIP calls
+    if is_sip_call:
+        try:
             profile_config = enhance_profile_for_sip_call(profile_config, participant, sip_metadata)
         except Exception as e:
             logger.error(f"Error processing SIP participant: {e}")
     
+    # Seed the RAG knowledge base cache so the first turn doesn't query the database
+    if snapshot:
+        rag_service.prime_knowledge_bases(snapshot.agent_id, snapshot.knowledge_bases)
+    
     # Define the RAG callback function
     def rag_callback(a, chat_ctx):
         return rag_service.enrich_with_rag(
@@ -485,19 +469,24 @@ async def setup_agent_with_profile(
         )
     
     fnc_ctx = None
+    tool_runner = None
 
-    if profile_config.get('profile_options', {}).get("enable_functions", True) and agent_id is not None:
+    if profile_config.get('profile_options', {}).get("enable_functions", True) and snapshot is not None:
         try:
-            # Fetch function tools assigned to this agent
-            function_tools = await with_worker_db(
-                lambda db: crud_function_tools.get_agent_functions(db=db, agent_id=agent_id)
-            )
+            # Function tools assigned to this agent come with the snapshot
+            function_tools = snapshot.function_tools
             
             if function_tools and len(function_tools) > 0:
                 logger.info(f"Found {len(function_tools)} function tools for agent {agent_id}")
+                # Calls resolve their definitions from the executor's cache, not the database
+                function_executor.preload(function_tools)
                 
                 # Create a function context
                 fnc_ctx = FunctionContext()
+                # Runs the tool calls of a turn concurrently, under one deadline
+                tool_runner = ToolCallRunner(
+                    filler=profile_config.get('profile_options', {}).get("function_filler")
+                )
                 
                 # Register each function tool with the context
                 for tool in function_tools:
@@ -515,10 +504,12 @@ async def setup_agent_with_profile(
                             return result["result"]
                         return handler
                     
+                    tool_runner.register(tool.function_name, await execution_handler(tool.id))
+                    
                     # Create dynamic function with explicit parameters (not **kwargs)
                     execute_tool = create_dynamic_function(
                         tool, 
-                        await execution_handler(tool.id)
+                        lambda params, name=tool.function_name: tool_runner.call(name, params)
                     )
                     
                     # Register with the Function Context
@@ -540,17 +531,24 @@ async def setup_agent_with_profile(
     # Create the agent with the configuration
     agent = await create_voice_agent(
         ctx=ctx,
-        vad=ctx.proc.userdata["vad"],
+        vad=ctx.proc.userdata.get("vad") or model_registry.vad(),
         profile_config=profile_config,
         func_ctx=fnc_ctx,
         before_llm_cb=rag_callback
     )
 
+    if tool_runner is not None and settings.FUNCTION_PARALLEL_CALLS_ENABLED:
+        # Launch all tool calls of a turn as soon as the LLM has emitted them
+        @agent.on("function_calls_collected")
+        def on_function_calls_collected(fnc_calls):
+            tool_runner.start_turn((call.function_info.name, call.arguments) for call in fnc_calls)
+
     # Start the agent
     agent.start(ctx.room, participant)
     
     # Store agent in resources for traceability
     resources["agent"] = agent
+    resources["tool_runner"] = tool_runner
     
     # Set up background audio if enabled in profile
     background_audio_config = profile_config.get('profile_options', {}).get('background_audio', {})
@@ -707,6 +705,12 @@ async def cleanup_agent_resources(agent, resources=None):
     
     # Clean up background audio and other resources
     if resources:
+        if resources.get("tool_runner"):
+            resources["tool_runner"].close()
+        
+        if resources.get("sip_call_id"):
+            call_records.record_completed(resources.pop("sip_call_id"), success=True)
+        
         if "background_audio" in resources and resources["background_audio"]:
             try:
                 background_audio = resources["background_audio"]
@@ -1,6 +1,6 @@
 # app/services/agent_rag.py
 import logging
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Sequence, Union
 import uuid
 
 from livekit.agents import llm, JobContext
@@ -8,7 +8,10 @@ from livekit.agents import AgentSession
 
 from ..services.vector_search import vector_search
 from ..utils.db_utils import with_worker_db
-from ..crud.crud_documents import document_service
+from ..core.config import settings
+from ..core.utils.local_cache import LocalCache
+from ..crud.crud_documents import document_service, AGENT_KNOWLEDGE_CACHE
+from ..schemas.document import KnowledgeBaseCollection
 
 logger = logging.getLogger("[agent-rag]")
 
@@ -36,35 +39,34 @@ class AgentRAGService:
         if not last_user_msg or not last_user_msg.content:
             return agent.llm.chat(chat_ctx=chat_ctx)
 
-        # Get knowledge bases associated with the agent
+        # Get knowledge bases associated with the agent (served from the in-process cache)
         knowledge_bases = await AgentRAGService._get_knowledge_bases(agent_id)
         if not knowledge_bases:
             return agent.llm.chat(chat_ctx=chat_ctx)
 
-        # Query each knowledge base and collect results
+        # Query all knowledge bases concurrently with a single query embedding;
+        # collections that miss the deadline are left out of this turn
+        collection_results = await vector_search.query_collections(
+            query_text=last_user_msg.content,
+            collection_names=[kb.qdrant_collection for kb in knowledge_bases],
+            limit=3,
+            timeout=settings.RAG_SEARCH_TIMEOUT
+        )
+
         all_results = []
         for kb in knowledge_bases:
-            try:
-                # Query Qdrant directly without DB connection
-                results = await vector_search.query(
-                    query_text=last_user_msg.content,
-                    collection_name=kb.get("qdrant_collection"),
-                    limit=3
-                )
-
-                # Add source information to each result
-                for result in results:
-                    result["source"] = {
-                        "knowledge_base_id": kb.get("id"),
-                        "knowledge_base_name": kb.get("name")
-                    }
-
-                all_results.extend(results)
-                logger.info(
-                    f"Retrieved results from knowledge base {kb.get('id')}: {results}")
-            except Exception as e:
-                logger.error(
-                    f"Error querying knowledge base {kb.get('id')}: {e}")
+            results = collection_results.get(kb.qdrant_collection, [])
+
+            # Add source information to each result
+            for result in results:
+                result["source"] = {
+                    "knowledge_base_id": kb.id,
+                    "knowledge_base_name": kb.name
+                }
+
+            all_results.extend(results)
+            logger.info(
+                f"Retrieved {len(results)} results from knowledge base {kb.id}")
 
         # Sort by score (higher is better)
         all_results.sort(key=lambda x: x.get("score", 0.0), reverse=True)
@@ -112,42 +114,50 @@ class AgentRAGService:
         return agent.llm.chat(chat_ctx=new_ctx)
 
     @staticmethod
-    async def _get_knowledge_bases(agent_id: Optional[Union[uuid.UUID, str]]) -> List[Dict[str, Any]]:
+    def prime_knowledge_bases(
+        agent_id: Union[uuid.UUID, str],
+        knowledge_bases: Sequence[KnowledgeBaseCollection]
+    ) -> None:
+        """Seed the cache with knowledge bases already loaded, e.g. from the job's agent snapshot"""
+        knowledge_base_cache.set(agent_id, list(knowledge_bases))
+
+    @staticmethod
+    async def _get_knowledge_bases(agent_id: Optional[Union[uuid.UUID, str]]) -> List[KnowledgeBaseCollection]:
         """Get knowledge bases associated with the agent profile"""
         if not agent_id:
             return []
 
         try:
-            # Convert string to UUID if needed
-            if isinstance(agent_id, str):
-                try:
-                    agent_id = uuid.UUID(agent_id)
-                except ValueError:
-                    logger.warning(f"Invalid agent ID format: {agent_id}")
-                    return []
-
-            # Query the database to get knowledge bases for this agent
-            async def get_kb_data(db):
-                knowledge_bases = await document_service.get_knowledge_bases_by_agent(
-                    db=db, agent_id=agent_id
-                )
-
-                return [
-                    {
-                        "id": kb.get("id") if isinstance(kb, dict) else kb.id,
-                        "name": kb.get("name") if isinstance(kb, dict) else kb.name,
-                        "qdrant_collection": kb.get("qdrant_collection") if isinstance(kb, dict) else kb.qdrant_collection
-                    }
-                    for kb in knowledge_bases
-                ]
-
-            kb_data = await with_worker_db(get_kb_data)
-            return kb_data or []
-
+            return await knowledge_base_cache.get_or_load(agent_id)
         except Exception as e:
             logger.error(
                 f"Error getting knowledge bases for agent {agent_id}: {e}")
             return []
 
+    @staticmethod
+    async def _load_knowledge_bases(agent_id: str) -> List[KnowledgeBaseCollection]:
+        """Query the database for the knowledge bases of an agent"""
+        agent_uuid = uuid.UUID(agent_id)
+
+        async def get_kb_data(db):
+            knowledge_bases = await document_service.get_knowledge_bases_by_agent(
+                db=db, agent_id=agent_uuid
+            )
+
+            return [KnowledgeBaseCollection.model_validate(kb) for kb in knowledge_bases]
+
+        kb_data = await with_worker_db(get_kb_data)
+        if kb_data is None:
+            raise RuntimeError("Worker database session unavailable")
+        return kb_data
+
+
+# Agent ID -> knowledge bases, refreshed in the background on expiry or when
+# /agent-knowledge associations change, so RAG turns never wait on Postgres
+knowledge_base_cache = LocalCache(
+    AGENT_KNOWLEDGE_CACHE,
+    ttl=settings.AGENT_KNOWLEDGE_CACHE_TTL,
+    loader=AgentRAGService._load_knowledge_bases
+)
 
 rag_service = AgentRAGService()
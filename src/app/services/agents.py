@@ -22,12 +22,12 @@ from livekit.plugins import (
     cartesia,
     deepgram,
     noise_cancellation,
-    silero,
 )
 # from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
 
 from ..core.config import settings
+from .model_registry import model_registry
 
 logger = logging.getLogger("voice-assistant")
 
@@ -246,16 +246,9 @@ class AgentRunner:
                 # Use a model optimized for telephony
                 dg_model = "nova-2-phonecall"
 
-            # Add after creating the VAD instance
-            vad_instance = silero.VAD.load()
-
-            # Test the VAD with a simple audio sample
-            # This will help confirm if VAD is functional
-            logger.info(f"VAD loaded: {vad_instance}")
-
             # Create the agent using AgentSession pattern
             self.agent = AgentSession(
-                vad=silero.VAD.load(),
+                vad=model_registry.vad(),
                 stt=deepgram.STT(
                     model=dg_model, api_key=settings.DEEPGRAM_API_KEY),
                 llm=openai.LLM(api_key=settings.OPENAI_API_KEY),
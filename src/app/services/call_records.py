@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.sip import SIPCall
+from ..schemas.sip import SIPCallCreateInternal, SIPCallStatus
+from ..utils.db_utils import with_worker_db
+
+logger = logging.getLogger("call-records")
+
+
+@dataclass
+class PendingCallRecord:
+    """Every not yet persisted change to one call, coalesced into a single row update."""
+    call_id: str
+    create: Optional[SIPCallCreateInternal] = None
+    agent_id: Optional[uuid.UUID] = None
+    answered_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    success: Optional[bool] = None
+    call_metadata: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+
+    def merge(self, other: "PendingCallRecord") -> None:
+        """Fold in changes that were recorded earlier than this record's own"""
+        self.create = self.create or other.create
+        self.agent_id = self.agent_id or other.agent_id
+        self.answered_at = self.answered_at or other.answered_at
+        self.completed_at = self.completed_at or other.completed_at
+        self.success = self.success if self.success is not None else other.success
+        self.call_metadata = {**other.call_metadata, **self.call_metadata}
+        self.attempts = max(self.attempts, other.attempts)
+
+    def apply(self, row: SIPCall) -> None:
+        if self.agent_id and not row.agent_id:
+            row.agent_id = self.agent_id
+        if self.answered_at and row.status == SIPCallStatus.INITIATED:
+            row.status = SIPCallStatus.ACTIVE
+            row.answered_at = self.answered_at
+        if self.completed_at and row.status != SIPCallStatus.COMPLETED:
+            row.status = SIPCallStatus.COMPLETED
+            row.completed_at = self.completed_at
+            row.success = self.success
+            if row.answered_at:
+                row.duration_seconds = int((self.completed_at - row.answered_at).total_seconds())
+        if self.call_metadata:
+            # A new dict, so the JSONB column is flagged as modified
+            row.call_metadata = {**(row.call_metadata or {}), **self.call_metadata}
+
+
+@dataclass
+class _WriterState:
+    pending: Dict[str, PendingCallRecord] = field(default_factory=dict)
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional[asyncio.Task] = None
+
+
+class CallRecordWriter:
+    """
+    Persists SIP call lifecycle events off the audio path.
+
+    ``record_*`` only update an in-memory record of the call and return at once. A
+    background task per event loop flushes the records every
+    ``CALL_RECORD_FLUSH_INTERVAL`` seconds: all changes to a call since the last flush
+    become one insert or update, and a whole batch shares one session and one commit.
+    A batch that fails is retried on the next flush, up to
+    ``CALL_RECORD_MAX_ATTEMPTS`` times.
+    """
+
+    def __init__(self):
+        # Job processes each run their own loop, and the worker engine is bound to it
+        self._states: Dict[asyncio.AbstractEventLoop, _WriterState] = {}
+
+    def _state(self) -> _WriterState:
+        loop = asyncio.get_running_loop()
+        for stale_loop in [l for l in self._states if l.is_closed()]:
+            del self._states[stale_loop]
+
+        state = self._states.get(loop)
+        if state is None:
+            state = _WriterState()
+            self._states[loop] = state
+        if state.task is None or state.task.done():
+            state.task = asyncio.create_task(self._run(state))
+        return state
+
+    def _record(self, call_id: str) -> Optional[PendingCallRecord]:
+        state = self._state()
+        record = state.pending.get(call_id)
+        if record is None:
+            if len(state.pending) >= settings.CALL_RECORD_QUEUE_MAXSIZE:
+                logger.error(f"Call record queue is full, dropping update for call {call_id}")
+                return None
+            record = state.pending[call_id] = PendingCallRecord(call_id=call_id)
+        state.wakeup.set()
+        return record
+
+    def record_initiated(
+        self,
+        call_id: str,
+        room_id: str,
+        direction: str,
+        phone_number: str,
+        trunk_id: Optional[uuid.UUID] = None,
+        agent_id: Optional[uuid.UUID] = None,
+        call_metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Create the call's record, unless it already exists"""
+        record = self._record(call_id)
+        if record is None:
+            return
+        record.create = SIPCallCreateInternal(
+            call_id=call_id,
+            room_id=room_id,
+            direction=direction,
+            phone_number=phone_number,
+            trunk_id=trunk_id,
+            agent_id=agent_id,
+            call_metadata=call_metadata or {},
+            status=SIPCallStatus.INITIATED
+        )
+        record.agent_id = record.agent_id or agent_id
+
+    def record_answered(self, call_id: str, agent_id: Optional[uuid.UUID] = None) -> None:
+        """Mark an initiated call as active, and assign its agent if it has none"""
+        record = self._record(call_id)
+        if record is None:
+            return
+        record.answered_at = record.answered_at or datetime.now(timezone.utc)
+        record.agent_id = record.agent_id or agent_id
+
+    def record_completed(
+        self,
+        call_id: str,
+        success: bool = True,
+        call_metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        record = self._record(call_id)
+        if record is None:
+            return
+        record.completed_at = record.completed_at or datetime.now(timezone.utc)
+        record.success = success
+        record.call_metadata.update(call_metadata or {})
+
+    def record_metadata(self, call_id: str, call_metadata: Dict[str, Any]) -> None:
+        record = self._record(call_id)
+        if record is None:
+            return
+        record.call_metadata.update(call_metadata)
+
+    async def _run(self, state: _WriterState) -> None:
+        while True:
+            await state.wakeup.wait()
+            # Let the events of the same moment (join, answer, metadata) land in one batch
+            await asyncio.sleep(settings.CALL_RECORD_FLUSH_INTERVAL)
+            await self._flush(state)
+
+    async def _flush(self, state: _WriterState) -> None:
+        state.wakeup.clear()
+        batch, state.pending = state.pending, {}
+        records = list(batch.values())
+
+        for start in range(0, len(records), settings.CALL_RECORD_BATCH_SIZE):
+            chunk = records[start:start + settings.CALL_RECORD_BATCH_SIZE]
+            try:
+                await with_worker_db(lambda db: self._write(db, chunk))
+            except asyncio.CancelledError:
+                # Stopped mid-flush: keep the unwritten records for the final flush
+                self._requeue(state, records[start:], count_attempt=False)
+                raise
+            except Exception as e:
+                logger.error(f"Failed to persist {len(chunk)} call records: {e}")
+                self._requeue(state, chunk)
+
+    def _requeue(self, state: _WriterState, records: List[PendingCallRecord], count_attempt: bool = True) -> None:
+        for record in records:
+            record.attempts += int(count_attempt)
+            if record.attempts >= settings.CALL_RECORD_MAX_ATTEMPTS:
+                logger.error(f"Dropping call record update for {record.call_id} after {record.attempts} attempts")
+                continue
+            # Events recorded since the failed flush are newer than the requeued ones
+            newer = state.pending.get(record.call_id)
+            if newer is not None:
+                newer.merge(record)
+            else:
+                state.pending[record.call_id] = record
+        if state.pending:
+            state.wakeup.set()
+
+    async def _write(self, db: AsyncSession, records: List[PendingCallRecord]) -> None:
+        result = await db.execute(
+            select(SIPCall).where(
+                SIPCall.call_id.in_([record.call_id for record in records]),
+                SIPCall.is_deleted == False
+            )
+        )
+        rows = {row.call_id: row for row in result.scalars()}
+
+        for record in records:
+            row = rows.get(record.call_id)
+            if row is None:
+                if record.create is None:
+                    logger.warning(f"No SIP call record {record.call_id} to update")
+                    continue
+                row = SIPCall(**record.create.model_dump())
+                db.add(row)
+            record.apply(row)
+
+        await db.commit()
+        logger.debug(f"Persisted {len(records)} call records")
+
+    async def flush(self) -> None:
+        """Persist everything recorded so far on this event loop"""
+        state = self._states.get(asyncio.get_running_loop())
+        if state is not None and state.pending:
+            await self._flush(state)
+
+    async def aclose(self) -> None:
+        """Flush and stop the writer of the running event loop"""
+        state = self._states.pop(asyncio.get_running_loop(), None)
+        if state is None:
+            return
+        if state.task is not None:
+            state.task.cancel()
+            try:
+                await state.task
+            except asyncio.CancelledError:
+                pass
+        if state.pending:
+            await self._flush(state)
+        if state.pending:
+            logger.error(f"Discarding {len(state.pending)} unpersisted call records at shutdown")
+
+
+call_records = CallRecordWriter()
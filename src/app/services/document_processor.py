@@ -1,185 +1,277 @@
+import hashlib
 import os
-import tempfile
 import logging
-from typing import List, Dict, Any, Tuple, Optional, BinaryIO
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Set, Tuple, Optional
 import uuid
 import asyncio
 import json
-
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.document_loaders import (
-    PyPDFLoader, TextLoader, CSVLoader, Docx2txtLoader
-)
+from datetime import timedelta
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..models.document import Document, KnowledgeBase
+from ..core.config import settings
+from ..models.document import Document, DocumentStatus, KnowledgeBase
 from ..crud.crud_documents import crud_document, document_service, crud_knowledge_base
 from ..core.qdrant_client import qdrant_manager
 from .embedding_service import embedding_service
+from .extraction import (
+    PDF_CONTENT_TYPE, extraction_pool, count_pdf_pages, extract_pdf_pages, extract_text, split_text
+)
 
-from sqlalchemy import update, func
+from sqlalchemy import select, update, func
 from qdrant_client.http import models
 
 logger = logging.getLogger("document-processor")
 
+# Namespace for content-derived chunk point IDs; changing it re-embeds every document
+CHUNK_ID_NAMESPACE = uuid.UUID("ce4221d3-f129-4edb-9887-7507594c0c9b")
+
+# Statuses a document may be in before moving to each status
+_ALLOWED_TRANSITIONS = {
+    DocumentStatus.EXTRACTING: [DocumentStatus.QUEUED],
+    DocumentStatus.EMBEDDING: [DocumentStatus.EXTRACTING],
+    DocumentStatus.INDEXED: [DocumentStatus.EMBEDDING],
+    DocumentStatus.FAILED: [DocumentStatus.QUEUED, DocumentStatus.EXTRACTING, DocumentStatus.EMBEDDING],
+}
+
 class DocumentProcessor:
     def __init__(self):
-        # Adjust chunking strategy for large documents
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,  # Smaller chunks for better retrieval
-            chunk_overlap=50,  # Reduced overlap for more efficient storage
-            length_function=len,
-        )
-        
-        # Add a separate splitter for really large documents
-        self.large_doc_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=100,
-            length_function=len,
-        )
-    
+        # Chunking strategy as (chunk_size, chunk_overlap): smaller chunks for better
+        # retrieval, reduced overlap for more efficient storage
+        self.chunking = (500, 50)
 
-    async def process_file(
-        self, 
+        # Larger chunks for really large documents
+        self.large_doc_chunking = (1000, 100)
+
+    async def create_pending_document(
+        self,
         db: AsyncSession,
-        file: BinaryIO, 
-        filename: str, 
-        knowledge_base_id: int
+        filename: str,
+        knowledge_base_id: uuid.UUID
     ) -> Document:
-        """Process a file upload and store in the database with embeddings"""
-        # Detect content type
-        content_type = self._get_content_type(filename)
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file.write(file.read())
-            temp_path = temp_file.name
-        
+        """
+        Create the document record for an upload, or reset the existing record with the
+        same filename in this knowledge base, and mark it queued for ingestion under a new
+        ingestion job id. A job still running for an earlier upload stops at its next step.
+        """
+        stmt = select(Document).where(
+            (Document.filename == filename) &
+            (Document.knowledge_base_id == knowledge_base_id)
+        )
+        result = await db.execute(stmt)
+        document = result.scalar_one_or_none()
+
+        if document:
+            logger.info(f"Document '{filename}' already exists in KB {knowledge_base_id}, re-ingesting")
+            document.status = DocumentStatus.QUEUED
+            document.progress = 0
+            document.error = None
+            document.ingestion_job_id = uuid.uuid4()
+        else:
+            document = Document(
+                filename=filename,
+                content_type=self._get_content_type(filename),
+                content="",
+                knowledge_base_id=knowledge_base_id,
+                ingestion_job_id=uuid.uuid4()
+            )
+            db.add(document)
+
+        await db.commit()
+        await db.refresh(document)
+        return document
+
+    async def ingest_file(
+        self, db: AsyncSession, document_id: uuid.UUID, job_id: uuid.UUID, file_path: str
+    ) -> bool:
+        """
+        Extract, chunk, embed and index an uploaded file for a queued document.
+
+        Advances the document through extracting -> embedding -> indexed, or marks it
+        failed with the error, also when the job is cancelled (timeout, worker shutdown).
+        The uploaded file is removed either way.
+
+        Returns:
+            bool: True if the document was indexed
+        """
         try:
-            # Get knowledge base
-            kb = await crud_knowledge_base.get(db=db, id=knowledge_base_id)
+            document = await crud_document.get(db=db, id=document_id)
+            if not document:
+                logger.warning(f"Document {document_id} no longer exists, skipping ingestion")
+                return False
+
+            kb = await crud_knowledge_base.get(db=db, id=document["knowledge_base_id"])
             if not kb:
-                raise ValueError(f"Knowledge base with ID {knowledge_base_id} not found")
-            
-            # Check if document with same filename already exists in this knowledge base
-            from sqlalchemy import select
-            stmt = select(Document).where(
-                (Document.filename == filename) & 
-                (Document.knowledge_base_id == knowledge_base_id)
+                raise ValueError(f"Knowledge base with ID {document['knowledge_base_id']} not found")
+
+            if not await self._advance(db, document_id, job_id, DocumentStatus.EXTRACTING, progress=5):
+                return False
+
+            # Chunks already indexed for this document, by point ID
+            collection_name = kb["qdrant_collection"]
+            existing = await self._get_indexed_chunks(collection_name, document_id)
+
+            async def on_extracted(text: str) -> bool:
+                return await self._advance(db, document_id, job_id, DocumentStatus.EMBEDDING, progress=40, content=text)
+
+            # Extract and chunk off the event loop, embedding new chunks as segments become available
+            extracted = await self._extract_and_embed(
+                document_id, file_path, document["content_type"], set(existing), on_extracted
             )
-            result = await db.execute(stmt)
-            existing_doc = result.scalar_one_or_none()
-            
-            # Extract text based on file type
-            text = await self._extract_text(temp_path, content_type)
-
-            if len(text) > 1000000:  # 1MB of text
-                logger.info(f"Large document detected ({len(text)} chars), using large document chunking")
-                chunks = self.large_doc_splitter.split_text(text)
-            else:
-                chunks = self.text_splitter.split_text(text)
-            
-            # Create or update document
-            if existing_doc:
-                logger.info(f"Document '{filename}' already exists in KB {knowledge_base_id}, updating")
-                # Use update_direct to avoid querying for the object again
-                from ..schemas.document import DocumentUpdateInternal
-                await db.execute(
-                    update(Document)
-                    .where(Document.id == existing_doc.id)
-                    .values(
-                        content=text,
-                        updated_at=func.now()
-                    )
-                )
-                await db.commit()
-                document = existing_doc
-                
-                # Remove existing chunks from Qdrant if they exist
-                try:
-                    filter_by = {"document_id": document.id}
-                    qdrant_manager.client.delete(
-                        collection_name=kb["qdrant_collection"],
-                        points_selector=models.FilterSelector(
-                            filter=models.Filter(
-                                must=[
-                                    models.FieldCondition(
-                                        key="document_id",
-                                        match=models.MatchValue(value=document.id)
-                                    )
-                                ]
-                            )
-                        )
-                    )
-                    logger.info(f"Removed existing chunks for document {document.id}")
-                except Exception as e:
-                    logger.warning(f"Error removing existing chunks: {e}")
-            else:
-                # Create new document
-                from ..schemas.document import DocumentCreateInternal
-                doc_in = DocumentCreateInternal(
-                    filename=filename,
-                    content_type=content_type,
-                    content=text,
-                    knowledge_base_id=knowledge_base_id,
-                    chunk_count=0  # Will update after processing
-                )
-                document = await crud_document.create(db=db, object=doc_in)
-            
-            # Split into chunks
-            chunks = self.text_splitter.split_text(text)
-            
-            # Get embeddings for chunks
-            embeddings = await embedding_service.get_embeddings(chunks)
-            
-            # Store chunks with embeddings in Qdrant
+            if extracted is None:
+                return False
+            chunks, point_ids, embeddings = extracted
+
+            await self._set_progress(db, document_id, job_id, 70)
+
+            # Store new chunks with embeddings in Qdrant
             points = []
-            for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                # Create a unique ID for each point
-                point_id = uuid.uuid4()
-                
+            reindexed = []
+            for i, (chunk, point_id) in enumerate(zip(chunks, point_ids)):
+                if point_id in existing:
+                    # Unchanged chunk; only its position may have moved
+                    if existing[point_id] != i:
+                        reindexed.append(models.SetPayloadOperation(
+                            set_payload=models.SetPayload(payload={"chunk_index": i}, points=[point_id])
+                        ))
+                    continue
+
                 # Prepare payload with text and metadata
                 payload = {
                     "content": chunk,
-                    "document_id": document.id,
+                    "document_id": str(document_id),
                     "chunk_index": i,
-                    "filename": filename,
-                    "content_type": content_type
+                    "filename": document["filename"],
+                    "content_type": document["content_type"]
                 }
-                
+
                 points.append({
-                    "id": str(point_id),
-                    "vector": embedding,
+                    "id": point_id,
+                    "vector": embeddings[point_id],
                     "payload": payload
                 })
-            
+
             # Upload in batches of 100 points
             batch_size = 100
             for i in range(0, len(points), batch_size):
-                batch = points[i:i + batch_size]
-                qdrant_manager.client.upsert(
-                    collection_name=kb["qdrant_collection"],
-                    points=batch
+                await qdrant_manager.async_client.upsert(
+                    collection_name=collection_name,
+                    points=points[i:i + batch_size]
                 )
-            
-            # Update document with chunk count - using direct SQL to avoid the multiple results issue
-            await db.execute(
-                update(Document)
-                .where(Document.id == document.id)
-                .values(chunk_count=len(chunks))
+                uploaded = min(i + batch_size, len(points))
+                await self._set_progress(db, document_id, job_id, 70 + 25 * uploaded // len(points))
+
+            for i in range(0, len(reindexed), batch_size):
+                await qdrant_manager.async_client.batch_update_points(
+                    collection_name=collection_name,
+                    update_operations=reindexed[i:i + batch_size]
+                )
+
+            # Remove chunks that are no longer part of the document, after their replacements are live
+            removed = list(set(existing) - set(point_ids))
+            if removed:
+                await qdrant_manager.async_client.delete(
+                    collection_name=collection_name,
+                    points_selector=models.PointIdsList(points=removed)
+                )
+
+            logger.info(
+                f"Document {document_id}: embedded {len(points)} new chunks, kept {len(chunks) - len(points)}, "
+                f"removed {len(removed)}"
             )
-            await db.commit()
-            
-            # Refresh document from database
-            await db.refresh(document)
-            
-            logger.info(f"Processed document '{filename}' with {len(chunks)} chunks")
-            return document
-            
+            await self._advance(db, document_id, job_id, DocumentStatus.INDEXED, progress=100, chunk_count=len(chunks))
+            logger.info(f"Processed document '{document['filename']}' with {len(chunks)} chunks")
+            return True
+
+        except asyncio.CancelledError:
+            logger.error(f"Ingestion of document {document_id} was cancelled")
+            await self.mark_failed(db, document_id, job_id, "Ingestion was cancelled or timed out")
+            raise
+
+        except Exception as e:
+            logger.exception(f"Error ingesting document {document_id}: {e}")
+            await self.mark_failed(db, document_id, job_id, str(e))
+            return False
+
         finally:
-            # Clean up temp file
-            os.unlink(temp_path)
-    
+            # Clean up uploaded file
+            if os.path.exists(file_path):
+                os.unlink(file_path)
+
+    async def mark_failed(self, db: AsyncSession, document_id: uuid.UUID, job_id: uuid.UUID, error: str) -> None:
+        """Mark a document failed, unless a newer upload has taken it over"""
+        try:
+            await db.rollback()
+            await self._advance(db, document_id, job_id, DocumentStatus.FAILED, error=error)
+        except Exception as e:
+            logger.error(f"Could not mark document {document_id} as failed: {e}")
+
+    async def fail_stale_documents(self, db: AsyncSession) -> int:
+        """
+        Fail documents that stayed queued or in progress for longer than
+        ``INGESTION_STALE_AFTER`` seconds, e.g. because their job was lost with a worker.
+
+        Their ingestion job ID is cleared, so a job that is still running stops at its
+        next step.
+
+        Returns:
+            Number of documents marked failed
+        """
+        result = await db.execute(
+            update(Document)
+            .where(
+                (Document.status.in_(_ALLOWED_TRANSITIONS[DocumentStatus.FAILED])) &
+                (Document.updated_at < func.now() - timedelta(seconds=settings.INGESTION_STALE_AFTER))
+            )
+            .values(
+                status=DocumentStatus.FAILED,
+                error="Ingestion did not finish in time",
+                ingestion_job_id=None,
+                updated_at=func.now()
+            )
+        )
+        await db.commit()
+        if result.rowcount:
+            logger.warning(f"Marked {result.rowcount} stale documents as failed")
+        return result.rowcount
+
+    async def _advance(
+        self,
+        db: AsyncSession,
+        document_id: uuid.UUID,
+        job_id: uuid.UUID,
+        status: DocumentStatus,
+        **values: Any
+    ) -> bool:
+        """
+        Move a document to ``status`` if it is in an allowed previous state and ``job_id``
+        is still its ingestion job.
+
+        Returns False when the document was deleted or re-queued by a newer upload,
+        in which case the current job should stop.
+        """
+        result = await db.execute(
+            update(Document)
+            .where(
+                (Document.id == document_id) &
+                (Document.ingestion_job_id == job_id) &
+                (Document.status.in_(_ALLOWED_TRANSITIONS[status]))
+            )
+            .values(status=status, updated_at=func.now(), **values)
+        )
+        await db.commit()
+        if result.rowcount == 0:
+            logger.info(f"Document {document_id} can no longer move to {status.value}, stopping ingestion")
+            return False
+        return True
+
+    async def _set_progress(self, db: AsyncSession, document_id: uuid.UUID, job_id: uuid.UUID, progress: int) -> None:
+        await db.execute(
+            update(Document)
+            .where((Document.id == document_id) & (Document.ingestion_job_id == job_id))
+            .values(progress=progress, updated_at=func.now())
+        )
+        await db.commit()
+
     def _get_content_type(self, filename: str) -> str:
         """Determine content type from filename"""
         ext = os.path.splitext(filename)[1].lower()
@@ -194,34 +286,136 @@ class DocumentProcessor:
         else:
             return 'application/octet-stream'
     
-    async def _extract_text(self, file_path: str, content_type: str) -> str:
-        """Extract text from file based on content type"""
+    async def _get_indexed_chunks(self, collection_name: str, document_id: uuid.UUID) -> Dict[str, int]:
+        """Get the point IDs and chunk indexes currently stored for a document"""
+        indexed: Dict[str, int] = {}
+        offset = None
+        while True:
+            records, offset = await qdrant_manager.async_client.scroll(
+                collection_name=collection_name,
+                scroll_filter=models.Filter(
+                    must=[
+                        models.FieldCondition(
+                            key="document_id",
+                            match=models.MatchValue(value=str(document_id))
+                        )
+                    ]
+                ),
+                limit=1000,
+                offset=offset,
+                with_payload=["chunk_index"],
+                with_vectors=False
+            )
+            for record in records:
+                indexed[str(record.id)] = (record.payload or {}).get("chunk_index", -1)
+            if offset is None:
+                return indexed
+
+    @staticmethod
+    def _chunk_point_id(document_id: uuid.UUID, chunk: str, occurrence: int) -> str:
+        """
+        Deterministic point ID for a chunk, derived from its content.
+
+        ``occurrence`` distinguishes repeats of identical text within the same document.
+        """
+        digest = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+        return str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{document_id}:{digest}:{occurrence}"))
+
+    async def _extract_and_embed(
+        self,
+        document_id: uuid.UUID,
+        file_path: str,
+        content_type: str,
+        indexed_ids: Set[str],
+        on_extracted: Callable[[str], Awaitable[bool]]
+    ) -> Optional[Tuple[List[str], List[str], Dict[str, List[float]]]]:
+        """
+        Extract and chunk a file in the extraction pool, embedding each segment's chunks
+        while the next segment is parsed. Chunks whose point ID is in ``indexed_ids`` are
+        already stored and are not embedded again.
+
+        ``on_extracted`` is called with the full text once extraction finishes, while
+        embeddings may still be in flight; returning False abandons the work.
+
+        Returns:
+            Tuple of the chunks, their point IDs and the embeddings of new chunks by
+            point ID, or None if abandoned
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.EXTRACTION_TIMEOUT
+
+        def remaining() -> float:
+            return max(0.0, deadline - loop.time())
+
+        segments: List[str] = []
+        chunks: List[str] = []
+        point_ids: List[str] = []
+        occurrences: Dict[str, int] = {}
+        embed_tasks: List[asyncio.Task] = []
+        chunking = None
         try:
-            if content_type == 'application/pdf':
-                loader = PyPDFLoader(file_path)
-                docs = loader.load()
-                return "\n\n".join(doc.page_content for doc in docs)
-            
-            elif content_type == 'text/plain':
-                loader = TextLoader(file_path)
-                docs = loader.load()
-                return "\n\n".join(doc.page_content for doc in docs)
-                
-            elif content_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
-                loader = Docx2txtLoader(file_path)
-                docs = loader.load()
-                return "\n\n".join(doc.page_content for doc in docs)
-                
-            elif content_type == 'text/csv':
-                loader = CSVLoader(file_path)
-                docs = loader.load()
-                return "\n\n".join(doc.page_content for doc in docs)
-                
-            else:
-                raise ValueError(f"Unsupported content type: {content_type}")
-                
-        except Exception as e:
-            logger.error(f"Error extracting text: {e}")
+            async for segment, estimated_length in self._iter_segments(file_path, content_type, remaining):
+                if chunking is None:
+                    if estimated_length > 1000000:  # 1MB of text
+                        logger.info(f"Large document detected (~{estimated_length} chars), using large document chunking")
+                        chunking = self.large_doc_chunking
+                    else:
+                        chunking = self.chunking
+
+                segment_chunks = await extraction_pool.run(split_text, segment, *chunking, timeout=remaining())
+                segments.append(segment)
+
+                new_chunks: Dict[str, str] = {}
+                for chunk in segment_chunks:
+                    occurrence = occurrences.get(chunk, 0)
+                    occurrences[chunk] = occurrence + 1
+                    point_id = self._chunk_point_id(document_id, chunk, occurrence)
+                    chunks.append(chunk)
+                    point_ids.append(point_id)
+                    if point_id not in indexed_ids:
+                        new_chunks[point_id] = chunk
+                if new_chunks:
+                    embed_tasks.append(asyncio.create_task(self._embed_chunks(new_chunks)))
+
+            if not await on_extracted("\n\n".join(segments)):
+                for task in embed_tasks:
+                    task.cancel()
+                return None
+
+            batches = await asyncio.gather(*embed_tasks)
+        except BaseException:
+            for task in embed_tasks:
+                task.cancel()
             raise
 
+        embeddings = {point_id: embedding for batch in batches for point_id, embedding in batch.items()}
+        return chunks, point_ids, embeddings
+
+    async def _embed_chunks(self, chunks: Dict[str, str]) -> Dict[str, List[float]]:
+        embeddings = await embedding_service.get_embeddings(list(chunks.values()))
+        return dict(zip(chunks.keys(), embeddings))
+
+    async def _iter_segments(
+        self,
+        file_path: str,
+        content_type: str,
+        remaining: Callable[[], float]
+    ) -> AsyncIterator[Tuple[str, int]]:
+        """
+        Yield the text of a file in segments, with an estimate of the full text length.
+
+        PDFs are read a batch of pages at a time; other formats are a single segment.
+        """
+        if content_type != PDF_CONTENT_TYPE:
+            text = await extraction_pool.run(extract_text, file_path, content_type, timeout=remaining())
+            yield text, len(text)
+            return
+
+        page_count = await extraction_pool.run(count_pdf_pages, file_path, timeout=remaining())
+        for start in range(0, page_count, settings.EXTRACTION_PDF_PAGE_BATCH):
+            end = min(start + settings.EXTRACTION_PDF_PAGE_BATCH, page_count)
+            text = await extraction_pool.run(extract_pdf_pages, file_path, start, end, timeout=remaining())
+            # Extrapolate from this batch of pages to the whole document
+            yield text, len(text) * page_count // (end - start)
+
 document_processor = DocumentProcessor()
\ No newline at end of file
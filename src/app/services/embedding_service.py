@@ -1,54 +1,201 @@
 import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import random
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
+import openai
 from openai import AsyncOpenAI  # New import for client-based approach
 from ..core.config import settings
+from ..core.exceptions.embedding_exceptions import EmbeddingError
+from ..core.utils.cache import get_loop_redis_client
+from ..core.utils.local_cache import LocalCache
 
 logger = logging.getLogger("embedding-service")
 
+QUERY_EMBEDDING_CACHE = "query-embeddings"
+
+
+def _pack(embedding: List[float]) -> bytes:
+    """Pack an embedding as float32 bytes (6 KB for 1536 dimensions)"""
+    return array("f", embedding).tobytes()
+
+
+def _unpack(packed: bytes) -> List[float]:
+    embedding = array("f")
+    embedding.frombytes(packed)
+    return embedding.tolist()
+
 class EmbeddingService:
     def __init__(self):
         self.api_key = settings.OPENAI_API_KEY
         self.model = "text-embedding-3-small"
         self.max_batch_size = 100  # OpenAI's limit for embeddings API
         self.dimension = 1536  # Dimension of the embeddings
-        # Create a client instance
-        self.client = AsyncOpenAI(api_key=self.api_key)
+        # Query embeddings never change for a given model and text, so entries are only
+        # ever evicted, never invalidated. Redis shares them across worker processes.
+        self.query_cache = LocalCache(
+            QUERY_EMBEDDING_CACHE,
+            ttl=settings.EMBEDDING_CACHE_TTL,
+            maxsize=settings.EMBEDDING_CACHE_MAXSIZE
+        )
+        self.redis_hits = 0
+        self.api_calls = 0
+        # The client's connections and the semaphore belong to one event loop; job processes
+        # and thread jobs run several loops in one process
+        self._loops: Dict[asyncio.AbstractEventLoop, Tuple[AsyncOpenAI, asyncio.Semaphore]] = {}
+
+    def _loop_state(self) -> Tuple[AsyncOpenAI, asyncio.Semaphore]:
+        """The OpenAI client and the in-flight request semaphore of the running event loop"""
+        loop = asyncio.get_running_loop()
+        for stale_loop in [l for l in self._loops if l.is_closed()]:
+            del self._loops[stale_loop]
+        state = self._loops.get(loop)
+        if state is None:
+            # Retries are handled per batch in _embed_batch
+            state = self._loops[loop] = (
+                AsyncOpenAI(api_key=self.api_key, max_retries=0),
+                asyncio.Semaphore(settings.EMBEDDING_MAX_CONCURRENCY),
+            )
+        return state
+
+    def _cache_key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"embedding:{self.model}:{digest}"
+
+    async def get_query_embedding(self, text: str) -> Optional[List[float]]:
+        """
+        Get the embedding for a search query, served from cache when possible.
+
+        Lookups go to the in-process LRU first, then Redis, and only then to OpenAI.
+
+        Returns:
+            The embedding, or None for an empty query
+
+        Raises:
+            EmbeddingError: If the embedding could not be generated
+        """
+        text = text.strip()
+        if not text:
+            return None
+        key = self._cache_key(text)
+
+        packed = self.query_cache.get(key)
+        if packed is not None:
+            return _unpack(packed)
+
+        try:
+            packed = await get_loop_redis_client().get(key)
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            packed = None
+        if packed is not None:
+            self.redis_hits += 1
+            self.query_cache.set(key, packed)
+            return _unpack(packed)
+
+        self.api_calls += 1
+        embeddings = await self.get_embeddings([text])
+
+        packed = _pack(embeddings[0])
+        self.query_cache.set(key, packed)
+        try:
+            await get_loop_redis_client().set(key, packed, ex=settings.EMBEDDING_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to store embedding in cache: {e}")
+        return embeddings[0]
+
+    async def aclose(self) -> None:
+        """Close the OpenAI client of the running event loop"""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state[0].close()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the query embedding cache"""
+        stats = self.query_cache.stats()
+        return {
+            "model": self.model,
+            "size": stats["size"],
+            "local_hits": stats["hits"],
+            "redis_hits": self.redis_hits,
+            "api_calls": self.api_calls,
+        }
         
     async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Get embeddings for a list of texts with adaptive batch size"""
+        """
+        Get embeddings for a list of texts, in order.
+
+        Texts are grouped into batches of roughly ``EMBEDDING_BATCH_TOKENS`` tokens and up
+        to ``EMBEDDING_MAX_CONCURRENCY`` requests are in flight at once per event loop. Rate
+        limits and server errors are retried with backoff.
+
+        Raises:
+            EmbeddingError: If any batch still fails after retrying
+        """
         if not texts:
             return []
-            
-        all_embeddings = []
-        
-        # Determine maximum batch size based on text length
-        avg_text_length = sum(len(text) for text in texts) / len(texts)
-        adaptive_batch_size = min(
-            self.max_batch_size,
-            max(1, int(100000 / avg_text_length))  # Adjust batch size inversely to text length
-        )
-        
-        logger.info(f"Using batch size of {adaptive_batch_size} for embedding generation")
-        
-        # Process in batches
-        for i in range(0, len(texts), adaptive_batch_size):
-            batch = texts[i:i + adaptive_batch_size]
+
+        batches = self._make_batches(texts)
+
+        client, semaphore = self._loop_state()
+
+        async def embed(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self._embed_batch(client, batch)
+
+        if len(batches) > 1:
+            logger.info(f"Embedding {len(texts)} texts in {len(batches)} batches")
+        results = await asyncio.gather(*(embed(batch) for batch in batches))
+        return [embedding for batch_embeddings in results for embedding in batch_embeddings]
+
+    def _make_batches(self, texts: List[str]) -> List[List[str]]:
+        """Group texts into request batches bounded by input count and approximate token count"""
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_tokens = 0
+        for text in texts:
+            # ~4 characters per token for English text
+            tokens = len(text) // 4 + 1
+            if batch and (len(batch) >= self.max_batch_size or batch_tokens + tokens > settings.EMBEDDING_BATCH_TOKENS):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _embed_batch(self, client: AsyncOpenAI, batch: List[str]) -> List[List[float]]:
+        """Embed one batch, retrying rate limits, server errors and connection failures"""
+        for attempt in range(settings.EMBEDDING_MAX_RETRIES + 1):
             try:
-                # Using the new client-based API structure
-                response = await self.client.embeddings.create(
+                response = await client.embeddings.create(
                     input=batch,
                     model=self.model,
                 )
-                # Extract embeddings from response (note the changed response structure)
-                batch_embeddings = [item.embedding for item in response.data]
-                all_embeddings.extend(batch_embeddings)
-                logger.info(f"Generated embeddings for batch {i//adaptive_batch_size + 1}/{(len(texts) + adaptive_batch_size - 1)//adaptive_batch_size}")
-            except Exception as e:
-                logger.error(f"Error generating embeddings: {e}")
-                # Return empty vectors for failed batch
-                all_embeddings.extend([[0.0] * self.dimension] * len(batch))
-                
-        return all_embeddings
+                return [item.embedding for item in response.data]
+            except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as e:
+                if attempt == settings.EMBEDDING_MAX_RETRIES:
+                    raise EmbeddingError(f"Embedding batch of {len(batch)} texts failed after {attempt + 1} attempts: {e}") from e
+                delay = self._retry_delay(e, attempt)
+                logger.warning(f"Embedding request failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except openai.OpenAIError as e:
+                raise EmbeddingError(f"Embedding batch of {len(batch)} texts failed: {e}") from e
+        raise EmbeddingError()  # unreachable, keeps type checkers happy
+
+    @staticmethod
+    def _retry_delay(error: Exception, attempt: int) -> float:
+        """Seconds to wait before retrying, honoring the server's retry-after header"""
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                if retry_after is not None:
+                    return min(float(retry_after), 60.0)
+            except ValueError:
+                pass
+        return min(0.5 * 2 ** attempt, 30.0) + random.uniform(0, 0.5)
 
 embedding_service = EmbeddingService()
\ No newline at end of file
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import multiprocessing
+import resource
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+from ..core.config import settings
+
+logger = logging.getLogger("document-extraction")
+
+T = TypeVar("T")
+
+PDF_CONTENT_TYPE = "application/pdf"
+
+
+# -------- functions run in the extraction processes --------
+def _limit_memory(limit_mb: int) -> None:
+    """Cap the address space of an extraction process so a pathological file fails alone"""
+    if limit_mb <= 0:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    resource.setrlimit(resource.RLIMIT_AS, (limit_mb * 1024 * 1024, hard))
+
+
+def count_pdf_pages(file_path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(file_path).pages)
+
+
+def extract_pdf_pages(file_path: str, start: int, end: int) -> str:
+    """Extract the text of pages [start, end) of a PDF"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    return "\n\n".join(reader.pages[i].extract_text() or "" for i in range(start, end))
+
+
+def extract_text(file_path: str, content_type: str) -> str:
+    """Extract the full text of a non-PDF document"""
+    from langchain.document_loaders import TextLoader, CSVLoader, Docx2txtLoader
+
+    if content_type == 'text/plain':
+        loader = TextLoader(file_path)
+    elif content_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
+        loader = Docx2txtLoader(file_path)
+    elif content_type == 'text/csv':
+        loader = CSVLoader(file_path)
+    else:
+        raise ValueError(f"Unsupported content type: {content_type}")
+    return "\n\n".join(doc.page_content for doc in loader.load())
+
+
+def split_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+    )
+    return splitter.split_text(text)
+
+
+def _serve(conn: Connection, limit_mb: int) -> None:
+    """Run ``(fn, args)`` requests from ``conn`` until told to stop"""
+    _limit_memory(limit_mb)
+    while True:
+        request = conn.recv()
+        if request is None:
+            return
+        fn, args = request
+        try:
+            response = (True, fn(*args))
+        except BaseException as e:
+            response = (False, e)
+        try:
+            conn.send(response)
+        except Exception as e:
+            # E.g. an exception that cannot be pickled
+            conn.send((False, RuntimeError(f"{fn.__name__} failed: {response[1]!r} ({e})")))
+
+
+# -------- pool --------
+class _ExtractionProcess:
+    """One extraction process and the parent's end of its pipe."""
+
+    def __init__(self):
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        # Never fork a process that is running an event loop
+        self.process = context.Process(
+            target=_serve, args=(child_conn, settings.EXTRACTION_MEMORY_LIMIT_MB), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def call(self, fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[bool, Any]:
+        """Run ``fn(*args)`` in the process and wait for (succeeded, result or exception), blocking"""
+        self.conn.send((fn, args))
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            raise RuntimeError(f"Extraction process exited during {fn.__name__}") from None
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=5)
+        except Exception:
+            pass
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class ExtractionPool:
+    """
+    Bounded pool of processes for CPU-bound document parsing and chunking.
+
+    Work runs outside the event loop's process, with a memory cap per process, and at
+    most ``EXTRACTION_MAX_WORKERS`` calls run at once. Each call has a process to
+    itself, so a call that exceeds its timeout (a stuck parser cannot be interrupted
+    any other way) kills only its own process; other calls, e.g. of other ingestion
+    jobs, keep running, and a new process takes the killed one's place on demand.
+    """
+
+    def __init__(self):
+        self._idle: List[_ExtractionProcess] = []
+        self._busy: Set[_ExtractionProcess] = set()
+        # asyncio primitives belong to one event loop
+        self._slots: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        for stale_loop in [l for l in self._slots if l.is_closed()]:
+            del self._slots[stale_loop]
+        semaphore = self._slots.get(loop)
+        if semaphore is None:
+            semaphore = self._slots[loop] = asyncio.Semaphore(settings.EXTRACTION_MAX_WORKERS)
+        return semaphore
+
+    async def run(self, fn: Callable[..., T], *args: Any, timeout: Optional[float] = None) -> T:
+        """Run ``fn(*args)`` in an extraction process, raising TimeoutError after ``timeout`` seconds"""
+        loop = asyncio.get_running_loop()
+        async with self._semaphore():
+            worker = self._idle.pop() if self._idle else _ExtractionProcess()
+            self._busy.add(worker)
+            try:
+                # The pipe is read on a thread; killing the process ends the read
+                ok, result = await asyncio.wait_for(
+                    loop.run_in_executor(None, worker.call, fn, args), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"{fn.__name__} exceeded {timeout:.0f}s, killing its extraction process")
+                self._discard(worker)
+                raise TimeoutError(f"Document extraction timed out after {settings.EXTRACTION_TIMEOUT}s")
+            except BaseException:
+                # Cancelled, or the process died: its state is unknown
+                self._discard(worker)
+                raise
+            self._busy.discard(worker)
+            self._idle.append(worker)
+        if not ok:
+            raise result
+        return result
+
+    def _discard(self, worker: _ExtractionProcess) -> None:
+        self._busy.discard(worker)
+        worker.kill()
+
+    def shutdown(self) -> None:
+        idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+        for worker in list(self._busy):
+            self._discard(worker)
+
+
+extraction_pool = ExtractionPool()
@@ -1,35 +1,311 @@
 import asyncio
+import hashlib
 import json
 import logging
 import time
 import re
 import httpx
-from typing import Dict, Any, Optional, List, Tuple, Union
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Iterable, Optional, List, Tuple, Union
 import uuid
+from dataclasses import dataclass
 from pydantic import ValidationError
 
+from ..core.config import settings
+from ..core.utils.local_cache import LocalCache
 from ..schemas.function_tool import FunctionToolRead, AuthType
 from ..utils.db_utils import with_worker_db
-from ..crud.crud_function_tool import crud_function_tools
+from ..crud.crud_function_tool import crud_function_tools, FUNCTION_TOOL_CACHE
 
 logger = logging.getLogger("function-executor")
 
+# {param} in endpoint paths, ${param} in request templates
+_PATH_PARAM = re.compile(r"\{(\w+)\}")
+_BODY_PARAM = re.compile(r"\$\{(\w+)\}")
+
+
+def _compile_template(template: Any) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Compile a request template into a function of the call parameters.
+
+    Placeholders are replaced by the value's text (strings as they are, other values as
+    JSON), also when a placeholder is the whole string: ``"${n}"`` with ``n=5`` renders
+    ``"5"``, as the text substitution this replaces did. Placeholders without a matching
+    parameter are left as they are.
+    """
+    if isinstance(template, dict):
+        items = [(key, _compile_template(value)) for key, value in template.items()]
+        return lambda params: {key: render(params) for key, render in items}
+
+    if isinstance(template, list):
+        renders = [_compile_template(value) for value in template]
+        return lambda params: [render(params) for render in renders]
+
+    if isinstance(template, str):
+        parts = _BODY_PARAM.split(template)
+        if len(parts) > 1:
+            # Alternating literal text and parameter names
+            def render_text(params: Dict[str, Any]) -> str:
+                out = []
+                for i, part in enumerate(parts):
+                    if i % 2 == 0:
+                        out.append(part)
+                    elif part in params:
+                        value = params[part]
+                        out.append(value if isinstance(value, str) else json.dumps(value))
+                    else:
+                        out.append("${" + part + "}")
+                return "".join(out)
+            return render_text
+
+    return lambda params: template
+
+
+class CompiledFunctionTool:
+    """A function tool definition with its URL, body and response mapping pre-parsed."""
+
+    def __init__(self, tool: FunctionToolRead):
+        self.tool = tool
+        # Content fingerprint, so a preload only recompiles definitions that changed
+        self.version = self.fingerprint(tool)
+
+        self.base_url = tool.base_url.rstrip('/')
+        self.path_parts = _PATH_PARAM.split(tool.endpoint_path.lstrip('/'))
+        self.path_params = frozenset(self.path_parts[1::2])
+        self.render_body = _compile_template(tool.request_template) if tool.request_template else None
+        # Only GET functions may opt in to response caching
+        self.cache_ttl = tool.execution_options.cache_ttl_seconds if tool.http_method == "GET" else None
+        self.response_paths = {
+            output_field: tuple(int(part) if part.isdigit() else part for part in path.split('.'))
+            for output_field, path in tool.response_mapping.items()
+        }
+
+    @staticmethod
+    def fingerprint(tool: FunctionToolRead) -> str:
+        return hashlib.sha256(tool.model_dump_json().encode()).hexdigest()
+
+    def response_key(self, parameters: Dict[str, Any], auth_headers: Optional[Dict[str, str]]) -> str:
+        """Cache key for a call: tool, definition version and normalized arguments"""
+        arguments = json.dumps([parameters, auth_headers or {}], sort_keys=True, default=str)
+        return f"{self.tool.id}:{self.version}:{hashlib.sha256(arguments.encode()).hexdigest()}"
+
+    def build_url(self, parameters: Dict[str, Any]) -> str:
+        path = []
+        for i, part in enumerate(self.path_parts):
+            if i % 2 == 0:
+                path.append(part)
+            elif part in parameters:
+                path.append(str(parameters[part]))
+            else:
+                path.append("{" + part + "}")
+        return f"{self.base_url}/{''.join(path)}"
+
+
+@dataclass
+class HostMetrics:
+    """Request timing counters for one function host."""
+    requests: int = 0
+    new_connections: int = 0
+    connect_time: float = 0.0
+    server_time: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "avg_connect_ms": (self.connect_time / self.new_connections * 1000) if self.new_connections else 0.0,
+            "avg_server_ms": (self.server_time / self.requests * 1000) if self.requests else 0.0,
+        }
+
+
+class _RequestTrace:
+    """Collects httpcore trace events to split connection setup from server time."""
+
+    def __init__(self):
+        self.events: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        self.events[event_name] = time.perf_counter()
+
+    def _span(self, start_suffix: str, end_suffix: str) -> Optional[float]:
+        start = next((t for name, t in self.events.items() if name.endswith(start_suffix)), None)
+        end = next((t for name, t in self.events.items() if name.endswith(end_suffix)), None)
+        return end - start if start is not None and end is not None else None
+
+    @property
+    def connect_time(self) -> Optional[float]:
+        """TCP + TLS setup, or None when a pooled connection was reused"""
+        return self._span("connect_tcp.started", "start_tls.complete") or self._span(
+            "connect_tcp.started", "connect_tcp.complete"
+        )
+
+    @property
+    def server_time(self) -> Optional[float]:
+        """From sending the request headers to receiving the response headers"""
+        return self._span("send_request_headers.started", "receive_response_headers.complete")
+
+
 class FunctionExecutor:
     """Service for executing function tools via HTTP requests."""
     
-    def __init__(self, timeout_seconds: float = 30.0):
+    def __init__(self, timeout_seconds: Optional[float] = None):
         """Initialize the function executor.
         
         Args:
-            timeout_seconds: Maximum timeout for HTTP requests
+            timeout_seconds: Default timeout for HTTP requests, overridable per tool
         """
-        self.timeout_seconds = timeout_seconds
+        self.timeout_seconds = timeout_seconds or settings.FUNCTION_HTTP_TIMEOUT
+        # Long-lived clients, one per event loop, so connections to tool hosts are reused
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._host_slots: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Semaphore] = {}
+        self.host_metrics: Dict[str, HostMetrics] = {}
+        # Tool ID -> compiled definition, invalidated when the tool is updated or deleted
+        self.tool_cache = LocalCache(
+            FUNCTION_TOOL_CACHE,
+            ttl=settings.FUNCTION_TOOL_CACHE_TTL,
+            loader=self._load_tool
+        )
+        # Responses of GET functions that opted in, with per-entry expiry
+        self._responses: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+        self.response_hits = 0
+        self.response_misses = 0
+        self.coalesced_requests = 0
+
+    @staticmethod
+    async def _load_tool(function_id: str) -> Optional[CompiledFunctionTool]:
+        tool = await with_worker_db(
+            lambda db: crud_function_tools.get(db=db, id=uuid.UUID(function_id))
+        )
+        return CompiledFunctionTool(tool) if tool else None
+
+    def preload(self, tools: Iterable[FunctionToolRead]) -> None:
+        """Seed the tool cache with definitions already loaded, e.g. from an agent snapshot"""
+        for tool in tools:
+            self._compile(tool)
+
+    def _compile(self, tool: FunctionToolRead) -> CompiledFunctionTool:
+        cached = self.tool_cache.get(tool.id)
+        if cached is not None and cached.version == CompiledFunctionTool.fingerprint(tool):
+            return cached
+        compiled = CompiledFunctionTool(tool)
+        self.tool_cache.set(tool.id, compiled)
+        return compiled
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        for stale_loop in [l for l in self._clients if l.is_closed()]:
+            del self._clients[stale_loop]
+            self._host_slots = {k: v for k, v in self._host_slots.items() if k[0] is not stale_loop}
+
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=settings.FUNCTION_HTTP2,
+                timeout=httpx.Timeout(self.timeout_seconds, connect=settings.FUNCTION_HTTP_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=settings.FUNCTION_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.FUNCTION_HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=settings.FUNCTION_HTTP_KEEPALIVE_EXPIRY
+                )
+            )
+            self._clients[loop] = client
+        return client
+
+    def _host_slot(self, host: str) -> asyncio.Semaphore:
+        """Bounds concurrent requests (and so connections) to a single host"""
+        key = (asyncio.get_running_loop(), host)
+        slot = self._host_slots.get(key)
+        if slot is None:
+            slot = asyncio.Semaphore(settings.FUNCTION_HTTP_MAX_CONNECTIONS_PER_HOST)
+            self._host_slots[key] = slot
+        return slot
+
+    def _get_timeout(self, function_tool: FunctionToolRead) -> httpx.Timeout:
+        options = function_tool.execution_options
+        return httpx.Timeout(
+            options.timeout_seconds or self.timeout_seconds,
+            connect=options.connect_timeout_seconds or settings.FUNCTION_HTTP_CONNECT_TIMEOUT
+        )
+
+    async def aclose(self) -> None:
+        """Close the HTTP client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        self._host_slots = {k: v for k, v in self._host_slots.items() if k[0] is not loop}
+        if client is not None:
+            await client.aclose()
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Connect and server timings per function host"""
+        return {host: metrics.to_dict() for host, metrics in self.host_metrics.items()}
+
+    def response_cache_stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._responses),
+            "hits": self.response_hits,
+            "misses": self.response_misses,
+            "coalesced": self.coalesced_requests,
+        }
+
+    async def _fetch(
+        self,
+        compiled: CompiledFunctionTool,
+        parameters: Dict[str, Any],
+        auth_headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the response for a call, from the response cache when the tool allows it.
+
+        Concurrent identical calls to a cacheable tool share one in-flight request. The
+        request runs in its own task, so a caller being cancelled does not fail the others.
+        """
+        if not compiled.cache_ttl:
+            return await self._make_http_request(compiled, parameters, auth_headers)
+
+        key = compiled.response_key(parameters, auth_headers)
+        entry = self._responses.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._responses.move_to_end(key)
+            self.response_hits += 1
+            return entry[1]
+
+        inflight_key = (asyncio.get_running_loop(), key)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            self.response_misses += 1
+            task = asyncio.create_task(self._make_http_request(compiled, parameters, auth_headers))
+            self._inflight[inflight_key] = task
+            task.add_done_callback(
+                lambda t: self._store_response(inflight_key, compiled.cache_ttl, t)
+            )
+        else:
+            self.coalesced_requests += 1
+        return await asyncio.shield(task)
+
+    def _store_response(
+        self,
+        inflight_key: Tuple[asyncio.AbstractEventLoop, str],
+        ttl: float,
+        task: asyncio.Task
+    ) -> None:
+        self._inflight.pop(inflight_key, None)
+        # Errors are never cached; retrieving the exception also keeps asyncio from
+        # logging it when every waiter was cancelled
+        if task.cancelled() or task.exception() is not None:
+            return
+        key = inflight_key[1]
+        self._responses[key] = (time.monotonic() + ttl, task.result())
+        self._responses.move_to_end(key)
+        while len(self._responses) > settings.FUNCTION_RESPONSE_CACHE_MAXSIZE:
+            self._responses.popitem(last=False)
         
     async def execute_function(
         self, 
         function_id: uuid.UUID, 
         parameters: Dict[str, Any],
-        auth_headers: Optional[Dict[str, str]] = None
+        auth_headers: Optional[Dict[str, str]] = None,
+        function_tool: Optional[FunctionToolRead] = None
     ) -> Dict[str, Any]:
         """Execute a function tool by ID.
         
@@ -37,6 +313,7 @@ class FunctionExecutor:
             function_id: UUID of the function to execute
             parameters: Parameters to pass to the function
             auth_headers: Optional auth headers to include (for runtime auth)
+            function_tool: Optional definition already loaded by the caller
             
         Returns:
             Dict containing the execution results
@@ -44,26 +321,28 @@ class FunctionExecutor:
         start_time = time.time()
         
         try:
-            # Get the function tool definition
-            function_tool = await with_worker_db(
-                lambda db: crud_function_tools.get(db=db, id=function_id)
-            )
+            # Get the compiled function tool definition, from the database only on a cache miss
+            if function_tool is not None:
+                compiled = self._compile(function_tool)
+            else:
+                compiled = await self.tool_cache.get_or_load(function_id)
             
-            if not function_tool:
+            if not compiled:
                 raise ValueError(f"Function tool with ID {function_id} not found")
+            function_tool = compiled.tool
                 
             if not function_tool.active:
                 raise ValueError(f"Function tool '{function_tool.name}' is not active")
                 
-            # Execute the HTTP request
-            response_data = await self._make_http_request(
-                function_tool=function_tool,
+            # Execute the HTTP request, or reuse a cached response
+            response_data = await self._fetch(
+                compiled=compiled,
                 parameters=parameters,
                 auth_headers=auth_headers
             )
             
             # Process the response
-            result = self._process_response(function_tool, response_data)
+            result = self._process_response(compiled, response_data)
             
             # Calculate execution time
             execution_time_ms = (time.time() - start_time) * 1000
@@ -91,22 +370,24 @@ class FunctionExecutor:
     
     async def _make_http_request(
         self,
-        function_tool: FunctionToolRead,
+        compiled: CompiledFunctionTool,
         parameters: Dict[str, Any],
         auth_headers: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """Make the actual HTTP request.
         
         Args:
-            function_tool: The function tool definition
+            compiled: The compiled function tool definition
             parameters: Parameters to pass to the function
             auth_headers: Optional auth headers
             
         Returns:
             Dict containing the HTTP response data
         """
+        function_tool = compiled.tool
+
         # Construct the URL with path parameters
-        url = self._build_url(function_tool, parameters)
+        url = compiled.build_url(parameters)
         
         # Prepare headers
         headers = function_tool.headers.copy()
@@ -128,29 +409,43 @@ class FunctionExecutor:
         # Prepare request body if needed
         request_body = None
         if function_tool.http_method in ("POST", "PUT", "PATCH"):
-            request_body = self._build_request_body(function_tool, parameters)
+            request_body = self._build_request_body(compiled, parameters)
         
         # Create query parameters for GET requests
         query_params = None
         if function_tool.http_method == "GET":
-            query_params = self._build_query_params(function_tool, parameters)
+            query_params = self._build_query_params(compiled, parameters)
         
-        # Make the HTTP request
+        if function_tool.http_method not in ("GET", "POST", "PUT", "DELETE", "PATCH"):
+            raise ValueError(f"Unsupported HTTP method: {function_tool.http_method}")
+
+        # Make the HTTP request on the pooled client
         logger.info(f"Making {function_tool.http_method} request to {url}")
-        
-        async with httpx.AsyncClient(timeout=self.timeout_seconds) as client:
-            if function_tool.http_method == "GET":
-                response = await client.get(url, headers=headers, params=query_params)
-            elif function_tool.http_method == "POST":
-                response = await client.post(url, headers=headers, json=request_body)
-            elif function_tool.http_method == "PUT":
-                response = await client.put(url, headers=headers, json=request_body)
-            elif function_tool.http_method == "DELETE":
-                response = await client.delete(url, headers=headers)
-            elif function_tool.http_method == "PATCH":
-                response = await client.patch(url, headers=headers, json=request_body)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {function_tool.http_method}")
+
+        host = httpx.URL(url).host
+        trace = _RequestTrace()
+        async with self._host_slot(host):
+            response = await self._get_client().request(
+                function_tool.http_method,
+                url,
+                headers=headers,
+                params=query_params,
+                json=request_body,
+                timeout=self._get_timeout(function_tool),
+                extensions={"trace": trace}
+            )
+
+        metrics = self.host_metrics.setdefault(host, HostMetrics())
+        metrics.requests += 1
+        if trace.connect_time is not None:
+            metrics.new_connections += 1
+            metrics.connect_time += trace.connect_time
+        if trace.server_time is not None:
+            metrics.server_time += trace.server_time
+        logger.info(
+            f"{function_tool.http_method} {host}: connect "
+            f"{(trace.connect_time or 0) * 1000:.0f}ms, server {(trace.server_time or 0) * 1000:.0f}ms"
+        )
         
         # Check for successful response
         if response.status_code >= 400:
@@ -168,75 +463,38 @@ class FunctionExecutor:
             logger.error(f"Error parsing response: {e}")
             return {"text": response.text}
     
-    def _build_url(self, function_tool: FunctionToolRead, parameters: Dict[str, Any]) -> str:
-        """Build the full URL, replacing path parameters.
-        
-        Args:
-            function_tool: The function tool definition
-            parameters: Parameters to pass to the function
-            
-        Returns:
-            Complete URL with path parameters replaced
-        """
-        base_url = function_tool.base_url.rstrip('/')
-        endpoint_path = function_tool.endpoint_path.lstrip('/')
-        
-        # Replace path parameters (format: {param_name})
-        path = endpoint_path
-        for param_name, param_value in parameters.items():
-            placeholder = "{" + param_name + "}"
-            if placeholder in path:
-                path = path.replace(placeholder, str(param_value))
-        
-        return f"{base_url}/{path}"
-    
-    def _build_request_body(self, function_tool: FunctionToolRead, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    def _build_request_body(self, compiled: CompiledFunctionTool, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Build the request body from the template and parameters.
         
         Args:
-            function_tool: The function tool definition
+            compiled: The compiled function tool definition
             parameters: Parameters to pass to the function
             
         Returns:
             Dict containing the request body
         """
-        if not function_tool.request_template:
+        if compiled.render_body is None:
             # If no template is provided, use parameters as the body
             return parameters
         
-        # Make a deep copy of the template
-        body = json.loads(json.dumps(function_tool.request_template))
-        
-        # Replace parameter placeholders in the template (format: ${param_name})
-        body_json = json.dumps(body)
-        for param_name, param_value in parameters.items():
-            placeholder = "${" + param_name + "}"
-            body_json = body_json.replace(placeholder, json.dumps(param_value))
-        
-        # Parse the JSON back into a dict
-        return json.loads(body_json)
+        return compiled.render_body(parameters)
     
-    def _build_query_params(self, function_tool: FunctionToolRead, parameters: Dict[str, Any]) -> Dict[str, str]:
+    def _build_query_params(self, compiled: CompiledFunctionTool, parameters: Dict[str, Any]) -> Dict[str, str]:
         """Build query parameters for GET requests.
         
         Args:
-            function_tool: The function tool definition
+            compiled: The compiled function tool definition
             parameters: Parameters to pass to the function
             
         Returns:
             Dict containing query parameters
         """
-        # Filter out parameters used in the path
-        query_params = {}
-        
-        for param_name, param_value in parameters.items():
-            # Skip parameters that are used in the path
-            placeholder = "{" + param_name + "}"
-            if placeholder not in function_tool.endpoint_path:
-                # Convert all values to strings for query parameters
-                query_params[param_name] = str(param_value)
-                
-        return query_params
+        # Skip parameters that are used in the path, converting the rest to strings
+        return {
+            param_name: str(param_value)
+            for param_name, param_value in parameters.items()
+            if param_name not in compiled.path_params
+        }
     
     def _get_error_message(self, function_tool: FunctionToolRead, response) -> str:
         """Get an appropriate error message from the response.
@@ -267,49 +525,45 @@ class FunctionExecutor:
             # If we can't parse the response, return a generic message
             return f"HTTP {response.status_code} error"
     
-    def _process_response(self, function_tool: FunctionToolRead, response_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_response(self, compiled: CompiledFunctionTool, response_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process the response according to the response mapping.
         
         Args:
-            function_tool: The function tool definition
+            compiled: The compiled function tool definition
             response_data: The response data
             
         Returns:
             Processed response according to the mapping
         """
-        if not function_tool.response_mapping:
+        if not compiled.response_paths:
             # If no mapping is provided, return the full response
             return response_data
         
         # Apply the response mapping
         result = {}
-        for output_field, path in function_tool.response_mapping.items():
+        for output_field, path in compiled.response_paths.items():
             try:
                 value = self._extract_value_from_path(response_data, path)
                 result[output_field] = value
             except (KeyError, IndexError) as e:
-                logger.warning(f"Could not extract {path} from response: {e}")
+                logger.warning(f"Could not extract {'.'.join(map(str, path))} from response: {e}")
                 result[output_field] = None
                 
         return result
     
-    def _extract_value_from_path(self, data: Dict[str, Any], path: str) -> Any:
-        """Extract a value from a nested dictionary using a dot-notation path.
+    def _extract_value_from_path(self, data: Dict[str, Any], path: Tuple[Union[str, int], ...]) -> Any:
+        """Extract a value from a nested dictionary using a pre-split path.
         
         Args:
             data: The data to extract from
-            path: The dot-notation path (e.g., "data.items.0.name")
+            path: The path parts, with array indexes already converted to ints
             
         Returns:
             The extracted value
         """
         current = data
-        for part in path.split('.'):
-            # Handle array index notation (e.g., "items.0")
-            if part.isdigit():
-                current = current[int(part)]
-            else:
-                current = current[part]
+        for part in path:
+            current = current[part]
         return current
 
 # Create a singleton instance
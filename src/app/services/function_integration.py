@@ -44,6 +44,7 @@ class FunctionIntegrationService:
                 return
                 
             logger.info(f"Found {len(functions)} functions assigned to agent {agent_id}")
+            function_executor.preload(functions)
             
             # Create function context if not exists
             if agent.fnc_ctx is None:
@@ -14,7 +14,9 @@ from livekit.agents import (
     metrics,
 )
 from livekit.agents.pipeline import VoicePipelineAgent
-from livekit.plugins import deepgram, openai, silero
+from livekit.plugins import deepgram, openai
+
+from .model_registry import model_registry
 
 # Configure logging
 logger = logging.getLogger("voice-assistant")
@@ -23,7 +25,7 @@ logger = logging.getLogger("voice-assistant")
 def prewarm(proc: JobProcess):
     """Initialize any resources that should be preloaded and cached."""
     # Cache the VAD model to avoid loading it repeatedly
-    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["vad"] = model_registry.vad()
 
 
 async def entrypoint(ctx: JobContext):
@@ -0,0 +1,439 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from livekit import api
+from livekit.protocol.webhook import WebhookEvent
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.db.database import local_session
+from ..models.connections import Connection
+from ..models.sip import SIPCall, SIPCallDirection
+
+logger = logging.getLogger("livekit-webhooks")
+
+# Marks a webhook event as received, so LiveKit retries are acknowledged without re-running it
+WEBHOOK_EVENT_PREFIX = "livekit-webhook:"
+# Received events wait here for the consumer group running in the arq worker
+WEBHOOK_STREAM = "livekit-webhooks"
+WEBHOOK_GROUP = "livekit-webhook-consumers"
+# Marks an event as applied to the database, checked when an entry is delivered again
+WEBHOOK_PROCESSED_PREFIX = "livekit-webhook-done:"
+# Events that failed LIVEKIT_WEBHOOK_MAX_DELIVERIES times, kept for replay
+WEBHOOK_DEAD_LETTER_STREAM = "livekit-webhooks:dead"
+# Hash of each consumer's WebhookConsumerMetrics, read by stream_stats
+WEBHOOK_CONSUMER_METRICS_PREFIX = "livekit-webhook-consumer:"
+
+
+class CallNotPersisted(Exception):
+    """The call a webhook refers to is not in the database yet; the webhook is retried later."""
+
+
+async def claim_event(client: Optional[Redis], event_id: Optional[str]) -> bool:
+    """
+    Claim a webhook event for processing.
+
+    Returns False when the event was already claimed, i.e. this delivery is a retry.
+    Events without an ID, or without Redis, are always processed.
+    """
+    if not event_id or client is None:
+        return True
+    try:
+        claimed = await client.set(
+            f"{WEBHOOK_EVENT_PREFIX}{event_id}", 1, nx=True, ex=settings.LIVEKIT_WEBHOOK_EVENT_TTL
+        )
+        return bool(claimed)
+    except Exception as e:
+        logger.warning(f"Could not claim webhook event {event_id}: {e}")
+        return True
+
+
+async def release_event(client: Optional[Redis], event_id: Optional[str]) -> None:
+    """Forget a claimed event that could not be handled, so a retry runs it again"""
+    if not event_id or client is None:
+        return
+    try:
+        await client.delete(f"{WEBHOOK_EVENT_PREFIX}{event_id}")
+    except Exception as e:
+        logger.warning(f"Could not release webhook event {event_id}: {e}")
+
+
+async def _find_call_room(
+    db: AsyncSession,
+    from_number: str,
+    call_sid: Optional[str]
+) -> Optional[str]:
+    if call_sid:
+        # The inbound webhook names the room after the caller and the call SID
+        return await db.scalar(
+            select(Connection.room_id)
+            .where(or_(
+                Connection.room_id == f"call-_{from_number}_{call_sid}",
+                Connection.call_id == call_sid,
+            ))
+            .limit(1)
+        )
+
+    # No call SID: the latest recent inbound webhook call from this number, found through
+    # the (phone_number, created_at) index. Its connection must still have the provisional
+    # room ID, so an earlier call that was already moved is never picked up instead.
+    return await db.scalar(
+        select(SIPCall.room_id)
+        .join(Connection, Connection.room_id == SIPCall.room_id)
+        .where(
+            SIPCall.phone_number == from_number,
+            SIPCall.direction == SIPCallDirection.INBOUND,
+            SIPCall.is_deleted == False,
+            SIPCall.created_at >= datetime.now(timezone.utc) - timedelta(seconds=settings.LIVEKIT_CALL_JOIN_WINDOW),
+            SIPCall.room_id.startswith(f"call-_{from_number}_", autoescape=True),
+        )
+        .order_by(SIPCall.created_at.desc())
+        .limit(1)
+    )
+
+
+async def reconcile_participant_joined(
+    db: AsyncSession,
+    room_name: str,
+    attributes: Dict[str, Any]
+) -> bool:
+    """
+    Move the connection and SIP call of an inbound call to the LiveKit room it joined.
+
+    The inbound webhook stores the call under a provisional room ID; once the caller
+    joins, both records are renamed to the real room in one transaction.
+
+    Returns:
+        True if the records point at ``room_name`` afterwards
+
+    Raises:
+        CallNotPersisted: if the call's records are not written yet
+    """
+    from_number = attributes.get("sip.phoneNumber")
+    if not from_number:
+        return False
+    call_sid = attributes.get("sip.twilio.callSid")
+
+    if await db.scalar(select(Connection.room_id).where(Connection.room_id == room_name)):
+        # Moved by an earlier delivery of this event
+        return True
+
+    old_room_id = await _find_call_room(db, from_number, call_sid)
+    if old_room_id is None:
+        raise CallNotPersisted(f"No connection found for from_number {from_number}")
+    if old_room_id == room_name:
+        logger.info(f"Room_id already matches {room_name} for from_number {from_number}")
+        return True
+
+    result = await db.execute(
+        update(Connection)
+        .where(Connection.room_id == old_room_id)
+        .values(room_id=room_name)
+        .returning(Connection.room_id, Connection.call_id)
+    )
+    moved = result.one_or_none()
+    if moved is None:
+        # Moved by a concurrent delivery; the retry finds it under room_name
+        await db.rollback()
+        raise CallNotPersisted(f"No connection with room_id {old_room_id} to move to {room_name}")
+
+    connection_call_id = moved.call_id
+    if connection_call_id:
+        await db.execute(
+            update(SIPCall)
+            .where(SIPCall.call_id == connection_call_id, SIPCall.is_deleted == False)
+            .values(room_id=room_name)
+        )
+    await db.commit()
+    logger.info(f"Moved connection and SIP call for CallSid {connection_call_id} from {old_room_id} to {room_name}")
+    return True
+
+
+async def process_webhook_event(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    event = payload.get("event")
+    room_name = payload.get("room", {}).get("name")
+
+    if event == "participant_joined":
+        attributes = payload.get("participant", {}).get("attributes", {})
+        if room_name:
+            await reconcile_participant_joined(db, room_name, attributes)
+
+    elif event == "room_finished":
+        if room_name:
+            logger.info(f"Room {room_name} finished, connection left intact")
+
+
+def verify_webhook(body: str, auth_token: str) -> WebhookEvent:
+    """
+    Check the signature of a webhook body and parse it.
+
+    Raises:
+        Exception: if the token is missing, not signed with our API secret, or signed for another body
+    """
+    receiver = api.WebhookReceiver(api.TokenVerifier(settings.LIVEKIT_API_KEY, settings.LIVEKIT_API_SECRET))
+    return receiver.receive(body, auth_token)
+
+
+async def enqueue_webhook(client: Redis, event_id: Optional[str], body: str) -> bool:
+    """
+    Append a verified webhook to the stream.
+
+    Returns:
+        False when the event was already received, True when it was queued
+    """
+    if not await claim_event(client, event_id):
+        return False
+    try:
+        await client.xadd(
+            WEBHOOK_STREAM,
+            {"id": event_id or "", "body": body},
+            maxlen=settings.LIVEKIT_WEBHOOK_STREAM_MAXLEN,
+            approximate=True,
+        )
+    except Exception:
+        await release_event(client, event_id)
+        raise
+    return True
+
+
+def _decode_fields(fields: Dict[Any, Any]) -> Dict[str, str]:
+    # The arq pool does not decode responses
+    return {
+        (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+        for k, v in fields.items()
+    }
+
+
+@dataclass
+class WebhookConsumerMetrics:
+    """Counters of one consumer process."""
+    batches: int = 0
+    processed: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    dead_lettered: int = 0
+    last_batch_seconds: float = 0.0
+
+
+class WebhookConsumer:
+    """
+    Applies queued LiveKit webhooks to the database, as a member of a Redis consumer group.
+
+    Entries are read in batches and handled on one database session per batch. An
+    entry is acknowledged, and its event ID marked as processed, only after its
+    changes are committed; a delivery of an already processed event is acknowledged
+    without running it again. Failed entries stay pending and are reclaimed after
+    ``LIVEKIT_WEBHOOK_CLAIM_IDLE_MS``, also from consumers that died; after
+    ``LIVEKIT_WEBHOOK_MAX_DELIVERIES`` attempts they move to the dead-letter stream.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.metrics = WebhookConsumerMetrics()
+
+    async def ensure_group(self, client: Redis) -> None:
+        try:
+            await client.xgroup_create(WEBHOOK_STREAM, WEBHOOK_GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def run(self, client: Redis) -> None:
+        await self.ensure_group(client)
+        logger.info(f"LiveKit webhook consumer {self.name} started")
+        next_claim_at = 0.0
+        while True:
+            try:
+                entries = []
+                if time.monotonic() >= next_claim_at:
+                    # Entries left pending by failed batches or by consumers that died
+                    claimed = await client.xautoclaim(
+                        WEBHOOK_STREAM,
+                        WEBHOOK_GROUP,
+                        self.name,
+                        min_idle_time=settings.LIVEKIT_WEBHOOK_CLAIM_IDLE_MS,
+                        start_id="0-0",
+                        count=settings.LIVEKIT_WEBHOOK_BATCH_SIZE,
+                    )
+                    entries.extend(claimed[1])
+                    next_claim_at = time.monotonic() + settings.LIVEKIT_WEBHOOK_CLAIM_IDLE_MS / 1000
+
+                if not entries:
+                    response = await client.xreadgroup(
+                        WEBHOOK_GROUP,
+                        self.name,
+                        {WEBHOOK_STREAM: ">"},
+                        count=settings.LIVEKIT_WEBHOOK_BATCH_SIZE,
+                        block=settings.LIVEKIT_WEBHOOK_BLOCK_MS,
+                    )
+                    for _, stream_entries in response or []:
+                        entries.extend(stream_entries)
+
+                if entries:
+                    await self.process_batch(client, entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"LiveKit webhook consumer error: {e}")
+                await asyncio.sleep(1)
+
+    async def publish_metrics(self, client: Redis) -> None:
+        """Store this consumer's counters in Redis, for stream_stats"""
+        key = f"{WEBHOOK_CONSUMER_METRICS_PREFIX}{self.name}"
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={**asdict(self.metrics), "updated_at": time.time()})
+                pipe.expire(key, settings.LIVEKIT_WEBHOOK_EVENT_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to publish LiveKit webhook consumer metrics: {e}")
+
+    async def process_batch(self, client: Redis, entries: List[Tuple[Any, Any]]) -> None:
+        started = time.perf_counter()
+        done: List[Tuple[Any, Optional[str]]] = []
+        dead: List[Tuple[Any, Dict[str, str]]] = []
+
+        async with local_session() as db:
+            for entry_id, raw_fields in entries:
+                if raw_fields is None:
+                    # Trimmed from the stream while pending
+                    done.append((entry_id, None))
+                    continue
+
+                fields = _decode_fields(raw_fields)
+                event_id = fields.get("id") or None
+                if event_id and not fields.get("replay") and await client.exists(f"{WEBHOOK_PROCESSED_PREFIX}{event_id}"):
+                    self.metrics.duplicates += 1
+                    done.append((entry_id, None))
+                    continue
+
+                try:
+                    await process_webhook_event(db, json.loads(fields["body"]))
+                    self.metrics.processed += 1
+                    done.append((entry_id, event_id))
+                except Exception as e:
+                    # Left pending, so the entry is retried once reclaimed
+                    await db.rollback()
+                    self.metrics.failed += 1
+                    if isinstance(e, CallNotPersisted):
+                        logger.info(f"Retrying LiveKit webhook {event_id} ({entry_id}) later: {e}")
+                    else:
+                        logger.error(f"Failed to process LiveKit webhook {event_id} ({entry_id}): {e}")
+                    pending = await client.xpending_range(
+                        WEBHOOK_STREAM, WEBHOOK_GROUP, min=entry_id, max=entry_id, count=1
+                    )
+                    if pending and pending[0]["times_delivered"] >= settings.LIVEKIT_WEBHOOK_MAX_DELIVERIES:
+                        dead.append((entry_id, fields))
+
+        async with client.pipeline(transaction=True) as pipe:
+            for entry_id, event_id in done:
+                if event_id:
+                    pipe.set(f"{WEBHOOK_PROCESSED_PREFIX}{event_id}", 1, ex=settings.LIVEKIT_WEBHOOK_EVENT_TTL)
+                pipe.xack(WEBHOOK_STREAM, WEBHOOK_GROUP, entry_id)
+            for entry_id, fields in dead:
+                pipe.xadd(WEBHOOK_DEAD_LETTER_STREAM, fields, maxlen=settings.LIVEKIT_WEBHOOK_STREAM_MAXLEN, approximate=True)
+                pipe.xack(WEBHOOK_STREAM, WEBHOOK_GROUP, entry_id)
+            await pipe.execute()
+
+        self.metrics.batches += 1
+        self.metrics.dead_lettered += len(dead)
+        self.metrics.last_batch_seconds = time.perf_counter() - started
+        await self.publish_metrics(client)
+        if dead:
+            logger.error(f"Moved {len(dead)} LiveKit webhooks to {WEBHOOK_DEAD_LETTER_STREAM}")
+        logger.debug(f"Processed {len(entries)} LiveKit webhooks in {self.metrics.last_batch_seconds:.3f}s")
+
+
+async def stream_stats(client: Redis) -> Dict[str, Any]:
+    """Backlog of the webhook stream (queued, pending and dead-lettered entries) and the counters of each consumer"""
+    stats: Dict[str, Any] = {
+        "length": await client.xlen(WEBHOOK_STREAM),
+        "dead_letter_length": await client.xlen(WEBHOOK_DEAD_LETTER_STREAM),
+    }
+    try:
+        groups = await client.xinfo_groups(WEBHOOK_STREAM)
+    except ResponseError:
+        # Stream not created yet
+        return stats
+
+    for group in groups:
+        group = _decode_fields(group)
+        if group.get("name") == WEBHOOK_GROUP:
+            stats.update({
+                "consumers": group.get("consumers"),
+                "pending": group.get("pending"),
+                # Entries not yet delivered to any consumer (Redis 7+)
+                "lag": group.get("lag"),
+                "last_delivered_id": group.get("last-delivered-id"),
+            })
+
+    # Per consumer: its share of the pending entries and its published counters
+    try:
+        consumers = [
+            _decode_fields(consumer) for consumer in await client.xinfo_consumers(WEBHOOK_STREAM, WEBHOOK_GROUP)
+        ]
+    except ResponseError:
+        # Consumer group not created yet
+        return stats
+    async with client.pipeline(transaction=False) as pipe:
+        for consumer in consumers:
+            pipe.hgetall(f"{WEBHOOK_CONSUMER_METRICS_PREFIX}{consumer['name']}")
+        metrics = await pipe.execute()
+    stats["consumer_metrics"] = {
+        consumer["name"]: {
+            "pending": consumer.get("pending"),
+            "idle_ms": consumer.get("idle"),
+            **_decode_fields(consumer_metrics),
+        }
+        for consumer, consumer_metrics in zip(consumers, metrics)
+    }
+    return stats
+
+
+async def replay_events(
+    client: Redis,
+    start: str = "-",
+    end: str = "+",
+    dead_letter: bool = False,
+    count: int = 1000
+) -> int:
+    """
+    Queue stored webhooks again, from the stream itself or from the dead-letter stream.
+
+    Replayed entries run even if their event was processed before. Entries replayed
+    from the dead-letter stream are removed from it.
+
+    Returns:
+        Number of entries queued
+    """
+    source = WEBHOOK_DEAD_LETTER_STREAM if dead_letter else WEBHOOK_STREAM
+    entries = await client.xrange(source, min=start, max=end, count=count)
+
+    async with client.pipeline(transaction=False) as pipe:
+        for entry_id, raw_fields in entries:
+            fields = _decode_fields(raw_fields)
+            pipe.xadd(
+                WEBHOOK_STREAM,
+                {"id": fields.get("id", ""), "body": fields["body"], "replay": "1"},
+                maxlen=settings.LIVEKIT_WEBHOOK_STREAM_MAXLEN,
+                approximate=True,
+            )
+            if dead_letter:
+                pipe.xdel(WEBHOOK_DEAD_LETTER_STREAM, entry_id)
+        await pipe.execute()
+
+    logger.info(f"Replayed {len(entries)} LiveKit webhooks from {source}")
+    return len(entries)
+
+
+webhook_consumer = WebhookConsumer()
@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+import psutil
+
+from ..core.config import settings
+
+logger = logging.getLogger("model-registry")
+
+
+@dataclass
+class ModelLoad:
+    """How long a model took to load and how much resident memory it added."""
+    load_seconds: float
+    rss_delta_mb: float
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of local inference models (VAD).
+
+    Each model is loaded once per process and the same instance is handed to every job.
+    The instances only hold read-only inference sessions, and each agent opens its own
+    stream on them, so jobs sharing a process (thread job executor) can use them
+    concurrently.
+
+    The turn detector is not cached: ``EOUModel`` runs on the worker's shared inference
+    process through the executor of the current job, so each job creates its own.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._loads: Dict[str, ModelLoad] = {}
+        # Jobs may run on several threads of the same process
+        self._lock = threading.Lock()
+
+    def get(self, name: str, loader: Callable[[], Any]) -> Any:
+        """Get a model by name, loading it with ``loader`` on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                process = psutil.Process()
+                rss_before = process.memory_info().rss
+                started = time.perf_counter()
+                model = loader()
+                load = ModelLoad(
+                    load_seconds=time.perf_counter() - started,
+                    rss_delta_mb=(process.memory_info().rss - rss_before) / (1024 * 1024)
+                )
+                self._models[name] = model
+                self._loads[name] = load
+                logger.info(f"Loaded {name} in {load.load_seconds:.2f}s (+{load.rss_delta_mb:.0f} MB)")
+        return model
+
+    def vad(self) -> Any:
+        from livekit.plugins import silero
+
+        return self.get("silero-vad", silero.VAD.load)
+
+    def turn_detector(self) -> Any:
+        """
+        A new end-of-utterance model for the current job, or None when turn detection is
+        disabled. Must be called from within a job entrypoint.
+        """
+        if not settings.LIVEKIT_TURN_DETECTOR_ENABLED:
+            return None
+        from livekit.plugins import turn_detector
+
+        return turn_detector.EOUModel()
+
+    def prewarm(self) -> None:
+        """Load the models shared by all jobs, so the first job in this process starts warm"""
+        self.vad()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "models": {
+                name: {"load_seconds": round(load.load_seconds, 3), "rss_delta_mb": round(load.rss_delta_mb, 1)}
+                for name, load in self._loads.items()
+            },
+            "rss_mb": round(psutil.Process().memory_info().rss / (1024 * 1024), 1),
+        }
+
+
+model_registry = ModelRegistry()
@@ -1,4 +1,7 @@
-from typing import Dict, Any
+import asyncio
+import hashlib
+import json
+from typing import Dict, Any, Optional, Tuple
 from livekit.agents import llm
 from livekit.plugins import deepgram, openai, elevenlabs, uplift, google
 from livekit.plugins.elevenlabs.tts import Voice, VoiceSettings
@@ -10,9 +13,138 @@ import logging
 
 logger = logging.getLogger("provider-factory")
 
+class PrewarmedClients:
+    """
+    TTS/STT clients opened by ``ProviderFactory.prewarm`` before the job's agent exists,
+    keyed by provider, API key and options.
+
+    The first ``create_*`` call with the same configuration takes the client over, so
+    the agent starts with connections already open. Clients are kept per event loop
+    because their sessions belong to the job that created them; they are not shared
+    between jobs, and the ones no agent took are closed at job shutdown.
+    """
+
+    def __init__(self):
+        self.prewarmed = 0
+        self.claimed = 0
+        self._clients: Dict[asyncio.AbstractEventLoop, Dict[Tuple[str, ...], Any]] = {}
+
+    def _for_loop(self) -> Dict[Tuple[str, ...], Any]:
+        loop = asyncio.get_running_loop()
+        for stale_loop in [l for l in self._clients if l.is_closed()]:
+            del self._clients[stale_loop]
+        return self._clients.setdefault(loop, {})
+
+    @staticmethod
+    def make_key(kind: str, provider: Any, api_key: str, options: Dict[str, Any], *extra: Any) -> Tuple[str, ...]:
+        return (
+            kind,
+            json.dumps(provider, sort_keys=True, default=str),
+            hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16],
+            json.dumps(options or {}, sort_keys=True, default=str),
+            *(str(e) for e in extra),
+        )
+
+    def put(self, key: Tuple[str, ...], instance: Any) -> None:
+        self._for_loop()[key] = instance
+        self.prewarmed += 1
+
+    def take(self, key: Tuple[str, ...]) -> Optional[Any]:
+        """The prewarmed client for ``key``, or None; a client is handed out once"""
+        try:
+            instance = self._for_loop().pop(key, None)
+        except RuntimeError:
+            # No running loop, so nothing was prewarmed for this caller
+            return None
+        if instance is not None:
+            self.claimed += 1
+        return instance
+
+    async def aclose(self) -> None:
+        """Close the clients of the running event loop that no agent took"""
+        clients = self._clients.pop(asyncio.get_running_loop(), None)
+        for instance in (clients or {}).values():
+            close = getattr(instance, "aclose", None)
+            if close is None:
+                continue
+            try:
+                await close()
+            except Exception as e:
+                logger.warning(f"Error closing prewarmed provider client {instance!r}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"prewarmed": self.prewarmed, "claimed": self.claimed}
+
+
+prewarmed_clients = PrewarmedClients()
+
+
 class ProviderFactory:
     @staticmethod
     def create_llm(provider: str, options: Dict[str, Any]) -> llm.LLM:
+        """Create LLM based on provider type and options"""
+        return ProviderFactory.build_llm(provider, options)
+
+    @staticmethod
+    def create_tts(provider: str, options: Dict[str, Any]) -> Any:
+        """Get the prewarmed TTS client for the provider and options, or a new one"""
+        key = PrewarmedClients.make_key("tts", provider, ProviderFactory._tts_api_key(provider), options)
+        return prewarmed_clients.take(key) or ProviderFactory.build_tts(provider, options)
+
+    @staticmethod
+    def create_stt(provider: str, options: Dict[str, Any], is_telephony: bool = False) -> Any:
+        """Get the prewarmed STT client for the provider and options, or a new one"""
+        key = PrewarmedClients.make_key("stt", provider, ProviderFactory._stt_api_key(provider), options, is_telephony)
+        return prewarmed_clients.take(key) or ProviderFactory.build_stt(provider, options, is_telephony=is_telephony)
+
+    @staticmethod
+    def prewarm(profile_config: Dict[str, Any], is_telephony: bool = False) -> None:
+        """
+        Create the agent's TTS and STT clients ahead of the first participant and open
+        their connections, so the greeting and first transcript skip connection setup.
+        ``is_telephony`` must match what the agent will be created with, or the STT
+        client is kept under a key the agent never asks for.
+        """
+        tts_provider = profile_config.get("tts_provider")
+        tts_options = profile_config.get("tts_options", {})
+        stt_provider = profile_config.get("stt_provider")
+        stt_options = profile_config.get("stt_options", {})
+        clients = [
+            (
+                PrewarmedClients.make_key("tts", tts_provider, ProviderFactory._tts_api_key(tts_provider), tts_options),
+                ProviderFactory.build_tts(tts_provider, tts_options),
+            ),
+            (
+                PrewarmedClients.make_key(
+                    "stt", stt_provider, ProviderFactory._stt_api_key(stt_provider), stt_options, is_telephony
+                ),
+                ProviderFactory.build_stt(stt_provider, stt_options, is_telephony=is_telephony),
+            ),
+        ]
+        for key, client in clients:
+            prewarm = getattr(client, "prewarm", None)
+            if prewarm is not None:
+                prewarm()
+            prewarmed_clients.put(key, client)
+
+    @staticmethod
+    def _tts_api_key(provider: Any) -> str:
+        if provider == TTSProvider.GOOGLE.value:
+            return settings.GOOGLE_API_KEY
+        elif provider == TTSProvider.ELEVENLABS.value:
+            return settings.ELEVENLABS_API_KEY
+        elif provider == TTSProvider.UPLIFT.value:
+            return settings.UPLIFT_API_KEY
+        return settings.OPENAI_API_KEY
+
+    @staticmethod
+    def _stt_api_key(provider: Any) -> str:
+        if provider == STTProvider.OPENAI.value:
+            return settings.OPENAI_API_KEY
+        return settings.DEEPGRAM_API_KEY
+
+    @staticmethod
+    def build_llm(provider: str, options: Dict[str, Any]) -> llm.LLM:
         """Create LLM based on provider type and options"""
         if provider == LLMProvider.OPENAI.value:
             return openai.LLM(
@@ -41,7 +173,7 @@ class ProviderFactory:
             )
     # add model 
     @staticmethod
-    def create_tts(provider: str, options: Dict[str, Any]) -> Any:
+    def build_tts(provider: str, options: Dict[str, Any]) -> Any:
         """Create TTS based on provider type and options"""
         if provider == TTSProvider.OPENAI.value:
             return openai.TTS(
@@ -97,7 +229,7 @@ class ProviderFactory:
             )
     
     @staticmethod
-    def create_stt(provider: str, options: Dict[str, Any], is_telephony: bool = False) -> Any:
+    def build_stt(provider: str, options: Dict[str, Any], is_telephony: bool = False) -> Any:
         """Create STT based on provider type and options"""
         if provider == STTProvider.DEEPGRAM.value:
             model = options.get('model', 'nova-3-general')
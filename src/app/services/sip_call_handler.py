@@ -8,6 +8,7 @@ from livekit.agents import metrics, JobContext
 
 from ..services.agent_profile import setup_agent_with_profile, get_sip_information
 from ..utils.db_utils import with_worker_db
+from ..services.call_records import call_records
 from ..crud.crud_sip import crud_sip_calls, crud_sip_agent_mapping, crud_sip_trunk
 from ..crud.crud_agent_reference import crud_agent_references
 from ..crud.crud_agent_profiles import crud_agent_profiles
@@ -83,19 +84,16 @@ async def handle_sip_call(ctx: JobContext, participant: rtc.RemoteParticipant, u
             # Update call record with metrics
             call_id = sip_metadata.get('call_id') or participant.sid
             if call_id:
-                await with_worker_db(
-                    lambda db: crud_sip_calls.mark_call_completed(
-                        db=db,
-                        call_id=call_id,
-                        success=True,
-                        metadata={
-                            "metrics": summary,
-                            "total_tokens": summary.get("tokens", 0),
-                            "total_duration": summary.get("duration", 0)
-                        }
-                    )
+                call_records.record_completed(
+                    call_id,
+                    success=True,
+                    call_metadata={
+                        "metrics": summary,
+                        "total_tokens": summary.get("tokens", 0),
+                        "total_duration": summary.get("duration", 0)
+                    }
                 )
-                logger.info(f"Updated SIP call record with metrics")
+                logger.info(f"Queued SIP call record update with metrics")
         except Exception as e:
             logger.error(f"Error in SIP call completion handler: {e}")
     
@@ -8,8 +8,7 @@ from datetime import datetime, timezone
 from livekit import rtc, api
 from livekit.protocol.sip import TransferSIPParticipantRequest, SIPCallStatus
 
-from ..crud.crud_sip import crud_sip_calls
-from ..utils.db_utils import with_worker_db
+from .call_records import call_records
 from ..core.config import settings
 
 logger = logging.getLogger("sip-call-manager")
@@ -120,19 +119,13 @@ class SIPCallManager:
             
             # Update call record in database
             try:
-                await with_worker_db(
-                    lambda db: crud_sip_calls.update(
-                        db=db,
-                        call_id=call_id,
-                        object={
-                            "status": SIPCallStatus.COMPLETED.value,
-                            "completed_at": datetime.now(timezone.utc),
-                            "metadata": {
-                                "transfer_target": transfer_to,
-                                "transfer_time": datetime.now(timezone.utc).isoformat()
-                            }
-                        }
-                    )
+                call_records.record_completed(
+                    call_id,
+                    success=True,
+                    call_metadata={
+                        "transfer_target": transfer_to,
+                        "transfer_time": datetime.now(timezone.utc).isoformat()
+                    }
                 )
             except Exception as e:
                 logger.error(f"Error updating call record for transfer: {e}")
@@ -163,14 +156,11 @@ class SIPCallManager:
             return False
         
         try:
-            # Update call record in database
-            await with_worker_db(
-                lambda db: crud_sip_calls.mark_call_completed(
-                    db=db,
-                    call_id=call_id,
-                    success=True,
-                    metadata={"ended_by": "system", "end_reason": "hangup"}
-                )
+            # Queue the call record update; it is persisted in the background
+            call_records.record_completed(
+                call_id,
+                success=True,
+                call_metadata={"ended_by": "system", "end_reason": "hangup"}
             )
             
             # Remove from active calls
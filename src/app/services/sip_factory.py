@@ -489,9 +489,10 @@ from livekit.protocol.sip import (
     SIPParticipantInfo,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import HTTPException
+from fastapi import BackgroundTasks, HTTPException
 
 from ..core.config import settings
+from ..core.db.database import local_session
 # from livekit.protocol.agent.job import CreateAgentJobRequest
 from ..schemas.agent_reference import AgentReferenceLookupCreateInternal
 from ..schemas.sip import (
@@ -506,6 +507,7 @@ from ..crud.crud_sip import crud_sip_trunk, crud_sip_agent_mapping, crud_sip_cal
 from ..crud.crud_agent_profiles import crud_agent_profiles
 from ..crud.crud_connections import crud_connections
 from ..crud.crud_agent_reference import crud_agent_references
+from .sip_routing import SIPRoute, invalidate_sip_routes, resolve_inbound_route
 import secrets  # Add this import at top of sip_factory.py for secure password generation
 # from twirp.errors import TwirpError, NotFound
 from livekit.api import TwirpError
@@ -750,6 +752,7 @@ class SIPFactory:
             # Delete the mapping from the database
             await crud_sip_agent_mapping.delete(db=db, id=mapping_id)
             logger.info(f"Successfully deleted SIP agent mapping {mapping_id}")
+            await invalidate_sip_routes()
         except ValueError as e:
             logger.error(f"Error unassigning trunk from agent for mapping {mapping_id}: {str(e)}")
             raise
@@ -1054,6 +1057,7 @@ class SIPFactory:
             )
             
             mapping = await crud_sip_agent_mapping.create(db=db, object=mapping_create)
+            await invalidate_sip_routes()
             
             return CompleteSIPSetupResponse(
                 inbound_trunk=inbound_db,
@@ -1149,84 +1153,83 @@ class SIPFactory:
         to_number: str,
         from_number: str,
         call_sid: str,
-        call_direction: SIPCallDirection
+        call_direction: SIPCallDirection,
+        background_tasks: Optional[BackgroundTasks] = None
     ) -> Dict[str, Any]:
         """
-        Processes an incoming SIP call, creates a database record, and
-        prepares the data required for the TwiML response.
+        Resolves an incoming SIP call to its trunk and agent and prepares the data
+        required for the TwiML response.
+
+        The route comes from the cached phone-number routing table, so answering the
+        webhook needs no database round trip. The connection and call records are
+        written after the response is sent when ``background_tasks`` is given.
         """
         logger.info(f"Handling inbound call to {to_number} from {from_number}")
 
-        # Find the SIP trunk associated with the 'To' number
-        trunk = await crud_sip_trunk.get_by_phone_number(db, phone_number=to_number)
-        if not trunk:
-            logger.error(f"No SIP trunk found for number: {to_number}")
-            raise HTTPException(status_code=404, detail="No SIP trunk found for this phone number.")
-
-        # Find the agent mapping for this trunk
-        mappings = await crud_sip_agent_mapping.get_by_trunk_id(db, trunk_id=trunk["id"])
-        if not mappings:
-            logger.error(f"No agent mapping found for trunk: {trunk['id']}")
-            raise HTTPException(status_code=404, detail="No agent mapping found for this trunk.")
-
-        mapping = mappings[0]
-        agent_id = mapping.get("inbound_agent_id")
-        
-        # Validate inbound agent
-        if not agent_id:
-            logger.error(f"Inbound agent not configured for trunk: {trunk['id']}")
-            raise HTTPException(status_code=400, detail="Inbound agent not configured for this trunk.")
-        
-        agent = await crud_agent_profiles.get(db, id=agent_id)
-        if not agent:
-            logger.error(f"Agent profile with ID {agent_id} not found.")
-            raise HTTPException(status_code=404, detail=f"Agent profile with ID {agent_id} not found.")
-            
-        # Get the owner_id from the agent profile
-        owner_id = agent.owner_id
+        route = await resolve_inbound_route(to_number)
+        if route is None:
+            raise HTTPException(status_code=404, detail="No inbound route configured for this phone number.")
 
         # CONSTRUCT THE ROOM ID BASED ON LOGS
         # The room name will be in the format: call-<from_number>_<call_sid>
         room_id = f"call-_{from_number}_{call_sid}"
-        logger.info(f"Before new connection record for call to room: {room_id}")
-        # logger.info(f"{'room_id': room_id, 'agent_id': agent_id, 'owner_id': owner_id, 'Ahtasham call_id': call_sid}")
-        # Create a new connection record for this call
-        try:
-            connection = await crud_connections.create_connection(
-                db=db, 
-                room_id=room_id, 
-                agent_id=agent_id, 
-                owner_id=owner_id,
-                call_id=call_sid
-            )
-            logger.info(f"Created new connection record for call to room: {room_id}")
-        except Exception as e:
-            logger.error(f"Failed to create connection record: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Failed to create connection: {str(e)}")
 
-        # Create a new SIP call record in the database
-        await crud_sip_calls.create_call_record(
-            db=db,
-            call_id=call_sid,
-            room_id=room_id,
-            direction=call_direction,
-            phone_number=from_number,
-            trunk_id=trunk["id"],
-            agent_id=agent_id,
-            call_metadata={"to_number": to_number}   # ✅ correct keyword
-        )
-        logger.info(f"Created new SIPCall record for CallSid: {call_sid}")
+        if background_tasks is not None:
+            background_tasks.add_task(
+                self.persist_inbound_call, route, room_id, from_number, call_sid, call_direction
+            )
+        else:
+            await self.persist_inbound_call(route, room_id, from_number, call_sid, call_direction)
 
         # Prepare data for TwiML response
         response_data = {
             "room_id": room_id,
-            "sip_host": settings.LIVEKIT_SIP_HOST,
-            "username": trunk["username"],
-            "password": trunk["password"]
+            "sip_host": route.sip_host,
+            "username": route.username,
+            "password": route.password
         }
 
-        logger.info(f"TwiML response data: {response_data}")
+        logger.info(f"TwiML response data for room: {room_id}")
         return response_data
+
+    async def persist_inbound_call(
+        self,
+        route: SIPRoute,
+        room_id: str,
+        from_number: str,
+        call_sid: str,
+        call_direction: SIPCallDirection
+    ) -> None:
+        """Create the connection and SIP call records of an answered inbound call"""
+        async with local_session() as db:
+            try:
+                await crud_connections.create_connection(
+                    db=db,
+                    room_id=room_id,
+                    agent_id=uuid.UUID(route.inbound_agent_id),
+                    owner_id=uuid.UUID(route.owner_id),
+                    call_id=call_sid,
+                    include_knowledge_bases=False
+                )
+                logger.info(f"Created new connection record for call to room: {room_id}")
+            except Exception as e:
+                logger.error(f"Failed to create connection record for room {room_id}: {str(e)}")
+                return
+
+            try:
+                await crud_sip_calls.create_call_record(
+                    db=db,
+                    call_id=call_sid,
+                    room_id=room_id,
+                    direction=call_direction,
+                    phone_number=from_number,
+                    trunk_id=uuid.UUID(route.trunk_id),
+                    agent_id=uuid.UUID(route.inbound_agent_id),
+                    call_metadata={"to_number": route.phone_number}
+                )
+                logger.info(f"Created new SIPCall record for CallSid: {call_sid}")
+            except Exception as e:
+                logger.error(f"Failed to create SIPCall record for CallSid {call_sid}: {str(e)}")
     
 
     # async def create_outbound_call(
@@ -1361,7 +1364,8 @@ class SIPFactory:
                 db=db, 
                 room_id=room_name,
                 agent_id=agent_id,
-                owner_id=owner_id
+                owner_id=owner_id,
+                include_knowledge_bases=False
             )
             
             # Set up participant attributes
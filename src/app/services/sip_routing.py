@@ -0,0 +1,138 @@
+import json
+import logging
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+
+from ..core.config import settings
+from ..core.db.database import local_session
+from ..core.utils import cache
+from ..core.utils.local_cache import LocalCache, publish_invalidation
+from ..crud.crud_sip import crud_sip_trunk, crud_sip_agent_mapping
+from ..models.agent_profile import AgentProfile
+
+logger = logging.getLogger("sip-routing")
+
+# In-process cache of phone number -> route. Routes are shared between API processes
+# through per-number Redis keys with their own TTL; the keys include a version that
+# invalidations bump, so a load that started before an invalidation writes to a key
+# nobody reads any more. Trunk credentials never go to Redis, they are cached in-process.
+SIP_ROUTE_CACHE = "sip-routes"
+SIP_TRUNK_CREDENTIALS_CACHE = "sip-trunk-credentials"
+SIP_ROUTE_VERSION_KEY = "sip-routes-version"
+SIP_ROUTE_KEY_PREFIX = "sip-route:"
+
+
+@dataclass
+class SIPRoute:
+    """Everything needed to answer an inbound call to one phone number."""
+    phone_number: str
+    trunk_id: str
+    inbound_agent_id: str
+    owner_id: str
+    sip_host: str
+    username: str
+    password: str
+
+
+async def _load_trunk_credentials(trunk_id: str) -> Optional[Tuple[str, str]]:
+    async with local_session() as db:
+        trunk = await crud_sip_trunk.get(db, id=uuid.UUID(trunk_id))
+    if not trunk:
+        logger.error(f"SIP trunk {trunk_id} not found")
+        return None
+    return trunk["username"], trunk["password"]
+
+
+trunk_credentials = LocalCache(
+    SIP_TRUNK_CREDENTIALS_CACHE, ttl=settings.SIP_ROUTE_CACHE_TTL, loader=_load_trunk_credentials
+)
+
+
+async def _load_route_from_db(phone_number: str) -> Optional[SIPRoute]:
+    async with local_session() as db:
+        trunk = await crud_sip_trunk.get_by_phone_number(db, phone_number=phone_number)
+        if not trunk:
+            logger.error(f"No SIP trunk found for number: {phone_number}")
+            return None
+
+        mappings = await crud_sip_agent_mapping.get_by_trunk_id(db, trunk_id=trunk["id"])
+        if not mappings:
+            logger.error(f"No agent mapping found for trunk: {trunk['id']}")
+            return None
+
+        agent_id = mappings[0].get("inbound_agent_id")
+        if not agent_id:
+            logger.error(f"Inbound agent not configured for trunk: {trunk['id']}")
+            return None
+
+        owner_id = await db.scalar(select(AgentProfile.owner_id).where(AgentProfile.id == agent_id))
+        if owner_id is None:
+            logger.error(f"Agent profile with ID {agent_id} not found.")
+            return None
+
+    trunk_credentials.set(str(trunk["id"]), (trunk["username"], trunk["password"]))
+    return SIPRoute(
+        phone_number=phone_number,
+        trunk_id=str(trunk["id"]),
+        inbound_agent_id=str(agent_id),
+        owner_id=str(owner_id),
+        sip_host=settings.LIVEKIT_SIP_HOST,
+        username=trunk["username"],
+        password=trunk["password"],
+    )
+
+
+def _route_key(version: Optional[bytes], phone_number: str) -> str:
+    return f"{SIP_ROUTE_KEY_PREFIX}{int(version or 0)}:{phone_number}"
+
+
+async def _load_route(phone_number: str) -> Optional[SIPRoute]:
+    """Load a route from Redis, or build it from the database and share it through Redis"""
+    version = None
+    if cache.client is not None:
+        try:
+            version = await cache.client.get(SIP_ROUTE_VERSION_KEY)
+            data = await cache.client.get(_route_key(version, phone_number))
+            if data:
+                shared = json.loads(data)
+                credentials = await trunk_credentials.get_or_load(shared["trunk_id"])
+                if credentials is not None:
+                    username, password = credentials
+                    return SIPRoute(**shared, username=username, password=password)
+        except Exception as e:
+            logger.warning(f"Failed to read SIP route for {phone_number} from Redis: {e}")
+
+    route = await _load_route_from_db(phone_number)
+    if route is not None and cache.client is not None:
+        shared = {k: v for k, v in asdict(route).items() if k not in ("username", "password")}
+        try:
+            await cache.client.set(
+                _route_key(version, phone_number), json.dumps(shared), ex=settings.SIP_ROUTE_CACHE_TTL
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store SIP route for {phone_number} in Redis: {e}")
+    return route
+
+
+sip_routes = LocalCache(SIP_ROUTE_CACHE, ttl=settings.SIP_ROUTE_CACHE_TTL, loader=_load_route)
+
+
+async def resolve_inbound_route(phone_number: str) -> Optional[SIPRoute]:
+    """The route for calls to ``phone_number``, or None if the number is not fully configured"""
+    return await sip_routes.get_or_load(phone_number)
+
+
+async def invalidate_sip_routes() -> None:
+    """Drop every cached route after a trunk or agent mapping changed"""
+    if cache.client is not None:
+        try:
+            # Before the broadcast, so other processes do not refill from stale Redis data;
+            # the old keys expire on their own
+            await cache.client.incr(SIP_ROUTE_VERSION_KEY)
+        except Exception as e:
+            logger.error(f"Failed to clear SIP routes in Redis: {e}")
+    await publish_invalidation(SIP_TRUNK_CREDENTIALS_CACHE)
+    await publish_invalidation(SIP_ROUTE_CACHE)
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger("tool-runner")
+
+ToolHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def _call_key(name: str, params: Dict[str, Any]) -> str:
+    # Unset optional parameters arrive either missing or as None
+    arguments = {k: v for k, v in params.items() if v is not None}
+    return f"{name}:{json.dumps(arguments, sort_keys=True, default=str)}"
+
+
+class ToolCallRunner:
+    """
+    Runs the tool calls of one LLM turn concurrently, for one agent.
+
+    The pipeline agent executes the tool calls of a turn one after another. When the
+    calls are collected, ``start_turn`` launches all of them at once; the pipeline's own
+    sequential calls then only wait for tasks that are already running. Every call of a
+    turn shares one deadline: a call still running when it passes fails with a timeout,
+    so the LLM answers with the results that did arrive.
+
+    Parameters
+    ----------
+    deadline: float
+        Seconds the tool calls of one turn may take in total.
+    filler: str | None
+        Phrase spoken when the tools have not answered within ``filler_delay`` seconds.
+    filler_delay: float
+        How long tools may run before the filler is spoken.
+    """
+
+    def __init__(
+        self,
+        deadline: float = settings.FUNCTION_TURN_DEADLINE,
+        filler: Optional[str] = None,
+        filler_delay: float = settings.FUNCTION_FILLER_DELAY,
+    ) -> None:
+        self.deadline = deadline
+        self.filler = filler
+        self.filler_delay = filler_delay
+        self._handlers: Dict[str, ToolHandler] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._deadline_at: Optional[float] = None
+        self._filler_spoken = False
+
+    def register(self, name: str, handler: ToolHandler) -> None:
+        self._handlers[name] = handler
+
+    def start_turn(self, calls: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Launch every known tool call of a turn; ``calls`` are (function name, arguments)"""
+        loop = asyncio.get_running_loop()
+        self._cancel_pending()
+        self._deadline_at = loop.time() + self.deadline
+        self._filler_spoken = False
+
+        for name, params in calls:
+            handler = self._handlers.get(name)
+            if handler is None:
+                continue
+            key = _call_key(name, params)
+            if key not in self._pending:
+                self._pending[key] = asyncio.create_task(handler(dict(params)))
+
+        if len(self._pending) > 1:
+            logger.info(f"Running {len(self._pending)} tool calls concurrently")
+
+    async def call(self, name: str, params: Dict[str, Any]) -> Any:
+        """Result of a tool call, reusing the task started for it by ``start_turn``"""
+        loop = asyncio.get_running_loop()
+        task = self._pending.pop(_call_key(name, params), None)
+        if task is None:
+            # Not announced in advance, e.g. nested calls: run it now
+            task = asyncio.create_task(self._handlers[name](params))
+            if self._deadline_at is None or self._deadline_at <= loop.time():
+                self._deadline_at = loop.time() + self.deadline
+
+        if self.filler and not self._filler_spoken:
+            await asyncio.wait({task}, timeout=self.filler_delay)
+            if not task.done() and not self._filler_spoken:
+                self._filler_spoken = True
+                await self._say_filler()
+
+        remaining = max(0.0, self._deadline_at - loop.time())
+        try:
+            return await asyncio.wait_for(task, timeout=remaining)
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool {name} missed the {self.deadline:.1f}s turn deadline")
+            raise TimeoutError(f"{name} did not respond in time")
+
+    async def _say_filler(self) -> None:
+        from livekit.agents.pipeline import AgentCallContext
+
+        try:
+            agent = AgentCallContext.get_current().agent
+            await agent.say(self.filler, add_to_chat_ctx=True)
+        except Exception as e:
+            logger.warning(f"Could not play tool filler: {e}")
+
+    def _cancel_pending(self) -> None:
+        # Calls started for a turn that never consumed them (e.g. the user interrupted)
+        for task in self._pending.values():
+            if task.done() and not task.cancelled():
+                task.exception()  # retrieved, so asyncio does not log it
+            task.cancel()
+        self._pending.clear()
+
+    def close(self) -> None:
+        self._cancel_pending()
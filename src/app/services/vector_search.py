@@ -1,7 +1,8 @@
+import asyncio
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Sequence
 from qdrant_client.http.models import (
-    Filter, FieldCondition, MatchValue, Range, 
+    Filter, FieldCondition, MatchValue, Range,
     SearchRequest, SearchParams
 )
 
@@ -21,68 +22,141 @@ class VectorSearchService:
         """Search for relevant document chunks based on vector similarity"""
         try:
             # Generate embedding for query
-            embeddings = await embedding_service.get_embeddings([query_text])
-            if not embeddings:
+            query_embedding = await embedding_service.get_query_embedding(query_text)
+            if query_embedding is None:
                 return []
-                
-            query_embedding = embeddings[0]
-            
-            # Build filter if needed
-            search_filter = None
-            if filter_by:
-                conditions = []
-                for field, value in filter_by.items():
-                    if isinstance(value, list):
-                        # Handle range filters
-                        if len(value) == 2:
-                            conditions.append(
-                                FieldCondition(
-                                    key=field,
-                                    range=Range(
-                                        gte=value[0] if value[0] is not None else None,
-                                        lte=value[1] if value[1] is not None else None
-                                    )
-                                )
-                            )
-                    else:
-                        # Handle exact match
-                        conditions.append(
-                            FieldCondition(
-                                key=field,
-                                match=MatchValue(value=value)
-                            )
-                        )
-                
-                if conditions:
-                    search_filter = Filter(must=conditions)
-            
-            # Execute search
-            search_results = qdrant_manager.client.search(
+
+            return await self._search(
                 collection_name=collection_name,
-                query_vector=query_embedding,
+                query_embedding=query_embedding,
                 limit=limit,
-                query_filter=search_filter,
-                with_payload=True,
-                search_params=SearchParams(hnsw_ef=128)  # Increase for better recall
+                search_filter=self._build_filter(filter_by)
             )
-            
-            # Format results
-            results = []
-            for result in search_results:
-                results.append({
-                    "content": result.payload.get("content", ""),
-                    "document_id": result.payload.get("document_id"),
-                    "metadata": {
-                        k: v for k, v in result.payload.items() 
-                        if k not in ["content", "document_id"]
-                    },
-                    "score": result.score
-                })
-                
-            return results
-            
+
         except Exception as e:
             logger.error(f"Error in vector search: {e}")
             return []
 
-vector_search = VectorSearchService()
\ No newline at end of file
+    async def query_collections(
+        self,
+        query_text: str,
+        collection_names: Sequence[str],
+        limit: int = 5,
+        timeout: Optional[float] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search several collections for the same query concurrently.
+
+        The query is embedded once and shared by every search. Collections that have not
+        answered within ``timeout`` seconds (measured from the start of the call) are
+        dropped from the result instead of delaying it.
+
+        Returns:
+            Dict mapping collection name to its results, for the collections that answered
+        """
+        if not collection_names:
+            return {}
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        try:
+            query_embedding = await asyncio.wait_for(
+                embedding_service.get_query_embedding(query_text),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Query embedding exceeded the {timeout}s search deadline, skipping retrieval")
+            return {}
+        except Exception as e:
+            logger.error(f"Error embedding query: {e}")
+            return {}
+
+        if query_embedding is None:
+            return {}
+
+        tasks = {
+            asyncio.create_task(
+                self._search(collection_name=name, query_embedding=query_embedding, limit=limit)
+            ): name
+            for name in collection_names
+        }
+        remaining = max(0.0, deadline - loop.time()) if deadline is not None else None
+        done, pending = await asyncio.wait(tasks, timeout=remaining)
+
+        for task in pending:
+            task.cancel()
+            logger.warning(f"Dropping search on collection {tasks[task]}: exceeded the {timeout}s deadline")
+
+        results = {}
+        for task in done:
+            if task.exception():
+                logger.error(f"Error searching collection {tasks[task]}: {task.exception()}")
+            else:
+                results[tasks[task]] = task.result()
+
+        return results
+
+    def _build_filter(self, filter_by: Optional[Dict[str, Any]]) -> Optional[Filter]:
+        """Build a Qdrant filter from field -> value (exact match) or [min, max] (range) pairs"""
+        if not filter_by:
+            return None
+
+        conditions = []
+        for field, value in filter_by.items():
+            if isinstance(value, list):
+                # Handle range filters
+                if len(value) == 2:
+                    conditions.append(
+                        FieldCondition(
+                            key=field,
+                            range=Range(
+                                gte=value[0] if value[0] is not None else None,
+                                lte=value[1] if value[1] is not None else None
+                            )
+                        )
+                    )
+            else:
+                # Handle exact match
+                conditions.append(
+                    FieldCondition(
+                        key=field,
+                        match=MatchValue(value=value)
+                    )
+                )
+
+        return Filter(must=conditions) if conditions else None
+
+    async def _search(
+        self,
+        collection_name: str,
+        query_embedding: List[float],
+        limit: int,
+        search_filter: Optional[Filter] = None
+    ) -> List[Dict[str, Any]]:
+        """Run a vector search on one collection and format the hits"""
+        search_results = await qdrant_manager.async_client.search(
+            collection_name=collection_name,
+            query_vector=query_embedding,
+            limit=limit,
+            query_filter=search_filter,
+            with_payload=True,
+            search_params=SearchParams(hnsw_ef=128)  # Increase for better recall
+        )
+
+        # Format results
+        results = []
+        for result in search_results:
+            results.append({
+                "content": result.payload.get("content", ""),
+                "document_id": result.payload.get("document_id"),
+                "metadata": {
+                    k: v for k, v in result.payload.items()
+                    if k not in ["content", "document_id"]
+                },
+                "score": result.score
+            })
+
+        return results
+
+vector_search = VectorSearchService()
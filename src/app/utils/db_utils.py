@@ -1,7 +1,11 @@
+import asyncio
 import logging
-from typing import Any, Callable, TypeVar, Awaitable, Optional
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, TypeVar, Awaitable, Optional
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from ..core.config import settings
@@ -10,28 +14,127 @@ logger = logging.getLogger("worker-db-helper")
 
 T = TypeVar('T')
 
+
+@dataclass
+class WorkerPoolMetrics:
+    """Connection acquisition counters for a worker engine."""
+    acquisitions: int = 0
+    timeouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record(self, wait: float) -> None:
+        self.acquisitions += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+@dataclass
+class WorkerEngine:
+    """An engine, its session factory and pool metrics, bound to one event loop."""
+    engine: AsyncEngine
+    session_factory: sessionmaker
+    metrics: WorkerPoolMetrics = field(default_factory=WorkerPoolMetrics)
+
+
+# One engine per event loop. Job processes each run their own loop, and
+# asyncpg connections cannot be shared across loops.
+_engines: Dict[asyncio.AbstractEventLoop, WorkerEngine] = {}
+
+
+def _create_worker_engine() -> WorkerEngine:
+    DATABASE_URI = settings.POSTGRES_URI
+    DATABASE_PREFIX = settings.POSTGRES_ASYNC_PREFIX
+    DATABASE_URL = f"{DATABASE_PREFIX}{DATABASE_URI}"
+
+    engine = create_async_engine(
+        DATABASE_URL,
+        echo=False,
+        pool_size=settings.WORKER_DB_POOL_SIZE,
+        max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+        pool_timeout=settings.WORKER_DB_POOL_TIMEOUT,
+        pool_recycle=settings.WORKER_DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return WorkerEngine(engine=engine, session_factory=session_factory)
+
+
+def get_worker_engine() -> WorkerEngine:
+    """
+    Get the pooled engine for the running event loop, creating it on first use.
+
+    Returns:
+        WorkerEngine: The engine registered for the current loop
+    """
+    loop = asyncio.get_running_loop()
+
+    # Drop entries left behind by loops that closed without disposing
+    for stale_loop in [l for l in _engines if l.is_closed()]:
+        del _engines[stale_loop]
+
+    worker_engine = _engines.get(loop)
+    if worker_engine is None:
+        worker_engine = _create_worker_engine()
+        _engines[loop] = worker_engine
+        logger.info(
+            f"Created worker database engine (pool_size={settings.WORKER_DB_POOL_SIZE}, "
+            f"max_overflow={settings.WORKER_DB_MAX_OVERFLOW})"
+        )
+    return worker_engine
+
+
+def get_worker_pool_stats() -> Dict[str, Any]:
+    """
+    Get pool statistics for the engine bound to the running event loop.
+
+    Returns:
+        Dict with pool size, checked-out and overflow connections, and acquisition wait times
+    """
+    worker_engine = _engines.get(asyncio.get_running_loop())
+    if worker_engine is None:
+        return {}
+
+    pool = worker_engine.engine.pool
+    metrics = worker_engine.metrics
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "acquisitions": metrics.acquisitions,
+        "timeouts": metrics.timeouts,
+        "avg_wait_ms": (metrics.total_wait / metrics.acquisitions * 1000) if metrics.acquisitions else 0.0,
+        "max_wait_ms": metrics.max_wait * 1000,
+    }
+
+
+async def dispose_worker_engine() -> None:
+    """Dispose the engine bound to the running event loop, closing all pooled connections."""
+    worker_engine = _engines.pop(asyncio.get_running_loop(), None)
+    if worker_engine is None:
+        return
+
+    pool = worker_engine.engine.pool
+    metrics = worker_engine.metrics
+    logger.info(
+        f"Disposing worker database engine: checked_out={pool.checkedout()}, "
+        f"acquisitions={metrics.acquisitions}, timeouts={metrics.timeouts}, "
+        f"max_wait_ms={metrics.max_wait * 1000:.1f}"
+    )
+    await worker_engine.engine.dispose()
+
+
 async def create_worker_db_session() -> Optional[AsyncSession]:
     """
     Create a database session specifically for the worker context.
-    This creates a new session connected to the current event loop.
-    
+    The session is bound to the pooled engine of the current event loop.
+
     Returns:
         AsyncSession: A new database session
     """
     try:
-        # Use the same database connection details as your application
-        DATABASE_URI = settings.POSTGRES_URI
-        DATABASE_PREFIX = settings.POSTGRES_ASYNC_PREFIX
-        DATABASE_URL = f"{DATABASE_PREFIX}{DATABASE_URI}"
-        
-        # Create an engine tied to the current event loop
-        engine = create_async_engine(DATABASE_URL, echo=False)
-        
-        # Create a session factory
-        async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-        
-        # Return a session
-        return async_session()
+        return get_worker_engine().session_factory()
     except Exception as e:
         logger.error(f"Error creating worker database session: {e}")
         return None
@@ -39,13 +142,13 @@ async def create_worker_db_session() -> Optional[AsyncSession]:
 async def with_worker_db(operation: Callable[[AsyncSession], Awaitable[T]]) -> Optional[T]:
     """
     Execute a database operation using a session specific to the worker context.
-    
+
     Args:
         operation: An async function that accepts a database session and returns a result
-        
+
     Returns:
         The result of the operation or None if the session couldn't be created
-        
+
     Example:
         ```python
         agent_ref = await with_worker_db(
@@ -56,10 +159,21 @@ async def with_worker_db(operation: Callable[[AsyncSession], Awaitable[T]]) -> O
     db = await create_worker_db_session()
     if db is None:
         return None
-        
+
+    metrics = get_worker_engine().metrics
     try:
+        # Check out the connection up front so pool wait time is measured on its own
+        started = time.perf_counter()
+        try:
+            await db.connection()
+        except PoolTimeoutError:
+            metrics.timeouts += 1
+            logger.error(f"Timed out waiting for a worker database connection: {get_worker_pool_stats()}")
+            raise
+        metrics.record(time.perf_counter() - started)
+
         # Execute the operation with the session
         return await operation(db)
     finally:
-        # Make sure to close the session
-        await db.close()
\ No newline at end of file
+        # Make sure to close the session, returning the connection to the pool
+        await db.close()
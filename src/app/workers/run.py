@@ -0,0 +1,18 @@
+"""
+Standalone LiveKit voice worker.
+
+Runs voice agent jobs separately from the API so the two scale independently:
+
+    python -m src.app.workers.run start
+
+The LiveKit CLI supervises the prewarmed job processes. On SIGTERM the worker drains:
+it reports itself full so LiveKit stops dispatching to it, waits up to
+``LIVEKIT_DRAIN_TIMEOUT`` seconds for active calls to finish, then exits. Give the
+container at least that long to stop when deploying.
+"""
+from livekit.agents import cli
+
+from ..core.livekit_worker import build_worker_options
+
+if __name__ == "__main__":
+    cli.run_app(build_worker_options())
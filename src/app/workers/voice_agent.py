@@ -11,33 +11,51 @@ from livekit.agents import (
 )
 from livekit.agents.pipeline import VoicePipelineAgent
 
-from ..services.agent_profile import setup_agent_with_profile, cleanup_agent_resources
-from ..crud.crud_agent_reference import crud_agent_references
-from ..utils.db_utils import with_worker_db
+from ..services.agent_profile import setup_agent_with_profile, cleanup_agent_resources, is_telephony_room
+from ..crud.crud_agent_profiles import crud_agent_profiles
+from ..utils.db_utils import with_worker_db, dispose_worker_engine
+from ..core.qdrant_client import qdrant_manager
+from ..core.utils.cache import close_loop_redis_client
+from ..services.embedding_service import embedding_service
+from ..services.model_registry import model_registry
+from ..services.provider_factory import ProviderFactory, prewarmed_clients
+from ..services.function_executor import function_executor
+from ..services.call_records import call_records
+from ..core.config import settings
+from ..core.utils.local_cache import start_invalidation_listener, stop_invalidation_listener
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("LiveKit Worker")
 
+if settings.LIVEKIT_TURN_DETECTOR_ENABLED:
+    # Registers the end-of-utterance runner with the worker's inference process; each job
+    # then creates its own EOUModel (see ModelRegistry.turn_detector)
+    from livekit.plugins import turn_detector  # noqa: F401
+
 def prewarm(proc: JobProcess):
     """Initialize components that can be reused across jobs."""
-    # Load and store VAD model in process userdata
-    from livekit.plugins import silero
-    proc.userdata["vad"] = silero.VAD.load()
-    logger.info("Voice agent prewarm complete: VAD model loaded")
+    # Load models once per process; every job in it shares them
+    model_registry.prewarm()
+    proc.userdata["vad"] = model_registry.vad()
+    logger.info(f"Voice agent prewarm complete: {model_registry.stats()}")
 
 async def entrypoint(ctx: JobContext):
     """Main entry point for voice agent jobs."""
     logger.info(f"Connecting to room {ctx.room.name}")
     await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
 
+    # Keep in-process caches (e.g. RAG knowledge bases) in sync with API-side changes
+    await start_invalidation_listener()
+
     # Check for agent ID in the reference table based on room name
     agent_id = None
     active_agents = {}  # Track active agents by participant ID
     background_resources = {}  # Track background resources
     usage_collectors = {}
+    agent_snapshots = {}  # Agent runtime snapshots loaded for this job, by agent ID
     
-    # Try to parse the room name as a UUID and look up the agent_id in the reference table
+    # Try to parse the room name as a UUID and load the referenced agent's snapshot
     try:
         room_name = ctx.room.name
         try:
@@ -45,16 +63,26 @@ async def entrypoint(ctx: JobContext):
             room_uuid = uuid.UUID(room_name)
             logger.info(f"Room name {room_name} is a valid UUID")
             
-            # Use our worker-specific database helper
-            reference = await with_worker_db(
-                lambda db: crud_agent_references.get(
-                    db=db, roomid=room_uuid
+            # Resolve the agent reference and load its profile in one query
+            snapshot = await with_worker_db(
+                lambda db: crud_agent_profiles.get_runtime_snapshot(
+                    db=db, room_id=room_uuid
                 )
             )
             
-            if reference:
-                agent_id = reference["agentid"]
+            if snapshot:
+                agent_id = snapshot.agent_id
+                agent_snapshots[agent_id] = snapshot
                 logger.info(f"Found agent ID {agent_id} in reference table for room {room_name}")
+
+                # Connect to the agent's TTS/STT providers while waiting for the participant
+                if settings.PROVIDER_PREWARM_ENABLED:
+                    try:
+                        ProviderFactory.prewarm(
+                            snapshot.profile_config(), is_telephony=is_telephony_room(ctx.room)
+                        )
+                    except Exception as e:
+                        logger.warning(f"Failed to prewarm providers for agent {agent_id}: {e}")
             else:
                 logger.warning(f"No agent reference found for room {room_name}")
                 
@@ -72,7 +100,8 @@ async def entrypoint(ctx: JobContext):
         agent, resources = await setup_agent_with_profile(
             ctx=ctx, 
             participant=participant,
-            agent_id=agent_id
+            agent_id=agent_id,
+            snapshots=agent_snapshots
         )
         
         # Store agent and resources for cleanup
@@ -146,6 +175,23 @@ async def entrypoint(ctx: JobContext):
                     logger.info(f"Usage for {participant_id}: {summary}")
             except Exception as e:
                 logger.error(f"Error during shutdown cleanup: {e}")
+        logger.info(f"Query embedding cache: {embedding_service.cache_stats()}")
+        await embedding_service.aclose()
+        logger.info(f"Prewarmed provider clients: {prewarmed_clients.stats()}")
+        await prewarmed_clients.aclose()
+        logger.info(f"Function tool hosts: {function_executor.get_metrics()}")
+        logger.info(f"Function response cache: {function_executor.response_cache_stats()}")
+        await function_executor.aclose()
+        await call_records.aclose()
+
+        # Release pooled database, Qdrant and Redis connections held by this job's event loop
+        try:
+            await stop_invalidation_listener()
+            await dispose_worker_engine()
+            await qdrant_manager.close_async_client()
+            await close_loop_redis_client()
+        except Exception as e:
+            logger.error(f"Error releasing worker connections: {e}")
     
     ctx.add_shutdown_callback(shutdown_callback)
     
@@ -0,0 +1,124 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+from src.app.core.config import settings
+from src.app.models.sip import SIPCall
+from src.app.schemas.sip import SIPCallCreateInternal, SIPCallDirection, SIPCallStatus
+from src.app.services import call_records as call_records_module
+from src.app.services.call_records import CallRecordWriter, PendingCallRecord, _WriterState
+
+
+def make_create(call_id: str) -> SIPCallCreateInternal:
+    return SIPCallCreateInternal(
+        call_id=call_id,
+        room_id=f"room-{call_id}",
+        direction=SIPCallDirection.INBOUND,
+        phone_number="+15550100",
+        status=SIPCallStatus.INITIATED,
+    )
+
+
+def test_merge_keeps_newer_changes_and_fills_in_older_ones() -> None:
+    answered_at = datetime.now(timezone.utc)
+    agent_id = uuid.uuid4()
+    older = PendingCallRecord(
+        call_id="CA1",
+        create=make_create("CA1"),
+        agent_id=agent_id,
+        call_metadata={"source": "webhook", "step": 1},
+        attempts=2,
+    )
+    newer = PendingCallRecord(call_id="CA1", answered_at=answered_at, success=False, call_metadata={"step": 2})
+
+    newer.merge(older)
+
+    assert newer.create == older.create
+    assert newer.agent_id == agent_id
+    assert newer.answered_at == answered_at
+    assert newer.success is False
+    assert newer.call_metadata == {"source": "webhook", "step": 2}
+    assert newer.attempts == 2
+
+
+def test_apply_completes_an_answered_call() -> None:
+    answered_at = datetime.now(timezone.utc)
+    row = SIPCall(**make_create("CA1").model_dump())
+    record = PendingCallRecord(
+        call_id="CA1",
+        answered_at=answered_at,
+        completed_at=answered_at + timedelta(seconds=42),
+        success=True,
+        call_metadata={"ended_by": "caller"},
+    )
+
+    record.apply(row)
+
+    assert row.status == SIPCallStatus.COMPLETED
+    assert row.answered_at == answered_at
+    assert row.duration_seconds == 42
+    assert row.success is True
+    assert row.call_metadata == {"ended_by": "caller"}
+
+
+def test_requeue_merges_into_records_recorded_since() -> None:
+    writer = CallRecordWriter()
+    state = _WriterState()
+    newer = PendingCallRecord(call_id="CA1", call_metadata={"step": 2})
+    state.pending["CA1"] = newer
+    failed = [
+        PendingCallRecord(call_id="CA1", create=make_create("CA1"), call_metadata={"step": 1}),
+        PendingCallRecord(call_id="CA2", create=make_create("CA2")),
+    ]
+
+    writer._requeue(state, failed)
+
+    assert state.pending["CA1"] is newer
+    assert newer.create == failed[0].create
+    assert newer.call_metadata == {"step": 2}
+    assert newer.attempts == 1
+    assert state.pending["CA2"] is failed[1]
+    assert state.wakeup.is_set()
+
+
+def test_requeue_drops_records_after_max_attempts() -> None:
+    writer = CallRecordWriter()
+    state = _WriterState()
+    record = PendingCallRecord(call_id="CA1", attempts=settings.CALL_RECORD_MAX_ATTEMPTS - 1)
+
+    writer._requeue(state, [record])
+
+    assert state.pending == {}
+    assert not state.wakeup.is_set()
+
+
+def test_requeue_without_counting_an_attempt() -> None:
+    writer = CallRecordWriter()
+    state = _WriterState()
+    record = PendingCallRecord(call_id="CA1", attempts=settings.CALL_RECORD_MAX_ATTEMPTS - 1)
+
+    writer._requeue(state, [record], count_attempt=False)
+
+    assert state.pending["CA1"].attempts == settings.CALL_RECORD_MAX_ATTEMPTS - 1
+
+
+def test_failed_flush_is_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def failing_db(operation: Any) -> None:
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(call_records_module, "with_worker_db", failing_db)
+
+    async def run() -> None:
+        writer = CallRecordWriter()
+        state = _WriterState()
+        state.pending["CA1"] = PendingCallRecord(call_id="CA1", create=make_create("CA1"))
+
+        await writer._flush(state)
+
+        assert state.pending["CA1"].attempts == 1
+        assert state.wakeup.is_set()
+
+    asyncio.run(run())
@@ -0,0 +1,148 @@
+import asyncio
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+from unittest.mock import AsyncMock, PropertyMock, patch
+
+from qdrant_client.http import models
+
+from src.app.core.qdrant_client import QdrantManager
+from src.app.crud.crud_documents import crud_document, crud_knowledge_base
+from src.app.services import document_processor as document_processor_module
+from src.app.services.document_processor import DocumentProcessor
+
+DOCUMENT_ID = uuid.UUID("3f9a3f53-4d0e-4c4f-9d38-5b3c2a1e7d10")
+
+
+def point_ids(chunks: List[str]) -> List[str]:
+    occurrences: Dict[str, int] = {}
+    ids = []
+    for chunk in chunks:
+        ids.append(DocumentProcessor._chunk_point_id(DOCUMENT_ID, chunk, occurrences.get(chunk, 0)))
+        occurrences[chunk] = occurrences.get(chunk, 0) + 1
+    return ids
+
+
+def test_chunk_point_id_is_derived_from_content() -> None:
+    point_id = DocumentProcessor._chunk_point_id(DOCUMENT_ID, "Opening hours: 9 to 5", 0)
+
+    assert uuid.UUID(point_id).version == 5
+    assert point_id == DocumentProcessor._chunk_point_id(DOCUMENT_ID, "Opening hours: 9 to 5", 0)
+    assert point_id != DocumentProcessor._chunk_point_id(DOCUMENT_ID, "Opening hours: 9 to 6", 0)
+    assert point_id != DocumentProcessor._chunk_point_id(uuid.uuid4(), "Opening hours: 9 to 5", 0)
+    # Repeats of the same text within a document get their own points
+    assert point_id != DocumentProcessor._chunk_point_id(DOCUMENT_ID, "Opening hours: 9 to 5", 1)
+
+
+def test_only_new_chunks_are_embedded() -> None:
+    segments = {"first page": ["intro", "prices"], "second page": ["intro", "contact"]}
+    indexed = set(point_ids(["intro", "prices"]))
+
+    async def iter_segments(
+        file_path: str, content_type: str, remaining: Callable[[], float]
+    ) -> AsyncIterator[Tuple[str, int]]:
+        for segment in segments:
+            yield segment, 100
+
+    async def split(fn: Any, text: str, *args: Any, timeout: float) -> List[str]:
+        return segments[text]
+
+    async def run() -> None:
+        processor = DocumentProcessor()
+        embed = AsyncMock(side_effect=lambda texts: [[float(len(text))] for text in texts])
+        on_extracted = AsyncMock(return_value=True)
+        with (
+            patch.object(processor, "_iter_segments", iter_segments),
+            patch.object(document_processor_module.extraction_pool, "run", side_effect=split),
+            patch.object(document_processor_module.embedding_service, "get_embeddings", embed),
+        ):
+            chunks, ids, embeddings = await processor._extract_and_embed(
+                DOCUMENT_ID, "upload.txt", "text/plain", indexed, on_extracted
+            )
+
+        assert chunks == ["intro", "prices", "intro", "contact"]
+        assert ids == point_ids(chunks)
+        # The second "intro" is a new occurrence, so it is embedded like "contact"
+        assert embed.await_args_list[0].args == (["intro", "contact"],)
+        assert embeddings == {ids[2]: [5.0], ids[3]: [7.0]}
+        on_extracted.assert_awaited_once_with("first page\n\nsecond page")
+
+    asyncio.run(run())
+
+
+def test_extraction_is_abandoned_when_document_moved_on() -> None:
+    async def iter_segments(
+        file_path: str, content_type: str, remaining: Callable[[], float]
+    ) -> AsyncIterator[Tuple[str, int]]:
+        yield "text", 4
+
+    async def run() -> None:
+        processor = DocumentProcessor()
+        with (
+            patch.object(processor, "_iter_segments", iter_segments),
+            patch.object(document_processor_module.extraction_pool, "run", AsyncMock(return_value=["text"])),
+            patch.object(document_processor_module.embedding_service, "get_embeddings", AsyncMock(return_value=[[1.0]])),
+        ):
+            result = await processor._extract_and_embed(
+                DOCUMENT_ID, "upload.txt", "text/plain", set(), AsyncMock(return_value=False)
+            )
+
+        assert result is None
+
+    asyncio.run(run())
+
+
+def test_reingest_writes_only_the_difference(tmp_path: Any) -> None:
+    upload = tmp_path / "faq.txt"
+    upload.write_text("faq")
+    job_id = uuid.uuid4()
+
+    old_chunks = ["intro", "prices", "hours"]
+    new_chunks = ["hours", "intro", "contact"]
+    old_ids = point_ids(old_chunks)
+    new_ids = point_ids(new_chunks)
+    document = {
+        "id": DOCUMENT_ID,
+        "knowledge_base_id": uuid.uuid4(),
+        "filename": "faq.txt",
+        "content_type": "text/plain",
+    }
+
+    async def run() -> None:
+        processor = DocumentProcessor()
+        qdrant = AsyncMock()
+        advance = AsyncMock(return_value=True)
+        with (
+            patch.object(crud_document, "get", AsyncMock(return_value=document)),
+            patch.object(crud_knowledge_base, "get", AsyncMock(return_value={"qdrant_collection": "kb"})),
+            patch.object(QdrantManager, "async_client", new_callable=PropertyMock, return_value=qdrant),
+            patch.object(processor, "_advance", advance),
+            patch.object(processor, "_set_progress", AsyncMock()),
+            patch.object(processor, "_get_indexed_chunks", AsyncMock(return_value=dict(zip(old_ids, range(3))))),
+            patch.object(
+                processor,
+                "_extract_and_embed",
+                AsyncMock(return_value=(new_chunks, new_ids, {new_ids[2]: [0.1, 0.2]})),
+            ),
+        ):
+            assert await processor.ingest_file(AsyncMock(), DOCUMENT_ID, job_id, str(upload))
+
+        # Only the new chunk is uploaded
+        (upsert,) = qdrant.upsert.await_args_list
+        assert [point["id"] for point in upsert.kwargs["points"]] == [new_ids[2]]
+        assert upsert.kwargs["points"][0]["payload"]["chunk_index"] == 2
+
+        # Kept chunks that moved get their new position
+        (reindex,) = qdrant.batch_update_points.await_args_list
+        assert {
+            op.set_payload.points[0]: op.set_payload.payload["chunk_index"]
+            for op in reindex.kwargs["update_operations"]
+        } == {new_ids[0]: 0, new_ids[1]: 1}
+
+        # Chunks no longer in the document are removed
+        (delete,) = qdrant.delete.await_args_list
+        assert delete.kwargs["points_selector"] == models.PointIdsList(points=[old_ids[1]])
+
+        assert advance.await_args_list[-1].kwargs == {"progress": 100, "chunk_count": 3}
+        assert not upload.exists()
+
+    asyncio.run(run())
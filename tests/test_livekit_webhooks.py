@@ -0,0 +1,222 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.app.core.config import settings
+from src.app.services import livekit_webhooks
+from src.app.services.livekit_webhooks import (
+    WEBHOOK_CONSUMER_METRICS_PREFIX,
+    WEBHOOK_DEAD_LETTER_STREAM,
+    WEBHOOK_PROCESSED_PREFIX,
+    CallNotPersisted,
+    WebhookConsumer,
+    reconcile_participant_joined,
+)
+
+ROOM = "call-room-1"
+ATTRIBUTES = {"sip.phoneNumber": "+15550100", "sip.twilio.callSid": "CA1"}
+
+
+class FakePipeline:
+    def __init__(self, client: "FakeRedis") -> None:
+        self.client = client
+        self.commands: List[Tuple[str, Tuple[Any, ...], Dict[str, Any]]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        pass
+
+    def __getattr__(self, name: str) -> Any:
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self) -> List[Any]:
+        return [await getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """The stream commands used by WebhookConsumer.process_batch"""
+
+    def __init__(self, times_delivered: int = 1) -> None:
+        self.times_delivered = times_delivered
+        self.keys: Dict[str, Any] = {}
+        self.acked: List[Any] = []
+        self.streams: Dict[str, List[Dict[str, str]]] = {}
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.keys)
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        self.keys[key] = value
+        return True
+
+    async def hset(self, key: str, mapping: Dict[str, Any]) -> int:
+        self.keys.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        return True
+
+    async def xack(self, stream: str, group: str, entry_id: Any) -> int:
+        self.acked.append(entry_id)
+        return 1
+
+    async def xadd(self, stream: str, fields: Dict[str, str], **kwargs: Any) -> str:
+        self.streams.setdefault(stream, []).append(fields)
+        return "0-1"
+
+    async def xpending_range(self, stream: str, group: str, min: Any, max: Any, count: int) -> List[Dict[str, Any]]:
+        return [{"message_id": min, "times_delivered": self.times_delivered}]
+
+
+def entry(entry_id: str, event_id: str, **extra: str) -> Tuple[bytes, Dict[bytes, bytes]]:
+    body = json.dumps({"event": "participant_joined", "id": event_id})
+    fields = {"id": event_id, "body": body, **extra}
+    return entry_id.encode(), {k.encode(): v.encode() for k, v in fields.items()}
+
+
+def process(
+    client: FakeRedis, entries: List[Any], failing: Set[str] = frozenset()
+) -> Tuple[WebhookConsumer, AsyncMock, AsyncMock]:
+    db = AsyncMock()
+
+    @asynccontextmanager
+    async def session() -> AsyncIterator[AsyncMock]:
+        yield db
+
+    async def handle(db: Any, payload: Dict[str, Any]) -> None:
+        if payload["id"] in failing:
+            raise CallNotPersisted(payload["id"])
+
+    handler = AsyncMock(side_effect=handle)
+    consumer = WebhookConsumer(name="test-consumer")
+    with (
+        patch.object(livekit_webhooks, "local_session", session),
+        patch.object(livekit_webhooks, "process_webhook_event", handler),
+    ):
+        asyncio.run(consumer.process_batch(client, entries))
+    return consumer, handler, db
+
+
+def test_processed_entries_are_acked_and_marked() -> None:
+    client = FakeRedis()
+
+    consumer, handler, _ = process(client, [entry("1-0", "EV1"), entry("2-0", "EV2")])
+
+    assert handler.await_count == 2
+    assert client.acked == [b"1-0", b"2-0"]
+    assert f"{WEBHOOK_PROCESSED_PREFIX}EV1" in client.keys
+    assert f"{WEBHOOK_PROCESSED_PREFIX}EV2" in client.keys
+    assert consumer.metrics.processed == 2
+    assert client.keys[f"{WEBHOOK_CONSUMER_METRICS_PREFIX}test-consumer"]["processed"] == 2
+
+
+def test_already_processed_event_is_acked_without_running_again() -> None:
+    client = FakeRedis()
+    client.keys[f"{WEBHOOK_PROCESSED_PREFIX}EV1"] = 1
+
+    consumer, handler, _ = process(client, [entry("1-0", "EV1")])
+
+    handler.assert_not_awaited()
+    assert client.acked == [b"1-0"]
+    assert consumer.metrics.duplicates == 1
+
+
+def test_replayed_event_runs_again() -> None:
+    client = FakeRedis()
+    client.keys[f"{WEBHOOK_PROCESSED_PREFIX}EV1"] = 1
+
+    _, handler, _ = process(client, [entry("1-0", "EV1", replay="1")])
+
+    handler.assert_awaited_once()
+    assert client.acked == [b"1-0"]
+
+
+def test_entry_trimmed_from_stream_is_acked() -> None:
+    client = FakeRedis()
+
+    _, handler, _ = process(client, [(b"1-0", None)])
+
+    handler.assert_not_awaited()
+    assert client.acked == [b"1-0"]
+
+
+def test_failed_entry_stays_pending() -> None:
+    client = FakeRedis(times_delivered=1)
+
+    consumer, _, db = process(client, [entry("1-0", "EV1"), entry("2-0", "EV2")], failing={"EV1"})
+
+    assert client.acked == [b"2-0"]
+    assert f"{WEBHOOK_PROCESSED_PREFIX}EV1" not in client.keys
+    assert WEBHOOK_DEAD_LETTER_STREAM not in client.streams
+    assert consumer.metrics.failed == 1
+    db.rollback.assert_awaited_once()
+
+
+def test_entry_is_dead_lettered_after_max_deliveries() -> None:
+    client = FakeRedis(times_delivered=settings.LIVEKIT_WEBHOOK_MAX_DELIVERIES)
+
+    consumer, _, _ = process(client, [entry("1-0", "EV1")], failing={"EV1"})
+
+    assert client.acked == [b"1-0"]
+    assert [fields["id"] for fields in client.streams[WEBHOOK_DEAD_LETTER_STREAM]] == ["EV1"]
+    assert f"{WEBHOOK_PROCESSED_PREFIX}EV1" not in client.keys
+    assert consumer.metrics.dead_lettered == 1
+
+
+def test_reconcile_is_idempotent_once_moved() -> None:
+    db = AsyncMock()
+    db.scalar.return_value = ROOM
+
+    assert asyncio.run(reconcile_participant_joined(db, ROOM, ATTRIBUTES)) is True
+    db.execute.assert_not_awaited()
+    db.commit.assert_not_awaited()
+
+
+def test_reconcile_moves_connection_and_call() -> None:
+    db = AsyncMock()
+    db.scalar.side_effect = [None, "call-_+15550100_CA1"]
+    moved = MagicMock()
+    moved.one_or_none.return_value = MagicMock(room_id=ROOM, call_id="CA1")
+    db.execute.side_effect = [moved, MagicMock()]
+
+    assert asyncio.run(reconcile_participant_joined(db, ROOM, ATTRIBUTES)) is True
+    assert db.execute.await_count == 2
+    db.commit.assert_awaited_once()
+
+
+def test_reconcile_raises_until_call_is_persisted() -> None:
+    db = AsyncMock()
+    db.scalar.side_effect = [None, None]
+
+    with pytest.raises(CallNotPersisted):
+        asyncio.run(reconcile_participant_joined(db, ROOM, ATTRIBUTES))
+    db.execute.assert_not_awaited()
+
+
+def test_reconcile_raises_when_moved_concurrently() -> None:
+    db = AsyncMock()
+    db.scalar.side_effect = [None, "call-_+15550100_CA1"]
+    moved = MagicMock()
+    moved.one_or_none.return_value = None
+    db.execute.return_value = moved
+
+    with pytest.raises(CallNotPersisted):
+        asyncio.run(reconcile_participant_joined(db, ROOM, ATTRIBUTES))
+    db.rollback.assert_awaited_once()
+    db.commit.assert_not_awaited()
+
+
+def test_reconcile_ignores_participants_without_phone_number() -> None:
+    db = AsyncMock()
+
+    assert asyncio.run(reconcile_participant_joined(db, ROOM, {})) is False
+    db.scalar.assert_not_awaited()
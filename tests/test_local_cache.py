@@ -0,0 +1,171 @@
+import asyncio
+import json
+
+import pytest
+
+from src.app.core.utils import local_cache
+from src.app.core.utils.local_cache import LocalCache, _dispatch, publish_invalidation
+
+
+class CountingLoader:
+    """Loader that returns ``<key>:<call number>`` once ``release`` is set."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self, key: str) -> str:
+        self.calls += 1
+        call = self.calls
+        self.started.set()
+        await self.release.wait()
+        return f"{key}:{call}"
+
+
+def test_entry_expires_after_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(local_cache.time, "monotonic", lambda: now[0])
+    cache = LocalCache("test-ttl", ttl=10)
+
+    cache.set("key", "value")
+    now[0] += 9
+    assert cache.get("key") == "value"
+
+    now[0] += 2
+    assert cache.get("key") is None
+    assert cache.stats() == {"name": "test-ttl", "size": 1, "hits": 1, "misses": 1}
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = LocalCache("test-lru", ttl=60, maxsize=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_concurrent_misses_share_one_load() -> None:
+    async def run() -> None:
+        loader = CountingLoader()
+        cache = LocalCache("test-single-flight", ttl=60, loader=loader)
+
+        waiters = [asyncio.create_task(cache.get_or_load("key")) for _ in range(5)]
+        await loader.started.wait()
+        loader.release.set()
+
+        assert await asyncio.gather(*waiters) == ["key:1"] * 5
+        assert loader.calls == 1
+        assert cache.get("key") == "key:1"
+
+    asyncio.run(run())
+
+
+def test_cancelled_caller_does_not_cancel_shared_load() -> None:
+    async def run() -> None:
+        loader = CountingLoader()
+        cache = LocalCache("test-shielded-load", ttl=60, loader=loader)
+
+        first = asyncio.create_task(cache.get_or_load("key"))
+        second = asyncio.create_task(cache.get_or_load("key"))
+        await loader.started.wait()
+        first.cancel()
+        loader.release.set()
+
+        assert await second == "key:1"
+        assert loader.calls == 1
+
+    asyncio.run(run())
+
+
+def test_expired_entry_is_served_while_refreshed() -> None:
+    async def run() -> None:
+        loader = CountingLoader()
+        loader.release.set()
+        cache = LocalCache("test-refresh", ttl=-1, loader=loader)
+        cache.set("key", "stale")
+
+        assert await cache.get_or_load("key") == "stale"
+        await asyncio.sleep(0)
+        assert loader.calls == 1
+        assert cache._entries["key"][1] == "key:1"
+
+    asyncio.run(run())
+
+
+def test_load_invalidated_while_running_is_not_stored() -> None:
+    async def run() -> None:
+        loader = CountingLoader()
+        cache = LocalCache("test-generation", ttl=60, loader=loader)
+
+        stale = asyncio.create_task(cache.get_or_load("key"))
+        await loader.started.wait()
+        cache.invalidate("key")
+
+        # A caller arriving after the invalidation starts its own load
+        fresh = asyncio.create_task(cache.get_or_load("key"))
+        await asyncio.sleep(0)
+        loader.release.set()
+
+        assert await stale == "key:1"
+        assert await fresh == "key:2"
+        assert cache.get("key") == "key:2"
+
+    asyncio.run(run())
+
+
+def test_load_after_invalidating_whole_cache_is_not_stored() -> None:
+    async def run() -> None:
+        loader = CountingLoader()
+        cache = LocalCache("test-epoch", ttl=60, loader=loader)
+
+        stale = asyncio.create_task(cache.get_or_load("key"))
+        await loader.started.wait()
+        cache.invalidate()
+        loader.release.set()
+
+        assert await stale == "key:1"
+        assert cache.get("key") is None
+
+    asyncio.run(run())
+
+
+def test_invalidate_drops_one_key_or_all() -> None:
+    cache = LocalCache("test-invalidate", ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    cache.invalidate()
+    assert cache.get("b") is None
+
+
+def test_publish_invalidation_without_redis_invalidates_locally(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local_cache.cache, "client", None)
+    cache = LocalCache("test-publish", ttl=60)
+    cache.set(1, "value")
+
+    asyncio.run(publish_invalidation("test-publish", 1))
+
+    assert cache.get(1) is None
+
+
+def test_invalidation_message_is_routed_by_cache_name() -> None:
+    target = LocalCache("test-dispatch-target", ttl=60)
+    other = LocalCache("test-dispatch-other", ttl=60)
+    target.set("key", 1)
+    other.set("key", 1)
+
+    _dispatch(json.dumps({"cache": "test-dispatch-target", "key": "key"}).encode())
+    _dispatch(b"not json")
+
+    assert target.get("key") is None
+    assert other.get("key") == 1
@@ -0,0 +1,86 @@
+import asyncio
+import math
+import uuid
+from typing import Any, Generator
+
+import pytest
+import redis
+from redis.asyncio import Redis
+
+from src.app.core.config import settings
+from src.app.core.utils.rate_limit import GCRA_SCRIPT, RateLimiter, RateLimitRules, rate_limiter
+
+
+@pytest.fixture
+def redis_url() -> Generator[str, Any, None]:
+    # The script runs in Redis, so these tests need the rate limit Redis to be up
+    client = redis.Redis.from_url(settings.REDIS_RATE_LIMIT_URL)
+    try:
+        client.ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip("Rate limit Redis is not available")
+    finally:
+        client.close()
+    yield settings.REDIS_RATE_LIMIT_URL
+
+
+def run_checks(
+    monkeypatch: pytest.MonkeyPatch, redis_url: str, checks: list[tuple[int | str, str, int, int]]
+) -> list[Any]:
+    async def run() -> list[Any]:
+        client = Redis.from_url(redis_url)
+        monkeypatch.setattr(RateLimiter, "client", client)
+        monkeypatch.setattr(RateLimiter, "script", client.register_script(GCRA_SCRIPT))
+        try:
+            return await rate_limiter.check_many(checks)
+        finally:
+            await client.delete(*{RateLimiter._key(user_id, path) for user_id, path, _, _ in checks})
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "limit, period",
+    [
+        (3, 1),
+        (7, 60),
+        # Emission intervals that are not a whole number of milliseconds
+        (30, 7),
+        (5, 3600),
+    ],
+)
+def test_gcra_admits_exactly_the_limit(
+    monkeypatch: pytest.MonkeyPatch, redis_url: str, limit: int, period: int
+) -> None:
+    user_id = str(uuid.uuid4())
+    results = run_checks(monkeypatch, redis_url, [(user_id, "/api/v1/test", limit, period)] * (limit + 1))
+
+    assert [result.allowed for result in results] == [True] * limit + [False]
+    assert [result.remaining for result in results[:limit]] == list(range(limit - 1, -1, -1))
+    rejected = results[-1]
+    assert rejected.remaining == 0
+    # Durations are rounded up to whole milliseconds
+    assert 0 < rejected.retry_after <= period / limit + 0.001
+    assert rejected.headers()["Retry-After"] == str(math.ceil(rejected.retry_after))
+
+
+def test_gcra_limits_are_counted_per_path(monkeypatch: pytest.MonkeyPatch, redis_url: str) -> None:
+    user_id = str(uuid.uuid4())
+    results = run_checks(
+        monkeypatch,
+        redis_url,
+        [(user_id, "/api/v1/a", 1, 60), (user_id, "/api/v1/b", 1, 60), (user_id, "/api/v1/a", 1, 60)],
+    )
+
+    assert [result.allowed for result in results] == [True, True, False]
+
+
+def test_rules_resolve_tier_and_path() -> None:
+    rules = RateLimitRules(tiers={1: "free", 2: "pro"}, limits={(1, "api_v1_tasks"): (10, 60)})
+
+    assert rules.resolve(1, "api_v1_tasks") == (10, 60)
+    # Other paths and tiers fall back to the default limit
+    assert rules.resolve(1, "api_v1_users") is None
+    assert rules.resolve(2, "api_v1_tasks") is None
+    assert rules.resolve(None, "api_v1_tasks") is None
@@ -0,0 +1,123 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from src.app.services.tool_runner import ToolCallRunner, _call_key
+
+
+def test_call_key_ignores_unset_arguments_and_order() -> None:
+    assert _call_key("lookup", {"b": 2, "a": 1, "c": None}) == _call_key("lookup", {"a": 1, "b": 2})
+    assert _call_key("lookup", {"a": 1}) != _call_key("lookup", {"a": 2})
+    assert _call_key("lookup", {"a": 1}) != _call_key("search", {"a": 1})
+
+
+def test_identical_calls_of_a_turn_run_once() -> None:
+    async def run() -> None:
+        received: List[Dict[str, Any]] = []
+
+        async def lookup(params: Dict[str, Any]) -> str:
+            received.append(params)
+            return f"order {params['order_id']}"
+
+        runner = ToolCallRunner(deadline=1.0)
+        runner.register("lookup", lookup)
+        runner.start_turn([
+            ("lookup", {"order_id": 7, "note": None}),
+            ("lookup", {"order_id": 7}),
+            ("unknown", {}),
+        ])
+
+        assert await runner.call("lookup", {"order_id": 7}) == "order 7"
+        assert received == [{"order_id": 7, "note": None}]
+
+    asyncio.run(run())
+
+
+def test_calls_of_a_turn_run_concurrently() -> None:
+    async def run() -> None:
+        async def slow(params: Dict[str, Any]) -> int:
+            await asyncio.sleep(0.1)
+            return params["n"]
+
+        runner = ToolCallRunner(deadline=1.0)
+        runner.register("slow", slow)
+        calls = [("slow", {"n": n}) for n in range(5)]
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        runner.start_turn(calls)
+        results = [await runner.call(name, params) for name, params in calls]
+
+        assert results == list(range(5))
+        assert loop.time() - started < 0.3
+
+    asyncio.run(run())
+
+
+def test_calls_share_the_turn_deadline() -> None:
+    async def run() -> None:
+        async def fast(params: Dict[str, Any]) -> str:
+            return "fast"
+
+        async def stuck(params: Dict[str, Any]) -> str:
+            await asyncio.sleep(10)
+            return "stuck"
+
+        runner = ToolCallRunner(deadline=0.1)
+        runner.register("fast", fast)
+        runner.register("stuck", stuck)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        runner.start_turn([("stuck", {}), ("fast", {})])
+
+        with pytest.raises(TimeoutError):
+            await runner.call("stuck", {})
+        # The deadline has passed, but results that already arrived are still returned
+        assert await runner.call("fast", {}) == "fast"
+        assert loop.time() - started < 1.0
+
+    asyncio.run(run())
+
+
+def test_new_turn_cancels_unconsumed_calls() -> None:
+    async def run() -> None:
+        cancelled = asyncio.Event()
+
+        async def stuck(params: Dict[str, Any]) -> None:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def fast(params: Dict[str, Any]) -> str:
+            return "fast"
+
+        runner = ToolCallRunner(deadline=1.0)
+        runner.register("stuck", stuck)
+        runner.register("fast", fast)
+
+        runner.start_turn([("stuck", {})])
+        await asyncio.sleep(0)
+        runner.start_turn([("fast", {})])
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1.0)
+        assert await runner.call("fast", {}) == "fast"
+
+    asyncio.run(run())
+
+
+def test_unannounced_call_runs_immediately() -> None:
+    async def run() -> None:
+        async def echo(params: Dict[str, Any]) -> Dict[str, Any]:
+            return params
+
+        runner = ToolCallRunner(deadline=1.0)
+        runner.register("echo", echo)
+
+        assert await runner.call("echo", {"a": 1}) == {"a": 1}
+        runner.close()
+
+    asyncio.run(run())